@@ -1,19 +1,61 @@
 from __future__ import annotations
 import os
+import sys
+import atexit
 import argparse
 from pathlib import Path
 from random import random
 import subprocess
+import shutil
+import glob
+import tempfile
 import platform
-from time import sleep
+import signal
+import asyncio
+import threading
+from time import monotonic, perf_counter, sleep, time, time_ns
+from datetime import timedelta
 import re
+import json
+import hashlib
+import heapq
+from contextlib import contextmanager, nullcontext, redirect_stdout
 from dataclasses import dataclass, field
 from typing import Tuple, Union, List
-import unicodedata
+from collections import deque
+from queue import SimpleQueue
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from bisect import bisect_left, bisect_right
+
+if platform.system() == 'Windows':
+    import msvcrt
+else:
+    import fcntl
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
 
 SCRIPT_NAME = '_bin_converter.py'
+SANDBOX_PREFIX = '_bin_converter_'
 ADAMS_LAUNCH_COMMAND = Path('<adams_install_dir>/<version_dir>/common/mdi.bat')
 ADAMS_INSTALL_DIR = Path('C:/Program Files/MSC.Software/Adams')
+LOG_CHECK_INTERVAL = 0.5
+SESSION_CHECK_INTERVAL = 0.05
+INSTALL_CHECK_INTERVAL = 5.0
+BIN_HEADER_SIZE = 4096
+CACHE_DIR = Path.home() / '.adams_bin_converter' / 'cache'
+CACHE_MAX_SIZE = 2**30
+INSTALL_INDEX_FILE = Path.home() / '.adams_bin_converter' / 'install_index.json'
+HISTORY_FILE = Path.home() / '.adams_bin_converter' / 'history.jsonl'
+LICENSE_DIR = Path.home() / '.adams_bin_converter' / 'licenses'
+MODEL_COUNTS = ('Parts', 'Constraints', 'Forces')
+
+_BIN_VERSION_PATTERN = re.compile(rb'version\s([\d\.]*)', flags=re.IGNORECASE)
+_BIN_HEADER_DELETE = bytes(range(32)) + bytes(range(127, 256))
 
 ERR_TEXT = (
     'You must (a) pass the full path to mdi.bat to the adams_launch_command'
@@ -31,43 +73,62 @@ ERR_TEXT = (
 )
 
 
-@dataclass
 class Version():
-    year: int
-    release: int
-    update: int = 0
-    build: int = 0
-    other: Tuple[str] = field(default_factory=tuple)
+    """An Adams version. Versions are immutable, hashable and totally ordered by
+    (year, release, update, build, other).
+    """
+    __slots__ = ('_key',)
+
+    def __init__(self, year: int, release: int, update: int = 0, build: int = 0,
+                 other: Tuple[int] = ()):
+        self._key = (year, release, update, build, tuple(other))
+
+    year = property(lambda self: self._key[0])
+    release = property(lambda self: self._key[1])
+    update = property(lambda self: self._key[2])
+    build = property(lambda self: self._key[3])
+    other = property(lambda self: self._key[4])
+
+    @property
+    def key(self) -> tuple:
+        """tuple: (year, release, update, build, other)"""
+        return self._key
+
+    def __repr__(self):
+        return ('Version(year={}, release={}, update={}, build={}, other={})'.format(*self._key))
+
+    def __str__(self):
+        return '.'.join(str(comp) for comp in self._key[:4] + self._key[4])
+
+    def __eq__(self, other: Version):
+        return self._key == other._key if isinstance(other, Version) else NotImplemented
+
+    def __ne__(self, other: Version):
+        return self._key != other._key if isinstance(other, Version) else NotImplemented
 
     def __ge__(self, other: Version):
-        if self == other:
-            return True
-        else:
-            return self.__gt__(self, other)
+        return self._key >= other._key if isinstance(other, Version) else NotImplemented
 
     def __gt__(self, other: Version):
-        chronological = sorted([self, other], key=lambda v: (v.year, v.release, v.update, v.build))
-        return chronological.index(self) == 1
+        return self._key > other._key if isinstance(other, Version) else NotImplemented
 
     def __le__(self, other: Version):
-        if self == other:
-            return True
-        else:
-            return self.__lt__(self, other)
+        return self._key <= other._key if isinstance(other, Version) else NotImplemented
 
     def __lt__(self, other: Version):
-        chronological = sorted([self, other], key=lambda v: (v.year, v.release, v.update, v.build))
-        return chronological.index(self) == 0
+        return self._key < other._key if isinstance(other, Version) else NotImplemented
 
     def __hash__(self) -> int:
-        return hash(tuple(self.__dict__.values()))
+        return hash(self._key)
 
-    def get_closest_version(self, vers: List[Version], _comp='year'):
+    def get_closest_version(self, vers: List[Version]):
         """Gets the closest version to `:arg:ver` in `:arg:vers`. If a matching year does not exist,
         will take the next highest year. An exception is raised if a higher year does not exist. For
         release, update and build, it also looks for the next highest if a match does not exist. Unlike,
         year, it will allow a lower release, update, or build if a higher one does not exist.
 
+        To resolve many versions against the same list, build a `VersionIndex` once instead.
+
         Parameters
         ----------
         ver : Version
@@ -85,40 +146,7 @@ class Version():
         AdamsVersionError
             Raised if all the versions in `:arg:vers` are older than `:arg:ver`
         """
-        vers = sorted(vers)
-        # Get all with the same comp
-        vers_with_same = list(filter(lambda v: getattr(v, _comp) == getattr(self, _comp), vers))
-
-        # Check if there are any with the same comp
-        if vers_with_same != []:
-            # If there are any versions with the same comp,
-            # Check if there is exactly one
-            if len(vers_with_same) == 1:
-                # If there is exactly one
-                return vers_with_same[0]
-
-            else:
-                comps = list(self.__dict__.keys())
-                next_comp = comps[comps.index(_comp)+1]
-                return self.get_closest_version(vers_with_same, next_comp)
-
-        else:
-            # If no versions with the same comp exist, get all higher versions
-            higher_vers = [v for v in vers if v > self]
-
-            if higher_vers != []:
-                # If there are versions higher than the target, take the first that is higher
-                return higher_vers[0]
-
-            elif _comp != 'year':
-                # If there are no versions higher than the target, and we *ARE NOT* comparing year,
-                # take the next highest one
-                return vers[-1]
-
-            elif _comp == 'year':
-                # If there are no versions higher than the target, and we *ARE* comparing year,
-                # raise an error
-                raise AdamsVersionError(f'No acceptable versions exist for {self}!')
+        return VersionIndex(vers).get_closest_version(self)
 
     @classmethod
     def from_install_dir(cls, install_dir: Union[Path, str]):
@@ -130,15 +158,12 @@ class Version():
 
     @classmethod
     def from_bin_file(cls, bin_file: Union[Path, str]):
-        with Path(bin_file).open('rb') as fid:
-            line = fid.readline()
+        header = read_bin_header(bin_file)
 
-        text = ''.join([ch for ch in line.decode('ascii', errors='ignore')
-                       if unicodedata.category(ch)[0] != "C"])
-        comps = re.findall('version\\s([\\d\\.]*)', text, flags=re.IGNORECASE)[0].split('.')
+        if header.version is None:
+            raise AdamsVersionError(f'No version was found in the header of {bin_file}!')
 
-        year, release, update, build, other = cls._decompose(comps)
-        return cls(year, release, update, build, other)
+        return header.version
 
     @staticmethod
     def _decompose(comps: List[str]):
@@ -164,7 +189,7 @@ class Version():
 
         # Store any other components in a list
         if len(comps) > 3:
-            other = (int(comp) for comp in comps[3:] if len(comp) <= 2)
+            other = tuple(int(comp) for comp in comps[3:] if len(comp) <= 2)
         else:
             other = ()
 
@@ -180,122 +205,657 @@ class Version():
         return {cls.from_install_dir(d): d for d in cls.get_installed_version_dirs(adams_install_dir)}
 
 
-def _write_script(bin_file, complete_code=''):
-    """Writes an Adams View CMD script that opens an Adams View Binary (.bin) file
-    named `:arg:bin_file` and saves it as an Adams View Command (.cmd) file of the same base name.
+class VersionIndex():
+    """A sorted index of versions that finds the closest version to a target by bisection. See
+    `Version.get_closest_version` for the matching rules.
+
+    Parameters
+    ----------
+    vers : List[Version]
+        The versions to search
+
+    """
+    __slots__ = ('versions', '_keys')
+
+    def __init__(self, vers: List[Version]):
+        self.versions = sorted(set(vers))
+        self._keys = [v.key for v in self.versions]
+
+    def get_closest_version(self, ver: Version):
+        """Gets the closest version to `:arg:ver` in the index. See `Version.get_closest_version`.
+
+        Raises
+        ------
+        AdamsVersionError
+            Raised if all the versions in the index are older than `:arg:ver`
+        """
+        keys, key = self._keys, ver.key
+        lo, hi = 0, len(keys)
+
+        # Narrow down to the versions matching year, then release, then update, then build...
+        for comp in range(len(key)):
+            if comp < len(key) - 1:
+                # Tuples shorter than the keys sort before them, and x.5 sorts between x and x+1
+                match_lo = bisect_left(keys, key[:comp + 1], lo, hi)
+                match_hi = bisect_left(keys, key[:comp] + (key[comp] + 0.5,), lo, hi)
+            else:
+                match_lo = bisect_left(keys, key, lo, hi)
+                match_hi = bisect_right(keys, key, lo, hi)
+
+            if match_hi - match_lo == 1 or (match_hi > match_lo and comp == len(key) - 1):
+                # If there is exactly one match (or the last component matches)
+                return self.versions[match_lo]
+
+            elif match_hi > match_lo:
+                # If there are several matches, compare the next component
+                lo, hi = match_lo, match_hi
+
+            else:
+                # If there are no matches, take the first version that is higher
+                higher = bisect_right(keys, key, lo, hi)
+
+                if higher < hi:
+                    return self.versions[higher]
+
+                elif comp > 0:
+                    # If there are no higher versions and we *ARE NOT* comparing year, take the
+                    # highest version
+                    return self.versions[hi - 1]
+
+                else:
+                    # If there are no higher versions and we *ARE* comparing year, raise an error
+                    raise AdamsVersionError(f'No acceptable versions exist for {ver}!')
+
+
+@dataclass
+class BinHeader():
+    """Metadata read from the header of an Adams View Binary (.bin) file."""
+    bin_file: Path
+    text: str
+    size: int
+    version_string: str = None
+    version: Version = None
+    error: str = None
+
+
+def read_bin_header(bin_file: Union[Path, str]):
+    """Reads the header of the Adams View Binary (.bin) file `:arg:bin_file`. Only the first
+    `BIN_HEADER_SIZE` bytes of the file are read, no matter how big it is.
 
     Parameters
     ----------
     bin_file : str or Path
-        The filename of the Adams View Binary (.bin) file to be converted.
+        The Adams View Binary (.bin) file
+
+    Returns
+    -------
+    BinHeader
+        The header metadata. `version` is None if the header does not contain a version.
+
+    """
+    bin_file = Path(bin_file)
+    with bin_file.open('rb') as fid:
+        size = os.fstat(fid.fileno()).st_size
+        prefix = fid.read(BIN_HEADER_SIZE)
+
+    # Take the first line and drop non-ascii and control characters
+    line = prefix.split(b'\n', 1)[0].translate(None, _BIN_HEADER_DELETE)
+    text = line.decode('ascii')
+
+    header = BinHeader(bin_file, text, size)
+    match = _BIN_VERSION_PATTERN.search(line)
+    if match is not None and match.group(1).strip(b'.') != b'':
+        header.version_string = match.group(1).decode('ascii')
+        header.version = Version(*Version._decompose(header.version_string.split('.')))
+
+    return header
+
+
+def probe_headers(bin_files, max_workers=8):
+    """Reads the headers of all `:arg:bin_files` on a pool of `:arg:max_workers` threads.
+
+    Returns
+    -------
+    List[BinHeader]
+        One header per .bin file, in the same order as `:arg:bin_files`. If a file cannot be read
+        its header is empty and `error` says why.
+
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_try_read_bin_header, bin_files))
+
+
+def _try_read_bin_header(bin_file: Union[Path, str]):
+    try:
+        return read_bin_header(bin_file)
+    except OSError as err:
+        return BinHeader(Path(bin_file), '', None, error=f'Unable to read {bin_file}: {err}')
+
+
+def _write_script(bin_files, complete_code='', sim_dir=None, list_models=False, models=None):
+    """Writes an Adams View Python script that opens each Adams View Binary (.bin) file in
+    `:arg:bin_files` and saves every model it contains as an Adams View Command (.cmd) file in the
+    same directory as the .bin file. The database is cleared between files so that all the files
+    can be converted in a single Adams View session.
+
+    Files in `:arg:bin_files` that are None are left out of the script, but the other files keep
+    their index. If `:arg:models` is given, only the models whose names match one of its glob
+    patterns (ignoring case) are saved. If `:arg:list_models` is True, the name and size of each model are written to
+    the log instead of saving the models (see `list_models`).
+
+    Parameters
+    ----------
+    bin_files : str or Path or List[str or Path]
+        The filename(s) of the Adams View Binary (.bin) file(s) to be converted.
     complete_code : str, optional
         A string to write to the end of the script to indicate completion, by default ''
+    sim_dir : str or Path, optional
+        Directory to write the script to, by default the directory of the first .bin file
+    list_models : bool, optional
+        If True, list the models in each file rather than writing them, by default False
+    models : List[str], optional
+        Names or glob patterns of the models to write, by default all the models are written
 
     Returns
     -------
-    Path
-        Filename of the Adams View Command (.cmd) file that will be created by the script.
+    Path or List[Path]
+        Filename(s) of the Adams View Command (.cmd) file(s) that will be created by the script.
 
     """
-    bin_file = Path(bin_file)
-    cmd_file = bin_file.with_suffix('.cmd')
+    single = isinstance(bin_files, (str, Path))
+    bin_files = [Path(bin_files)] if single else [Path(f) if f is not None else None for f in bin_files]
+    sim_dir = Path(sim_dir) if sim_dir is not None else next(f for f in bin_files if f).parent
 
-    with open(bin_file.parent / SCRIPT_NAME, 'w') as fid:
+    with open(sim_dir / SCRIPT_NAME, 'w') as fid:
 
         # Echo the starting message
         fid.write(f'print("! -- SCRIPT STARTING {complete_code} --")\n')
 
+        fid.write('import fnmatch\n')
+        fid.write('import json\n')
+        fid.write('import os\n')
+        fid.write('import time\n')
         fid.write('import Adams\n')
 
+        # List the binary files and the directories to write their command files to
+        fid.write('bin_files = [\n')
+        for idx, bin_file in enumerate(bin_files):
+            if bin_file is not None:
+                fid.write(f'    ({idx}, {str(bin_file.absolute())!r}, {str(bin_file.absolute().parent)!r}),\n')
+        fid.write(']\n')
+
+        # The models to write, or None for all of them
+        fid.write(f'patterns = {[m.upper() for m in models] if models is not None else None!r}\n')
+
+        # Loop over all the binary files
+        fid.write('for idx, bin_file, out_dir in bin_files:\n')
+        fid.write('    start = time.time()\n')
+        fid.write('    try:\n')
+
         # Load the binary file
-        fid.write(f'Adams.read_binary_file("{bin_file.name}")\n')
+        fid.write('        Adams.read_binary_file(bin_file)\n')
 
-        # Loop over all the models in the databas
-        fid.write(f'for mod in Adams.Models.values():\n')
+        if list_models is True:
 
-        # Write the command file
-        fid.write(f'   Adams.write_command_file(file_name=f"{{mod.name}}.cmd", model=mod)\n')
+            # Loop over all the models in the database and report their names and sizes
+            fid.write('        for mod in list(Adams.Models.values()):\n')
+            fid.write('            info = {"name": mod.name}\n')
+            fid.write(f'            for attr in {MODEL_COUNTS!r}:\n')
+            fid.write('                info[attr.lower()] = len(getattr(mod, attr, {}))\n')
+            fid.write(f'            print(f"! -- MODEL FOUND {complete_code} {{idx}} {{json.dumps(info)}} --")\n')
+
+        else:
+
+            # Loop over the requested models in the database and write the command files
+            fid.write('        mods = [mod for mod in Adams.Models.values() if patterns is None or\n')
+            fid.write('                any(fnmatch.fnmatchcase(mod.name.upper(), p) for p in patterns)]\n')
+            fid.write('        if patterns is not None and mods == []:\n')
+            fid.write('            raise RuntimeError(f"No models matching {patterns} were found")\n')
+            fid.write('        for mod in mods:\n')
+            fid.write('            cmd_file = os.path.join(out_dir, f"{mod.name}.cmd")\n')
+            fid.write('            Adams.write_command_file(file_name=cmd_file, model=mod)\n')
+            fid.write(f'            print(f"! -- FILE WRITTEN {complete_code} {{idx}} {{cmd_file}} --")\n')
+        fid.write(f'        print(f"! -- FILE COMPLETE {complete_code} {{idx}} {{time.time() - start:.3f}} --")\n')
+
+        # Report the failure on a single line and carry on with the next file
+        fid.write('    except Exception as err:\n')
+        fid.write('        message = " ".join(str(err).split())\n')
+        fid.write(f'        print(f"! -- FILE FAILED {complete_code} {{idx}} {{time.time() - start:.3f}} {{message}} --")\n')
+
+        # Clear the database before the next file
+        fid.write('    finally:\n')
+        fid.write('        for mod in list(Adams.Models.values()):\n')
+        fid.write('            Adams.execute_cmd(f"model delete model_name = {mod.name}")\n')
 
         # Echo the completion message
         fid.write(f'print("! -- SCRIPT COMPLETE {complete_code} --")\n')
 
-    return cmd_file
+    cmd_files = [bin_file.with_suffix('.cmd') if bin_file is not None else None for bin_file in bin_files]
+
+    return cmd_files[0] if single else cmd_files
 
 
-def _check_if_complete(sim_dir, complete_code=''):
-    """Checks the aview.log file in `:arg:cwd` to see if it has written the completion message.
+def _read_results(follower: LogFollower, bin_files):
+    """Reads the per file results written to the aview.log file followed by `:arg:follower` by a
+    script written by `_write_script`.
 
     Parameters
     ----------
-    cwd : str or Path
-        Working directory
-    complete_code : str, optional
-        A string to write to the end of the script to indicate completion, by default ''
+    follower : LogFollower
+        Follower of the aview.log file of the session that ran the script
+    bin_files : List[str or Path]
+        The .bin files passed to `_write_script`, in the same order
 
     Returns
     -------
-    bool
-        True if the completion message is found in the log file
+    List[ConversionResult]
+        One result per .bin file, in the same order as `:arg:bin_files`
 
     """
-    log_file = Path(sim_dir) / 'aview.log'
+    # Pick up anything written since the follower was last polled
+    follower.poll(final=True)
 
-    # Check if the log file exists
-    if not log_file.exists():
-        # If the log file does not exist yet
-        result = False
+    return [_read_result(follower, bin_file, idx) for idx, bin_file in enumerate(bin_files)]
 
-    else:
-        # If the log file does exist, examine the contents for completion
-        with open(Path(sim_dir) / 'aview.log', 'r') as fid:
-            text = fid.read()
 
-        if f'! -- SCRIPT COMPLETE {complete_code} --' in text:
-            result = True
+def _read_result(follower: LogFollower, bin_file, idx: int):
+    """Reads the result for the file at index `:arg:idx` of the script from the events seen so far
+    by `:arg:follower`. See `_read_results`.
+    """
+    result = ConversionResult(Path(bin_file))
+    completed = False
+
+    for event in follower.events:
+        if event.index != idx:
+            continue
 
-        elif '! Command file is exhausted,' in text and f'! -- SCRIPT STARTING {complete_code} --' in text:
-            raise RuntimeError('The Adams View Script did not execute properly!')
+        if event.kind == LogEvent.FILE_WRITTEN:
+            result.cmd_files.append(Path(event.info))
 
-        else:
-            result = False
+        elif event.kind in (LogEvent.FILE_COMPLETE, LogEvent.FILE_FAILED):
+            # The time Adams View spent on the file comes first, followed by any error message
+            duration, _, message = event.info.partition(' ')
+            try:
+                result.duration = float(duration)
+            except ValueError:
+                message = event.info
+
+            if event.kind == LogEvent.FILE_COMPLETE:
+                completed = True
+            else:
+                result.error = message or 'Adams View failed to convert the file!'
+
+    if completed is False and result.error is None:
+        result.error = 'The Adams View Script did not execute properly!'
+
+    return result
+
+
+@dataclass
+class LogEvent():
+    """An event parsed from an aview.log file by a `LogFollower`."""
+    STARTED = 'SCRIPT STARTING'
+    COMPLETE = 'SCRIPT COMPLETE'
+    EXHAUSTED = 'EXHAUSTED'
+    ERROR = 'ERROR'
+    FILE_WRITTEN = 'FILE WRITTEN'
+    FILE_COMPLETE = 'FILE COMPLETE'
+    FILE_FAILED = 'FILE FAILED'
+    MODEL_FOUND = 'MODEL FOUND'
+
+    kind: str
+    index: int = None
+    info: str = ''
+
+
+class LogFollower():
+    """Follows an aview.log file as Adams View writes it. Each call to `poll` only reads the bytes
+    appended since the previous call. Incomplete lines are held back until the rest of the line has
+    been written so that markers split across reads are still found.
+
+    Parameters
+    ----------
+    log_file : str or Path
+        The aview.log file to follow. It does not need to exist yet.
+    complete_code : str, optional
+        The string passed to `_write_script`, by default ''
+
+    Attributes
+    ----------
+    on_event : Callable[[LogEvent], None]
+        Called with each new event as it is read, by default None
+
+    """
+    def __init__(self, log_file, complete_code=''):
+        self.log_file = Path(log_file)
+        self.complete_code = complete_code
+        self.offset = 0
+        self.first_activity = None
+        self.events: List[LogEvent] = []
+        self.on_event = None
+        self._kinds = set()
+        self._partial = b''
+        self._pattern = re.compile(
+            f'! -- ({LogEvent.STARTED}|{LogEvent.COMPLETE}|{LogEvent.FILE_WRITTEN}|'
+            f'{LogEvent.FILE_COMPLETE}|{LogEvent.FILE_FAILED}|{LogEvent.MODEL_FOUND}) '
+            f'{re.escape(complete_code)}'
+            '(?: (\\d+))? ?(.*?) --'
+        )
+
+    def poll(self, final=False) -> List[LogEvent]:
+        """Reads any newly appended lines and returns the events they contain. If `:arg:final` is
+        True, a trailing line without a newline is also parsed (use once the writer has exited).
+        """
+        try:
+            with open(self.log_file, 'rb') as fid:
+
+                # Start again if the log has been replaced by a shorter one
+                if os.fstat(fid.fileno()).st_size < self.offset:
+                    self.offset, self._partial = 0, b''
+
+                fid.seek(self.offset)
+                data = fid.read()
+
+        except FileNotFoundError:
+            return []
+
+        if data and self.first_activity is None:
+            self.first_activity = monotonic()
+
+        self.offset += len(data)
+        lines = (self._partial + data).split(b'\n')
+        self._partial = b'' if final is True else lines.pop()
+
+        new_events = [e for e in map(self._parse, lines) if e is not None]
+        self.events += new_events
+        self._kinds.update(event.kind for event in new_events)
+
+        if self.on_event is not None:
+            for event in new_events:
+                self.on_event(event)
+
+        return new_events
+
+    def _parse(self, line: bytes):
+        line = line.decode('utf-8', errors='ignore').rstrip('\r')
+
+        if '! -- ' in line:
+            match = self._pattern.search(line)
+            if match is not None:
+                kind, idx, info = match.groups()
+                return LogEvent(kind, int(idx) if idx is not None else None, info)
+
+        elif '! Command file is exhausted,' in line:
+            return LogEvent(LogEvent.EXHAUSTED)
+
+        elif 'ERROR:' in line:
+            return LogEvent(LogEvent.ERROR, info=line.strip())
+
+        return None
+
+    def has(self, kind: str):
+        """Returns True if an event of type `:arg:kind` has been seen."""
+        return kind in self._kinds
+
+
+def _check_if_complete(follower: LogFollower):
+    """Polls `:arg:follower` to see if the script has written the completion message.
+
+    Parameters
+    ----------
+    follower : LogFollower
+        Follower of the aview.log file of the session running the script
+
+    Returns
+    -------
+    bool
+        True if the completion message has been written to the log file
+
+    Raises
+    ------
+    RuntimeError
+        Raised if Adams View reached the end of the script without completing it
+
+    """
+    follower.poll()
+
+    if follower.has(LogEvent.COMPLETE):
+        result = True
+
+    elif follower.has(LogEvent.EXHAUSTED) and follower.has(LogEvent.STARTED):
+        raise RuntimeError('The Adams View Script did not execute properly!')
+
+    else:
+        result = False
 
     return result
 
 
-def _wait_for_completion(sim_dir, complete_code=''):
+def _wait_for_completion(sim_dir, complete_code='', process: subprocess.Popen = None,
+                         follower: LogFollower = None, timeout: float = None, deadline: float = None,
+                         wait_for_exit=True, check_interval: float = None,
+                         wake: threading.Event = None):
     """Waits for the script running in `:arg:sim_dir` to complete.
 
+    Rather than polling on a fixed interval, the wait wakes up as soon as `:arg:process` exits or,
+    if the optional `watchdog` package is installed, as soon as the aview.log file changes. Without
+    `watchdog` the log is checked every `LOG_CHECK_INTERVAL` seconds while the process is running.
+
+    If nothing new is written to the log for `:arg:timeout` seconds, or the `time.monotonic` clock
+    passes `:arg:deadline`, the session is considered hung and the whole Adams View process tree is
+    terminated.
+
     Parameters
     ----------
     sim_dir : str or Path
         Directory in which the script is running
     complete_code : str, optional
         A string to write to the end of the script to indicate completion, by default ''
+    process : subprocess.Popen, optional
+        The Adams View process running the script, by default None
+    follower : LogFollower, optional
+        Follower of the aview.log file in `:arg:sim_dir`, by default a new one is created
+    timeout : float, optional
+        Seconds to wait for the log to show progress before giving up, by default None (no limit)
+    deadline : float, optional
+        `time.monotonic` time after which to give up, by default None (no limit)
+    wait_for_exit : bool, optional
+        If True, wait for `:arg:process` to exit once the script has completed, by default True
+    check_interval : float, optional
+        Seconds between checks of the log, by default `LOG_CHECK_INTERVAL`
+    wake : threading.Event, optional
+        An event the caller sets when `:arg:process` exits, e.g. for a long running process that
+        is waited on many times. By default a thread is started to wait for `:arg:process`
+
+    Returns
+    -------
+    LogFollower
+        The follower holding the events read from the aview.log file
+
+    Raises
+    ------
+    RuntimeError
+        Raised if the script did not execute properly or `:arg:process` exited before the script
+        completed
+    AdamsTimeoutError
+        Raised if `:arg:timeout` or `:arg:deadline` is exceeded
 
     """
-    while True:
+    if follower is None:
+        follower = LogFollower(Path(sim_dir) / 'aview.log', complete_code)
 
-        # Check if the script has completed
-        if _check_if_complete(sim_dir, complete_code) is True:
+    check_interval = check_interval if check_interval is not None else LOG_CHECK_INTERVAL
 
-            # If the script has completed, Retrun
-            return
+    if wake is None:
+        wake = threading.Event()
 
-        else:
+        if process is not None:
+            # Wake up as soon as the process exits
+            threading.Thread(target=lambda: (process.wait(), wake.set()), daemon=True).start()
+
+    last_progress, offset = monotonic(), follower.offset
+
+    def _limit():
+        """Returns the time at which to give up, or None if there is no limit"""
+        limits = [t for t in (deadline, last_progress + timeout if timeout else None) if t]
+        return min(limits) if limits else None
+
+    with _watch_log(sim_dir, wake):
+        while True:
+            wake.clear()
+
+            # Check if the script has completed
+            if _check_if_complete(follower) is True:
+
+                # If the script has completed, wait for Adams View to exit and return
+                if process is not None and wait_for_exit is True:
+                    limit = _limit()
+                    try:
+                        process.wait(None if limit is None else max(0, limit - monotonic()))
+                    except subprocess.TimeoutExpired:
+                        _kill_process_tree(process)
+                return follower
+
+            elif process is not None and process.poll() is not None:
+
+                # The process may have written the completion message just before it exited
+                follower.poll(final=True)
+                if _check_if_complete(follower) is True:
+                    return follower
+
+                raise RuntimeError(f'Adams View exited with code {process.returncode} before the '
+                                   'script completed!')
+
+            # Anything new in the log counts as progress
+            if follower.offset != offset:
+                last_progress, offset = monotonic(), follower.offset
+
+            # Give up if the session has hung
+            limit = _limit()
+            if limit is not None and monotonic() >= limit:
+                if process is not None:
+                    _kill_process_tree(process)
+                raise AdamsTimeoutError('Adams View did not finish in time and was terminated!')
+
+            # If the script has *NOT* completed, wait for something to happen before repeating
+            wake.wait(check_interval if limit is None else min(check_interval, limit - monotonic()))
+
+
+def _kill_process_tree(process: subprocess.Popen):
+    """Terminates `:arg:process` and any processes it started (e.g. the Adams View executable
+    started by mdi.bat).
+    """
+    if process.poll() is None:
+        _signal_process_tree(process)
+
+    process.wait()
+
+
+def _signal_process_tree(process):
+    """Kills `:arg:process` (a `subprocess.Popen` or `asyncio.subprocess.Process`) and any
+    processes it started without waiting for it to exit.
+    """
+    if platform.system() == 'Windows':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)], capture_output=True)
+
+    else:
+        # The process was started in its own session so it leads its own process group
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+
+
+@contextmanager
+def _watch_log(sim_dir, event: threading.Event):
+    """Sets `:arg:event` whenever the aview.log file in `:arg:sim_dir` changes. Does nothing if
+    the optional `watchdog` package is not installed.
+    """
+    if Observer is None:
+        yield
+        return
+
+    class _Handler(FileSystemEventHandler):
+        def on_any_event(self, fs_event):
+            if Path(fs_event.src_path).name == 'aview.log':
+                event.set()
+
+    observer = Observer()
+    observer.schedule(_Handler(), str(sim_dir), recursive=False)
+    observer.start()
+    try:
+        yield
+    finally:
+        observer.stop()
+        observer.join()
+
+
+def _run_script(sim_dir, adams_cmd, complete_code='', follower: LogFollower = None,
+                timeout: float = None, deadline: float = None, timer: PhaseTimer = None,
+                license_pool: LicensePool = None):
+    """Runs the script in `:arg:sim_dir` using `:arg:adams_cmd` and waits for it to complete.
+    Events from the aview.log file are collected in `:arg:follower` if it is given. See
+    `_wait_for_completion` for `:arg:timeout` and `:arg:deadline`. The time taken to start the
+    process, for Adams View to first write to its log and for the script to be detected as complete
+    are reported to `:arg:timer` if it is given.
+
+    If `:arg:license_pool` is given, Adams View is not started until a token is free and the token
+    is held until the process has exited. A RuntimeError is raised if no token becomes free before
+    `:arg:deadline`.
+
+    Returns
+    -------
+    subprocess.Popen
+        The Adams View process. It has exited by the time this function returns.
+
+    """
+    if license_pool is not None:
+        wait = max(0, deadline - monotonic()) if deadline is not None else None
+        with _timed(timer, 'license_wait', session=Path(sim_dir).name):
+            token = license_pool.acquire(adams_cmd, wait)
+
+    try:
+        spawn_start = monotonic()
+        process = _start_adams(sim_dir, adams_cmd)
+        spawned = monotonic()
+
+        # Wait for the script to complete before continuing
+        try:
+            follower = _wait_for_completion(sim_dir, complete_code, process, follower, timeout, deadline)
+        except BaseException:
+            # Never leave an orphaned Adams View session holding a license
+            _kill_process_tree(process)
+            raise
+        finally:
+            if timer is not None:
+                timer.record_session(sim_dir, spawn_start, spawned, follower)
+
+    finally:
+        if license_pool is not None:
+            license_pool.release(token)
+
+    return process
 
-            # If the script has *NOT* completed, wait before repeating
-            sleep(0.5)
 
+def _start_adams(sim_dir, adams_cmd):
+    """Starts Adams View running the script in `:arg:sim_dir` using `:arg:adams_cmd`.
 
-def _run_script(sim_dir, adams_cmd, complete_code=''):
+    Returns
+    -------
+    subprocess.Popen
+        The Adams View process
 
+    """
     # Check if the platform is Windows or Unix
     if platform.system() == 'Windows':
 
         # If the platform is Windows
         startupinfo = subprocess.STARTUPINFO()
         startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        subprocess.Popen(
+        process = subprocess.Popen(
             f'"{adams_cmd}" aview ru-standard b {SCRIPT_NAME}',
             cwd=sim_dir,
             startupinfo=startupinfo
@@ -304,56 +864,66 @@ def _run_script(sim_dir, adams_cmd, complete_code=''):
     else:
 
         # If the platform is Unix
-        subprocess.Popen(
-            [adams_cmd, '-c', 'aview', 'ru-standard', 'b', SCRIPT_NAME, 'exit'],
-            cwd=sim_dir
+        process = subprocess.Popen(
+            _adams_args(adams_cmd),
+            cwd=sim_dir,
+            start_new_session=True
         )
 
-    # Wait for the script to complete before continuing
-    _wait_for_completion(sim_dir, complete_code)
+    return process
+
+
+def _adams_args(adams_cmd):
+    """Returns the arguments to run the script with `:arg:adams_cmd` as a list."""
+    if platform.system() == 'Windows':
+        return [str(adams_cmd), 'aview', 'ru-standard', 'b', SCRIPT_NAME]
+    else:
+        return [str(adams_cmd), '-c', 'aview', 'ru-standard', 'b', SCRIPT_NAME, 'exit']
 
 
 def _remove_script(sim_dir):
     os.remove(Path(sim_dir) / SCRIPT_NAME)
 
 
-def _get_adams_launch_command(adams_launch_command=None, bin_file: Path = None, silent=False):
+def _is_launch_command(path):
+    """Returns True if the path exists and is an mdi.bat file"""
+    if path is None:
+        return False
 
-    def _check(path):
-        """Returns True if the path exists and is an mdi.bat file"""
-        path = Path(path)
+    path = Path(path)
 
-        try:
-            result = path.exists() and path.name == 'mdi.bat'
-        except OSError:
-            result = False
+    try:
+        result = path.exists() and path.name == 'mdi.bat'
+    except OSError:
+        result = False
+
+    return result
 
-        return result
 
-    if adams_launch_command is not None and _check(adams_launch_command):
+def _get_adams_launch_command(adams_launch_command=None, bin_file: Path = None, silent=False,
+                              install_index: InstallIndex = None):
+
+    if adams_launch_command is not None and _is_launch_command(adams_launch_command):
         cmd = adams_launch_command
         if silent is False:
             print(f'Using {cmd} as the adams launch command. This path was passed as an argument.')
 
     elif bin_file is not None:
         bin_ver = Version.from_bin_file(bin_file)
-        install_dir = get_install_dir()
-        vers = Version.get_installed_versions(install_dir)
-
-        installed_ver = bin_ver.get_closest_version(list(vers.keys()))
-        cmd = vers[installed_ver] / 'common/mdi.bat'
+        install_index = install_index if install_index is not None else InstallIndex()
+        cmd = install_index.get_launch_command(bin_ver)
 
         if silent is False:
             print(f'Using {cmd} as the adams launch command. This path is based on the version in '
                   f'{Path(bin_file).name}.')
 
-    elif _check(ADAMS_LAUNCH_COMMAND):
+    elif _is_launch_command(ADAMS_LAUNCH_COMMAND):
         cmd = ADAMS_LAUNCH_COMMAND
         if silent is False:
             print(f'Using {cmd} as the adams launch command. This path was taken from the'
                   'ADAMS_LAUNCH_COMMAND module variable.')
 
-    elif 'ADAMS_LAUNCH_COMMAND' in os.environ and _check(os.environ['ADAMS_LAUNCH_COMMAND']):
+    elif 'ADAMS_LAUNCH_COMMAND' in os.environ and _is_launch_command(os.environ['ADAMS_LAUNCH_COMMAND']):
         cmd = os.environ['ADAMS_LAUNCH_COMMAND']
         if silent is False:
             print(f'Using {cmd} as the adams launch command. This path was taken from the '
@@ -379,7 +949,111 @@ def get_install_dir():
     return install_dir
 
 
-def convert(bin_file, adams_launch_command=None, get_version_from_bin=False):
+class InstallIndex():
+    """An index of the Adams versions installed in `:arg:install_dir` and their mdi.bat files.
+
+    The install directory is only scanned when the index is first used and again if the
+    modification time of the install directory changes (i.e. a version is installed or removed).
+    The modification time is checked at most once every `:arg:check_interval` seconds. If
+    `:arg:cache_file` is given the index is also saved to disk so that later runs do not need to
+    scan the install directory at all.
+
+    Parameters
+    ----------
+    install_dir : str or Path, optional
+        The directory containing all the Adams installations, by default `get_install_dir()`
+    cache_file : str or Path, optional
+        A json file to save the index to, by default None (the index is only kept in memory)
+    check_interval : float, optional
+        Seconds between checks of the install directory for changes, by default
+        `INSTALL_CHECK_INTERVAL`
+
+    """
+
+    def __init__(self, install_dir=None, cache_file=None, check_interval=None):
+        self._install_dir = install_dir
+        self.cache_file = Path(cache_file) if cache_file is not None else None
+        self.check_interval = check_interval if check_interval is not None else INSTALL_CHECK_INTERVAL
+        self._checked = None
+        self._mtime = None
+        self._versions = None
+        self._version_index = None
+        self._lock = threading.Lock()
+
+    @property
+    def install_dir(self):
+        if self._install_dir is None:
+            self._install_dir = get_install_dir()
+        return Path(self._install_dir)
+
+    @property
+    def versions(self):
+        """Dict[Version, Path]: The installed versions and their mdi.bat files."""
+        return self._refresh()[0]
+
+    def _refresh(self):
+        """Rescans the install directory if it has changed and returns the versions and their
+        `VersionIndex`.
+        """
+        with self._lock:
+            if self._versions is not None and monotonic() - self._checked < self.check_interval:
+                return self._versions, self._version_index
+
+            self._checked = monotonic()
+            mtime = self.install_dir.stat().st_mtime
+
+            if self._versions is None or mtime != self._mtime:
+                self._versions = self._load(mtime)
+                if self._versions is None:
+                    self._versions = self._scan(mtime)
+                self._version_index = VersionIndex(list(self._versions.keys()))
+                self._mtime = mtime
+
+            return self._versions, self._version_index
+
+    def get_launch_command(self, version: Version):
+        """Returns the mdi.bat file of the installed version closest to `:arg:version`. See
+        `Version.get_closest_version`.
+        """
+        versions, version_index = self._refresh()
+        return versions[version_index.get_closest_version(version)]
+
+    def _scan(self, mtime):
+        versions = {ver: d / 'common/mdi.bat'
+                    for ver, d in Version.get_installed_versions(self.install_dir).items()}
+
+        if self.cache_file is not None:
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                self.cache_file.write_text(json.dumps({
+                    'install_dir': str(self.install_dir),
+                    'mtime': mtime,
+                    'version_dirs': [str(cmd.parent.parent) for cmd in versions.values()],
+                }))
+            except OSError:
+                pass
+
+        return versions
+
+    def _load(self, mtime):
+        if self.cache_file is None:
+            return None
+
+        try:
+            data = json.loads(self.cache_file.read_text())
+        except (OSError, ValueError):
+            return None
+
+        if data.get('install_dir') != str(self.install_dir) or data.get('mtime') != mtime:
+            return None
+
+        return {Version.from_install_dir(d): Path(d) / 'common/mdi.bat' for d in data['version_dirs']}
+
+
+def convert(bin_file, adams_launch_command=None, get_version_from_bin=False, timeout=None, retries=0,
+            retry_delay=1.0, cache: ConversionCache = None, install_index: InstallIndex = None,
+            on_timing=None, metrics: Metrics = None, session_pool: SessionPool = None,
+            scratch_dir=None, models=None, license_pool: LicensePool = None):
     """Converts the Adams View Binary (.bin) file located at `:arg:bin_file` to an Adams View
     Command (.cmd) file of the same base name.
 
@@ -389,6 +1063,38 @@ def convert(bin_file, adams_launch_command=None, get_version_from_bin=False):
         Path to the Adams View Binary (.bin) file to be converted
     adams_launch_command : str or Path, optional
         Path to the mdi.bat file in the local Adams installation, by default None
+    timeout : float, optional
+        Seconds without progress after which the Adams View session is considered hung and is
+        terminated, by default None (no limit)
+    retries : int, optional
+        Number of times to retry if the Adams View session hangs or crashes, by default 0
+    retry_delay : float, optional
+        Seconds to wait before the first retry. The delay doubles for each further retry, by
+        default 1.0
+    cache : ConversionCache, optional
+        Cache to serve unchanged .bin files from without launching Adams View, by default None
+    install_index : InstallIndex, optional
+        Index of the installed Adams versions to use if `:arg:get_version_from_bin` is True, by
+        default the install directory is scanned
+    on_timing : Callable[[dict], None], optional
+        Called with a record of the time taken by each phase of the conversion. See `PhaseTimer`,
+        by default None
+    metrics : Metrics, optional
+        Metrics to record the conversion in, by default None
+    session_pool : SessionPool, optional
+        Pool of Adams View sessions started ahead of time to convert the file in, by default a new
+        session is started
+    scratch_dir : str or Path, optional
+        Local directory to run the conversion in, e.g. when the .bin file is on a slow network
+        share. The .bin file is copied in and the .cmd files are moved back once they are complete,
+        by default the conversion runs next to the .bin file
+    models : List[str], optional
+        Names or glob patterns of the models to write, ignoring case. The conversion fails if the
+        file contains none of them, by default every model is written
+    license_pool : LicensePool, optional
+        Machine wide limit on the number of Adams View sessions, shared with other processes.
+        Adams View is not started until a session is free. If `:arg:session_pool` is given it
+        must have been created with a license pool too, by default None (no limit)
 
     Returns
     -------
@@ -396,41 +1102,2936 @@ def convert(bin_file, adams_launch_command=None, get_version_from_bin=False):
         Path to the Adams View Command (.cmd) file that was created.
 
     """
+    _check_license_pool(session_pool, license_pool)
+    timer = PhaseTimer(on_timing) if on_timing is not None else None
 
-    adams_launch_command = _get_adams_launch_command(
-        adams_launch_command,
-        bin_file=bin_file if get_version_from_bin is True else None,
-    )
+    with _timed(timer, 'launch_command', [bin_file]):
+        adams_launch_command = _get_adams_launch_command(
+            adams_launch_command,
+            bin_file=bin_file if get_version_from_bin is True else None,
+            install_index=install_index,
+        )
 
     bin_file = Path(bin_file)
-    complete_code = str(random())
+    result, = _run_session([bin_file], adams_launch_command, timeout, retries=retries,
+                           retry_delay=retry_delay, cache=cache, timer=timer, metrics=metrics,
+                           session_pool=session_pool, scratch_dir=scratch_dir, models=models,
+                           license_pool=license_pool)
 
-    cmd_file = _write_script(bin_file, complete_code)
-    _run_script(bin_file.parent, adams_launch_command, complete_code)
-    _remove_script(bin_file.parent)
+    if result.success is False:
+        raise RuntimeError(result.error)
 
-    return cmd_file
+    return bin_file.with_suffix('.cmd')
 
 
-class AdamsVersionError(Exception):
-    pass
-
+def convert_many(bin_files, adams_launch_command=None, get_version_from_bin=False, max_workers=1,
+                 batch=True, timeout=None, global_timeout=None, retries=0, retry_delay=1.0,
+                 cache: ConversionCache = None, install_index: InstallIndex = None,
+                 max_workers_per_version=None, on_timing=None, metrics: Metrics = None,
+                 session_pool: SessionPool = None, scratch_dir=None, models=None,
+                 history: DurationHistory = None, license_pool: LicensePool = None):
+    """Converts all the Adams View Binary (.bin) files in `:arg:bin_files` to Adams View Command
+    (.cmd) files. Each model in each .bin file is written to a .cmd file named after the model in
+    the same directory as the .bin file.
 
-if __name__ == '__main__':
-    parser = argparse.ArgumentParser(
-        description='Converts an Adams View Binary (.bin) files to an Adams View Command (.cmd) files.'
-    )
+    Up to `:arg:max_workers` Adams View sessions are run at the same time, each in its own private
+    working directory. If `:arg:batch` is True the files are shared out between the sessions so
+    that each session converts several files. Otherwise a new session is started for each file.
 
-    parser.add_argument(
-        'bin_files',
-        metavar='bin_file',
-        type=str,
-        nargs='+',
-        help='Adams View Binary file(s) to be converted to Adams View Command file(s).'
-    )
+    If `:arg:get_version_from_bin` is True the headers of all the files are read up front and the
+    files are grouped by the Adams installation they need (see `plan_by_version`), so that each
+    installation is only launched once per session rather than once per file.
 
-    parser.add_argument(
-        '--p',
+    Parameters
+    ----------
+    bin_files : List[str or Path]
+        Paths to the Adams View Binary (.bin) files to be converted
+    adams_launch_command : str or Path, optional
+        Path to the mdi.bat file in the local Adams installation, by default None
+    get_version_from_bin : bool, optional
+        If True, the Adams installation for each file is chosen based on the version in the .bin
+        file, unless `:arg:adams_launch_command` is a valid mdi.bat file, by default False
+    max_workers : int, optional
+        Maximum number of Adams View sessions to run at the same time, by default 1
+    batch : bool, optional
+        If True, convert several files in each Adams View session, by default True
+    timeout : float, optional
+        Seconds allowed for each file. A session is considered hung and is terminated if nothing
+        new is written to its log for this long, by default None (no limit)
+    global_timeout : float, optional
+        Seconds allowed for the whole run. Sessions still running are terminated and files not yet
+        converted are reported as failures once this is exceeded, by default None (no limit)
+    retries : int, optional
+        Number of times to retry files whose Adams View session hangs or crashes, by default 0
+    retry_delay : float, optional
+        Seconds to wait before the first retry. The delay doubles for each further retry, by
+        default 1.0
+    cache : ConversionCache, optional
+        Cache to serve unchanged .bin files from without launching Adams View, by default None
+    install_index : InstallIndex, optional
+        Index of the installed Adams versions to use if `:arg:get_version_from_bin` is True, by
+        default the install directory is scanned once for all the files
+    max_workers_per_version : int, optional
+        Maximum number of sessions of the same Adams installation to run at the same time, by
+        default `:arg:max_workers`
+    on_timing : Callable[[dict], None], optional
+        Called with a record of the time taken by each phase of the conversions. See `PhaseTimer`,
+        by default None
+    metrics : Metrics, optional
+        Metrics to record the conversions in, by default None
+    session_pool : SessionPool, optional
+        Pool of Adams View sessions started ahead of time to convert the files in, by default a new
+        session is started for each batch of files
+    scratch_dir : str or Path, optional
+        Local directory to run the conversions in, e.g. when the .bin files are on a slow network
+        share. The .bin files are copied in and the .cmd files are moved back once they are
+        complete, by default each conversion runs next to its .bin files
+    models : List[str], optional
+        Names or glob patterns of the models to write, ignoring case. Files that contain none of
+        them fail, by default every model is written
+    history : DurationHistory, optional
+        History of how long files took to convert. The time taken by each file is added to it and
+        the files expected to take longest are started first, so that one big file does not hold
+        up the end of the run, by default the files are converted in the order given
+    license_pool : LicensePool, optional
+        Machine wide limit on the number of Adams View sessions, shared with other processes. If
+        `:arg:session_pool` is given it must have been created with a license pool too, by default
+        only `:arg:max_workers` limits the number of sessions
+
+    Returns
+    -------
+    List[ConversionResult]
+        One result per .bin file, in the same order as `:arg:bin_files`
+
+    """
+    _check_license_pool(session_pool, license_pool)
+    bin_files = [Path(f) for f in bin_files]
+    results = [None] * len(bin_files)
+
+    for indices, session_results in _iter_sessions(
+        bin_files, adams_launch_command, get_version_from_bin, max_workers, batch, timeout,
+        global_timeout, retries, retry_delay, cache, install_index, max_workers_per_version,
+        PhaseTimer(on_timing) if on_timing is not None else None, metrics, session_pool, scratch_dir,
+        models, history, license_pool
+    ):
+        for i, result in zip(indices, session_results):
+            results[i] = result
+
+    return results
+
+
+def iter_convert(bin_files, adams_launch_command=None, get_version_from_bin=False, max_workers=1,
+                 batch=True, timeout=None, global_timeout=None, retries=0, retry_delay=1.0,
+                 cache: ConversionCache = None, install_index: InstallIndex = None,
+                 max_workers_per_version=None, on_timing=None, metrics: Metrics = None,
+                 session_pool: SessionPool = None, scratch_dir=None, models=None,
+                 history: DurationHistory = None, license_pool: LicensePool = None):
+    """Converts the Adams View Binary (.bin) files in `:arg:bin_files` like `convert_many`, but
+    yields the result for each file as soon as Adams View finishes with it rather than waiting for
+    the whole run. The .cmd files of a file are in place by the time its result is yielded, even if
+    the rest of its session is still running.
+
+    Results are yielded in the order the files finish, not the order of `:arg:bin_files`.
+    Files that cannot be converted at all (e.g. no suitable Adams installation) are yielded first.
+    Sessions not yet started are cancelled if the generator is closed early.
+
+    See `convert_many` for a description of the parameters.
+
+    Yields
+    ------
+    ConversionResult
+        The result for each .bin file
+
+    """
+    _check_license_pool(session_pool, license_pool)
+    bin_files = [Path(f) for f in bin_files]
+
+    for _, session_results in _iter_sessions(
+        bin_files, adams_launch_command, get_version_from_bin, max_workers, batch, timeout,
+        global_timeout, retries, retry_delay, cache, install_index, max_workers_per_version,
+        PhaseTimer(on_timing) if on_timing is not None else None, metrics, session_pool, scratch_dir,
+        models, history, license_pool, incremental=True
+    ):
+        yield from session_results
+
+
+def _iter_sessions(bin_files: List[Path], adams_launch_command, get_version_from_bin, max_workers,
+                   batch, timeout, global_timeout, retries, retry_delay, cache, install_index,
+                   max_workers_per_version, timer=None, metrics=None, session_pool=None,
+                   scratch_dir=None, models=None, history=None, license_pool=None,
+                   incremental=False):
+    """Runs the sessions needed to convert `:arg:bin_files` and yields the indices of the files
+    converted in each session along with their results as each session finishes. See
+    `convert_many`.
+
+    If `:arg:incremental` is True, each file is published and yielded on its own as soon as Adams
+    View reports it finished, and only the files its session did not report are yielded once the
+    session finishes.
+    """
+    max_workers = max(1, min(max_workers, len(bin_files)))
+    deadline = monotonic() + global_timeout if global_timeout is not None else None
+
+    results, sessions, per_version = _plan_sessions(
+        bin_files, adams_launch_command, get_version_from_bin, install_index, max_workers,
+        max_workers_per_version, batch, timer, history
+    )
+
+    # Files that cannot be converted already have a result
+    failed = [i for i, result in enumerate(results) if result is not None]
+    if failed:
+        if metrics is not None:
+            metrics.record([results[i] for i in failed])
+        yield failed, [results[i] for i in failed]
+
+    if metrics is not None:
+        metrics.queued(sum(len(indices) for _, indices in sessions))
+
+    # Results reported by the sessions as each file finishes, then each session once it finishes
+    reports = SimpleQueue()
+
+    # Limit the number of sessions of each version running at the same time
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    scheduler = _SessionScheduler(executor, per_version)
+    futures = {}
+    try:
+        futures = {
+            scheduler.submit(
+                cmd,
+                _run_queued_session,
+                [bin_files[i] for i in indices],
+                cmd,
+                timeout=timeout,
+                deadline=deadline,
+                retries=retries,
+                retry_delay=retry_delay,
+                cache=cache,
+                timer=timer,
+                metrics=metrics,
+                session_pool=session_pool,
+                scratch_dir=scratch_dir,
+                models=models,
+                history=history,
+                license_pool=license_pool,
+                on_result=(lambda i, result, indices=indices: reports.put(([indices[i]], [result])))
+                if incremental is True else None,
+            ): indices for cmd, indices in sessions
+        }
+        for future in futures:
+            future.add_done_callback(reports.put)
+
+        yielded, remaining = set(), len(futures)
+        while remaining > 0:
+            report = reports.get()
+
+            if isinstance(report, Future):
+                # Anything the session did not report as it went
+                remaining -= 1
+                rest = [(i, result) for i, result in zip(futures[report], report.result())
+                        if i not in yielded]
+                if rest:
+                    yield [i for i, _ in rest], [result for _, result in rest]
+
+            else:
+                yielded.update(report[0])
+                yield report
+
+    finally:
+        # Don't start any more sessions if the caller stops early
+        scheduler.close()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+        if metrics is not None:
+            metrics.dequeued(sum(len(indices) for f, indices in futures.items() if f.cancelled()))
+
+
+def _plan_sessions(bin_files: List[Path], adams_launch_command, get_version_from_bin, install_index,
+                   max_workers, max_workers_per_version, batch, timer: PhaseTimer = None,
+                   history: DurationHistory = None):
+    """Works out which Adams installation to convert each of `:arg:bin_files` with and shares the
+    files out between sessions. See `convert_many`.
+
+    If `:arg:history` is given, the files are shared out so that the sessions take about the same
+    time and the sessions expected to take longest come first.
+
+    Returns
+    -------
+    List[ConversionResult]
+        One entry per .bin file. Files that cannot be converted already have a failed result, the
+        rest are None
+    List[Tuple[Path, List[int]]]
+        The mdi.bat file and the indices of the files to convert for each session
+    int
+        The maximum number of sessions of the same installation to run at the same time
+
+    """
+    per_version = max(1, min(max_workers_per_version or max_workers, max_workers))
+    results = [None] * len(bin_files)
+
+    # Work out which Adams installation to convert each file with
+    if get_version_from_bin is True and not _is_launch_command(adams_launch_command):
+        with _timed(timer, 'probe_headers', bin_files):
+            groups = plan_by_version(bin_files, install_index, max_workers=max(max_workers, 8))
+
+        for group in groups:
+            if group.error is None:
+                print(f'Using {group.adams_launch_command} as the adams launch command for '
+                      f'{len(group.indices)} file(s). This path is based on the versions in the files.')
+    else:
+        try:
+            with _timed(timer, 'launch_command', bin_files):
+                adams_launch_command = _get_adams_launch_command(adams_launch_command)
+            groups = [VersionGroup(adams_launch_command, list(range(len(bin_files))))]
+        except EnvironmentError as err:
+            groups = [VersionGroup(None, list(range(len(bin_files))), error=str(err))]
+
+    sessions = []
+    for group in groups:
+
+        if group.error is not None:
+            for i in group.indices:
+                results[i] = ConversionResult(bin_files[i], error=group.error)
+            continue
+
+        # Share the files in each group out between that group's sessions
+        cmd = group.adams_launch_command
+        n_sessions = min(per_version, len(group.indices)) if batch is True else len(group.indices)
+        if history is not None:
+            estimates = history.estimate([bin_files[i] for i in group.indices])
+            sessions += [(cmd, indices, load) for indices, load in
+                         _longest_first(group.indices, estimates, n_sessions)]
+        elif batch is True:
+            sessions += [(cmd, group.indices[i::n_sessions], None) for i in range(n_sessions)]
+        else:
+            sessions += [(cmd, [i], None) for i in group.indices]
+
+    if history is not None:
+        sessions.sort(key=lambda session: session[2], reverse=True)
+
+    return results, [(cmd, indices) for cmd, indices, _ in sessions], per_version
+
+
+def _longest_first(indices: List[int], estimates: List[float], n_sessions: int):
+    """Shares `:arg:indices` out between `:arg:n_sessions` sessions, longest estimate first, each
+    to the session with the least work so far.
+
+    Returns
+    -------
+    List[Tuple[List[int], float]]
+        The indices in each session, longest first, and the total estimate of each session
+
+    """
+    sessions = [[] for _ in range(n_sessions)]
+    loads = [(0.0, k) for k in range(n_sessions)]
+    for estimate, i in sorted(zip(estimates, indices), key=lambda pair: pair[0], reverse=True):
+        load, k = heapq.heappop(loads)
+        sessions[k].append(i)
+        heapq.heappush(loads, (load + estimate, k))
+
+    totals = {k: load for load, k in loads}
+    return [(sessions[k], totals[k]) for k in range(n_sessions) if sessions[k]]
+
+
+@dataclass
+class VersionGroup():
+    """A group of .bin files to be converted with the same Adams installation."""
+    adams_launch_command: Path
+    indices: List[int] = field(default_factory=list)
+    version: Version = None
+    error: str = None
+
+
+def plan_by_version(bin_files, install_index: InstallIndex = None, max_workers=8):
+    """Reads the headers of all `:arg:bin_files` and groups the files by the installed Adams
+    version closest to the version each file was saved with (see `Version.get_closest_version`).
+
+    Parameters
+    ----------
+    bin_files : List[str or Path]
+        Paths to the Adams View Binary (.bin) files
+    install_index : InstallIndex, optional
+        Index of the installed Adams versions, by default the install directory is scanned
+    max_workers : int, optional
+        Number of threads to read the headers on, by default 8
+
+    Returns
+    -------
+    List[VersionGroup]
+        The groups, in order of the first file in each group. Files whose installation could not
+        be determined are each put in a group of their own with the `error` set.
+
+    """
+    install_index = install_index if install_index is not None else InstallIndex()
+    groups = {}
+    failed = []
+
+    for i, header in enumerate(probe_headers(bin_files, max_workers)):
+        if header.error is not None:
+            failed.append(VersionGroup(None, [i], error=header.error))
+            continue
+
+        try:
+            if header.version is None:
+                raise AdamsVersionError(f'No version was found in the header of {header.bin_file}!')
+
+            adams_launch_command = install_index.get_launch_command(header.version)
+
+        except (AdamsVersionError, EnvironmentError) as err:
+            failed.append(VersionGroup(None, [i], error=str(err)))
+            continue
+
+        if adams_launch_command not in groups:
+            groups[adams_launch_command] = VersionGroup(
+                adams_launch_command,
+                version=Version.from_install_dir(adams_launch_command.parent.parent)
+            )
+        groups[adams_launch_command].indices.append(i)
+
+    return list(groups.values()) + failed
+
+
+class _SessionScheduler():
+    """Submits sessions to `:arg:executor` only while fewer than `:arg:per_version` sessions of the
+    same installation are running. Sessions waiting for a busy installation are held back here
+    rather than in the executor, so they never take a thread from sessions of other installations.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, per_version: int):
+        self.executor = executor
+        self.per_version = per_version
+        self._running = {}
+        self._waiting = {}
+        self._futures = []
+        self._closed = False
+        self._lock = threading.RLock()
+
+    def submit(self, adams_launch_command, fn, *args, **kwargs):
+        """Schedules `fn(*args, **kwargs)` as a session of `:arg:adams_launch_command`.
+
+        Returns
+        -------
+        Future
+            The result of the session
+
+        """
+        future = Future()
+        with self._lock:
+            self._futures.append(future)
+            self._waiting.setdefault(adams_launch_command, deque()).append((future, fn, args, kwargs))
+            self._dispatch(adams_launch_command)
+
+        return future
+
+    def wait(self):
+        """Waits until every session submitted so far has finished."""
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures)
+
+    def close(self):
+        """Cancels the sessions that have not been passed to the executor yet."""
+        with self._lock:
+            self._closed = True
+            for waiting in self._waiting.values():
+                while waiting:
+                    waiting.popleft()[0].cancel()
+
+    def _dispatch(self, cmd):
+        with self._lock:
+            waiting = self._waiting[cmd]
+            while waiting and self._running.get(cmd, 0) < self.per_version:
+                future, fn, args, kwargs = waiting.popleft()
+                if self._closed or future.cancelled():
+                    future.cancel()
+                    continue
+
+                self._running[cmd] = self._running.get(cmd, 0) + 1
+                try:
+                    task = self.executor.submit(self._run, cmd, future, fn, args, kwargs)
+                except RuntimeError:
+                    # The executor has been shut down
+                    self._running[cmd] -= 1
+                    future.cancel()
+                    continue
+
+                task.add_done_callback(lambda task, cmd=cmd, future=future: self._done(cmd, future, task))
+
+    def _done(self, cmd, future: Future, task: Future):
+        # A task cancelled by shutting the executor down never ran
+        if task.cancelled():
+            future.cancel()
+            self._release(cmd)
+
+    def _run(self, cmd, future: Future, fn, args, kwargs):
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as err:
+                    future.set_exception(err)
+        finally:
+            self._release(cmd)
+
+    def _release(self, cmd):
+        with self._lock:
+            self._running[cmd] -= 1
+            self._dispatch(cmd)
+
+
+def _run_queued_session(bin_files: List[Path], adams_launch_command, **kwargs):
+    """Runs `_run_session` for a session taken off the queue. Errors are reported in the returned
+    results rather than raised.
+    """
+    metrics = kwargs.get('metrics')
+
+    if metrics is not None:
+        metrics.dequeued(len(bin_files))
+
+    try:
+        return _run_session(bin_files, adams_launch_command, **kwargs)
+    except Exception as err:
+        results = [ConversionResult(bin_file, error=str(err)) for bin_file in bin_files]
+        if metrics is not None:
+            metrics.record(results)
+        return results
+
+
+def _run_session(bin_files: List[Path], adams_launch_command, timeout=None, deadline=None,
+                 retries=0, retry_delay=1.0, cache: ConversionCache = None, timer: PhaseTimer = None,
+                 metrics: Metrics = None, session_pool: SessionPool = None, scratch_dir=None,
+                 models=None, history: DurationHistory = None, license_pool: LicensePool = None,
+                 on_result=None):
+    """Converts `:arg:bin_files` in a single Adams View session using `:arg:adams_launch_command`.
+
+    The session runs in a private sandbox directory created in `:arg:scratch_dir`, or next to the
+    first .bin file if it is None. Each .bin file is linked (or copied) into its own subdirectory of
+    the sandbox and the .cmd files are only moved back next to the original .bin file if the
+    conversion succeeds. This means any number of sessions can convert files in the same directory
+    at the same time.
+
+    If the session hangs or crashes, the files it did not get to are retried in a new session up
+    to `:arg:retries` times. See `_wait_for_completion` for `:arg:timeout` and `:arg:deadline`.
+
+    Files found in `:arg:cache` are restored from it without being converted, and successful
+    conversions are added to it. The time taken by each phase is reported to `:arg:timer` and the
+    sessions and results are recorded in `:arg:metrics` if they are given. If `:arg:session_pool`
+    is given, the files are converted in one of its sessions rather than a new one. Only the models
+    matching `:arg:models` are written if it is given (see `convert_many`). The time taken by each
+    file is added to `:arg:history` if it is given. New sessions wait for a token from
+    `:arg:license_pool` if it is given.
+
+    If `:arg:on_result` is given, it is called with the index and the finished result of each file
+    as soon as it is known, i.e. while the session is still running.
+
+    Returns
+    -------
+    List[ConversionResult]
+        One result per .bin file, in the same order as `:arg:bin_files`
+
+    """
+    results, pending, keys = _restore_from_cache(bin_files, adams_launch_command, cache, models)
+    reported = set()
+
+    def _report(indices):
+        """Finishes the results of the files at `:arg:indices`"""
+        _finish_session([results[i] for i in indices], adams_launch_command,
+                        [keys[i] for i in indices] if keys is not None else None, cache)
+
+        if metrics is not None:
+            metrics.record([results[i] for i in indices])
+
+        if on_result is not None:
+            for i in indices:
+                reported.add(i)
+                on_result(i, results[i])
+
+    if on_result is not None:
+        _report([i for i, result in enumerate(results) if result is not None])
+
+    for attempt in range(retries + 1):
+
+        if pending == []:
+            break
+
+        if attempt > 0:
+            sleep(_retry_delay(attempt, retry_delay, deadline))
+
+        def _on_file(i, result, pending=pending):
+            results[pending[i]] = result
+            _report([pending[i]])
+
+        attempt_results, unfinished = _run_attempt(
+            [bin_files[i] for i in pending], adams_launch_command, timeout, deadline, timer, metrics,
+            session_pool, scratch_dir, models, license_pool, _on_file if on_result is not None else None
+        )
+
+        for i, result in zip(pending, attempt_results):
+            results[i] = result
+
+        pending = [pending[i] for i in unfinished]
+        if deadline is not None and monotonic() >= deadline:
+            break
+
+    rest = [i for i in range(len(results)) if i not in reported]
+    _report(rest)
+
+    if history is not None:
+        history.record(results)
+
+    return results
+
+
+def _restore_from_cache(bin_files: List[Path], adams_launch_command, cache: ConversionCache,
+                        models=None):
+    """Restores any of `:arg:bin_files` converted with the same `:arg:models` found in
+    `:arg:cache`.
+
+    Returns
+    -------
+    List[ConversionResult]
+        One entry per .bin file. Files restored from the cache have a result, the rest are None
+    List[int]
+        The indices of the files that still need converting
+    List[str]
+        The cache key of each file, or None if `:arg:cache` is None
+
+    """
+    results = [None] * len(bin_files)
+    keys = None
+
+    if cache is not None:
+        keys = []
+        for bin_file in bin_files:
+            try:
+                keys.append(cache.key(bin_file, adams_launch_command, models))
+            except OSError:
+                # The file is reported when it is staged
+                keys.append(None)
+
+        for i, (bin_file, key) in enumerate(zip(bin_files, keys)):
+            if key is None:
+                continue
+            cmd_files = cache.restore(key, bin_file.parent)
+            if cmd_files is not None:
+                results[i] = ConversionResult(bin_file, cmd_files, cached=True)
+
+    return results, [i for i, result in enumerate(results) if result is None], keys
+
+
+def _finish_session(results: List[ConversionResult], adams_launch_command, keys: List[str],
+                    cache: ConversionCache):
+    """Records the installation used in each of `:arg:results` and adds the successful, newly
+    converted results to `:arg:cache`.
+    """
+    try:
+        version = Version.from_install_dir(Path(adams_launch_command).parent.parent)
+    except (ValueError, IndexError):
+        version = None
+
+    for result in results:
+        result.adams_launch_command, result.version = Path(adams_launch_command), version
+
+    if cache is not None:
+        for key, result in zip(keys, results):
+            if result.success is True and result.cached is False and key is not None:
+                cache.put(key, result.cmd_files)
+
+
+def _retry_delay(attempt: int, retry_delay: float, deadline: float = None):
+    """Returns the seconds to back off before retry number `:arg:attempt`, but not beyond the
+    deadline.
+    """
+    delay = retry_delay * 2 ** (attempt - 1)
+    if deadline is not None:
+        delay = min(delay, max(0, deadline - monotonic()))
+
+    return delay
+
+
+def _run_attempt(bin_files: List[Path], adams_launch_command, timeout=None, deadline=None,
+                 timer: PhaseTimer = None, metrics: Metrics = None, session_pool: SessionPool = None,
+                 scratch_dir=None, models=None, license_pool: LicensePool = None, on_file=None):
+    """Makes one attempt at converting `:arg:bin_files` in a sandboxed Adams View session, or in
+    a session from `:arg:session_pool` if it is given. See `_run_session`.
+
+    If `:arg:on_file` is given, the .cmd files of each file are published as soon as Adams View
+    reports the file finished, and `:arg:on_file` is called with its index and result.
+
+    Returns
+    -------
+    List[ConversionResult]
+        One result per .bin file, in the same order as `:arg:bin_files`
+    List[int]
+        Indices of the files the session did not get to because it hung or crashed
+
+    """
+    sim_dir, follower, stage_errors = _prepare_attempt(bin_files, timer, scratch_dir, models=models)
+    finished = {}
+
+    def _on_event(event: LogEvent):
+        if event.kind in (LogEvent.FILE_COMPLETE, LogEvent.FILE_FAILED):
+            finished[event.index] = _publish_result(_read_result(follower, bin_files[event.index],
+                                                                 event.index), sim_dir, timer)
+            on_file(event.index, finished[event.index])
+
+    if on_file is not None:
+        follower.on_event = _on_event
+
+    if metrics is not None:
+        metrics.session_started()
+        started = monotonic()
+
+    try:
+        try:
+            if len(stage_errors) == len(bin_files):
+                # None of the files could be staged, so there is nothing for Adams View to do
+                pass
+            elif session_pool is not None:
+                with _timed(timer, 'completion', bin_files, session=sim_dir.name):
+                    session_pool.run(sim_dir, adams_launch_command, follower, timeout, deadline)
+            else:
+                _run_script(sim_dir, adams_launch_command, follower.complete_code, follower, timeout,
+                            deadline, timer, license_pool)
+            error = None
+        except RuntimeError as err:
+            # Files the script did not get to are reported as failures below
+            error = str(err)
+        finally:
+            if metrics is not None:
+                metrics.session_finished(monotonic() - started)
+
+        follower.on_event = None
+        return _finish_attempt(bin_files, sim_dir, follower, error, timer, stage_errors, finished)
+
+    finally:
+        shutil.rmtree(sim_dir, ignore_errors=True)
+
+
+def _prepare_attempt(bin_files: List[Path], timer: PhaseTimer = None, scratch_dir=None,
+                     list_models=False, models=None):
+    """Creates a sandbox directory in `:arg:scratch_dir`, or next to the first of `:arg:bin_files`
+    if it is None, stages the files in it and writes the script to convert them (or to list their
+    models if `:arg:list_models` is True). See `_write_script` for `:arg:models`. Files that
+    cannot be staged are left out of the script.
+
+    Returns
+    -------
+    Path
+        The sandbox directory
+    LogFollower
+        A follower for the aview.log file of the session
+    Dict[int, str]
+        The reason each file that could not be staged failed, by index
+
+    """
+    if scratch_dir is not None:
+        Path(scratch_dir).mkdir(parents=True, exist_ok=True)
+
+    sim_dir = Path(tempfile.mkdtemp(prefix=SANDBOX_PREFIX, dir=scratch_dir or bin_files[0].parent))
+    follower = LogFollower(sim_dir / 'aview.log', str(random()))
+
+    try:
+        with _timed(timer, 'stage', bin_files, session=sim_dir.name):
+            staged_files, stage_errors = _stage_bin_files(bin_files, sim_dir)
+
+        with _timed(timer, 'write_script', bin_files, session=sim_dir.name):
+            _write_script(staged_files, follower.complete_code, sim_dir, list_models, models)
+    except BaseException:
+        shutil.rmtree(sim_dir, ignore_errors=True)
+        raise
+
+    return sim_dir, follower, stage_errors
+
+
+def _finish_attempt(bin_files: List[Path], sim_dir: Path, follower: LogFollower, error: str = None,
+                    timer: PhaseTimer = None, stage_errors: dict = None, finished: dict = None):
+    """Reads the results of a session prepared by `_prepare_attempt` and publishes the .cmd files
+    of the files that succeeded. `:arg:error` is the reason the session failed, if it did, and
+    `:arg:stage_errors` are the reasons the files that could not be staged failed. The results in
+    `:arg:finished` (by index) have already been published and are returned as they are.
+
+    Returns
+    -------
+    List[ConversionResult]
+        One result per .bin file, in the same order as `:arg:bin_files`
+    List[int]
+        Indices of the files the session did not get to because it hung or crashed
+
+    """
+    unfinished = []
+    with _timed(timer, 'remove_script', bin_files, session=sim_dir.name):
+        _remove_script(sim_dir)
+
+    results = _read_results(follower, bin_files)
+    stage_errors = stage_errors if stage_errors is not None else {}
+
+    if error is not None:
+        reported = {e.index for e in follower.events
+                    if e.kind in (LogEvent.FILE_COMPLETE, LogEvent.FILE_FAILED)}
+        unfinished = [i for i in range(len(bin_files)) if i not in reported and i not in stage_errors]
+        for i in unfinished:
+            results[i].error = error
+
+    for i, stage_error in stage_errors.items():
+        results[i].error = stage_error
+
+    finished = finished if finished is not None else {}
+    with _timed(timer, 'publish', bin_files, session=sim_dir.name):
+        for i, result in enumerate(results):
+            if i in finished:
+                results[i] = finished[i]
+            elif result.success is True:
+                result.cmd_files = _publish(result.cmd_files, result.bin_file.parent)
+
+    return results, unfinished
+
+
+def _publish_result(result: ConversionResult, sim_dir: Path, timer: PhaseTimer = None):
+    """Publishes the .cmd files of `:arg:result` while the rest of its session is still running.
+    A failure to publish is reported in `:arg:result`.
+    """
+    if result.success is True:
+        with _timed(timer, 'publish', [result.bin_file], session=sim_dir.name):
+            try:
+                result.cmd_files = _publish(result.cmd_files, result.bin_file.parent)
+            except OSError as err:
+                result.error = f'Unable to publish the .cmd files of {result.bin_file}: {err}'
+
+    return result
+
+
+def _stage_bin_files(bin_files: List[Path], sim_dir: Path):
+    """Links (or copies if linking is not possible) each of `:arg:bin_files` into its own
+    subdirectory of `:arg:sim_dir`.
+
+    Returns
+    -------
+    List[Path]
+        The staged copies of `:arg:bin_files`, or None for the files that could not be staged
+    Dict[int, str]
+        The reason each file that could not be staged failed, by index
+
+    """
+    staged_files = []
+    errors = {}
+    for idx, bin_file in enumerate(bin_files):
+        staged_file = sim_dir / str(idx) / bin_file.name
+        staged_file.parent.mkdir()
+
+        try:
+            try:
+                os.link(bin_file, staged_file)
+            except OSError:
+                shutil.copy2(bin_file, staged_file)
+        except OSError as err:
+            errors[idx] = f'Unable to stage {bin_file}: {err}'
+            staged_file = None
+
+        staged_files.append(staged_file)
+
+    return staged_files, errors
+
+
+def _publish(files: List[Path], out_dir: Path):
+    """Moves `:arg:files` into `:arg:out_dir`, replacing any existing files of the same name.
+
+    Each file appears in `:arg:out_dir` in a single step, so readers never see a partly written
+    file. Files on another filesystem (e.g. staged on local scratch for a network share) are copied
+    to a temporary name in `:arg:out_dir` first and then renamed.
+
+    Returns
+    -------
+    List[Path]
+        The new locations of `:arg:files`
+
+    """
+    published = []
+    for file in files:
+        dst = Path(out_dir) / file.name
+
+        try:
+            os.replace(file, dst)
+        except OSError:
+            tmp_file = dst.with_name(f'.{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+            try:
+                shutil.copyfile(file, tmp_file)
+                os.replace(tmp_file, dst)
+            except BaseException:
+                tmp_file.unlink(missing_ok=True)
+                raise
+            os.remove(file)
+
+        published.append(dst)
+
+    return published
+
+
+def list_models(bin_files, adams_launch_command=None, get_version_from_bin=False, max_workers=1,
+                timeout=None, cache: ConversionCache = None, install_index: InstallIndex = None,
+                scratch_dir=None, license_pool: LicensePool = None):
+    """Lists the models in each of the Adams View Binary (.bin) files in `:arg:bin_files` without
+    writing any .cmd files.
+
+    The files are loaded in as few Adams View sessions as possible: one per Adams installation, or
+    up to `:arg:max_workers` per installation. Files found in `:arg:cache` are not loaded at all
+    and the models found in the rest are added to it.
+
+    See `convert_many` for a description of the parameters.
+
+    Returns
+    -------
+    List[ModelInventory]
+        One inventory per .bin file, in the same order as `:arg:bin_files`
+
+    """
+    bin_files = [Path(f) for f in bin_files]
+    inventories = [None] * len(bin_files)
+    keys = [None] * len(bin_files)
+
+    if cache is not None:
+        for i, bin_file in enumerate(bin_files):
+            try:
+                keys[i] = cache.models_key(bin_file)
+            except OSError:
+                # The file is reported when it is staged
+                continue
+            models = cache.get_models(keys[i])
+            if models is not None:
+                inventories[i] = ModelInventory(bin_file, models, cached=True)
+
+    pending = [i for i, inventory in enumerate(inventories) if inventory is None]
+    failed, sessions, _ = _plan_sessions(
+        [bin_files[i] for i in pending], adams_launch_command, get_version_from_bin, install_index,
+        max(1, max_workers), None, True
+    )
+
+    for i, result in zip(pending, failed):
+        if result is not None:
+            inventories[i] = ModelInventory(bin_files[i], error=result.error)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sessions) or 1))) as executor:
+        futures = {
+            executor.submit(
+                _list_session, [bin_files[pending[i]] for i in indices], cmd, timeout, scratch_dir,
+                license_pool
+            ): [pending[i] for i in indices] for cmd, indices in sessions
+        }
+
+        for future in as_completed(futures):
+            for i, inventory in zip(futures[future], future.result()):
+                inventories[i] = inventory
+                if cache is not None and inventory.success is True and keys[i] is not None:
+                    cache.put_models(keys[i], inventory.models)
+
+    return inventories
+
+
+def _list_session(bin_files: List[Path], adams_launch_command, timeout=None, scratch_dir=None,
+                  license_pool: LicensePool = None):
+    """Lists the models in `:arg:bin_files` in a single sandboxed Adams View session. Errors are
+    reported in the returned inventories rather than raised.
+    """
+    try:
+        sim_dir, follower, stage_errors = _prepare_attempt(bin_files, scratch_dir=scratch_dir,
+                                                           list_models=True)
+    except OSError as err:
+        return [ModelInventory(bin_file, error=str(err)) for bin_file in bin_files]
+
+    try:
+        try:
+            if len(stage_errors) < len(bin_files):
+                _run_script(sim_dir, adams_launch_command, follower.complete_code, follower, timeout,
+                            license_pool=license_pool)
+            error = None
+        except RuntimeError as err:
+            error = str(err)
+
+        results = _read_results(follower, bin_files)
+        inventories = [ModelInventory(r.bin_file, error=r.error, duration=r.duration) for r in results]
+        for event in follower.events:
+            if event.kind == LogEvent.MODEL_FOUND:
+                inventories[event.index].models.append(json.loads(event.info))
+
+        # Files the session did not get to failed for the same reason as the session
+        if error is not None:
+            reported = {e.index for e in follower.events
+                        if e.kind in (LogEvent.FILE_COMPLETE, LogEvent.FILE_FAILED)}
+            for i, inventory in enumerate(inventories):
+                if i not in reported:
+                    inventory.error = error
+
+        for i, stage_error in stage_errors.items():
+            inventories[i].error = stage_error
+
+        return inventories
+
+    finally:
+        shutil.rmtree(sim_dir, ignore_errors=True)
+
+
+async def convert_async(bin_file, adams_launch_command=None, get_version_from_bin=False, timeout=None,
+                        retries=0, retry_delay=1.0, cache: ConversionCache = None,
+                        install_index: InstallIndex = None, scratch_dir=None, models=None,
+                        license_pool: LicensePool = None):
+    """An asyncio version of `convert`. Adams View is started with
+    `asyncio.create_subprocess_exec` and the event loop is not blocked while waiting for it to
+    finish. Finding the Adams installation, staging, cache lookups and publishing run on the
+    default executor.
+
+    Returns
+    -------
+    Path
+        Path to the Adams View Command (.cmd) file that was created.
+
+    """
+    loop = asyncio.get_running_loop()
+    adams_launch_command = await loop.run_in_executor(None, lambda: _get_adams_launch_command(
+        adams_launch_command,
+        bin_file=bin_file if get_version_from_bin is True else None,
+        install_index=install_index,
+    ))
+
+    bin_file = Path(bin_file)
+    result, = await _run_session_async([bin_file], adams_launch_command, timeout, retries=retries,
+                                       retry_delay=retry_delay, cache=cache, scratch_dir=scratch_dir,
+                                       models=models, license_pool=license_pool)
+
+    if result.success is False:
+        raise RuntimeError(result.error)
+
+    return bin_file.with_suffix('.cmd')
+
+
+async def convert_many_async(bin_files, adams_launch_command=None, get_version_from_bin=False,
+                             max_workers=1, batch=True, timeout=None, global_timeout=None, retries=0,
+                             retry_delay=1.0, cache: ConversionCache = None,
+                             install_index: InstallIndex = None, max_workers_per_version=None,
+                             scratch_dir=None, models=None, license_pool: LicensePool = None):
+    """An asyncio version of `convert_many`. Up to `:arg:max_workers` Adams View sessions are
+    supervised by the running event loop without a thread per session.
+
+    Returns
+    -------
+    List[ConversionResult]
+        One result per .bin file, in the same order as `:arg:bin_files`
+
+    """
+    loop = asyncio.get_running_loop()
+    bin_files = [Path(f) for f in bin_files]
+    max_workers = max(1, min(max_workers, len(bin_files)))
+    deadline = monotonic() + global_timeout if global_timeout is not None else None
+
+    results, sessions, per_version = await loop.run_in_executor(None, lambda: _plan_sessions(
+        bin_files, adams_launch_command, get_version_from_bin, install_index, max_workers,
+        max_workers_per_version, batch
+    ))
+
+    # Limit the number of sessions running at the same time, in total and of each version
+    limit = asyncio.Semaphore(max_workers)
+    limits = {cmd: asyncio.Semaphore(per_version) for cmd, _ in sessions}
+
+    async def _session(cmd, indices):
+        session_files = [bin_files[i] for i in indices]
+        async with limits[cmd], limit:
+            try:
+                session_results = await _run_session_async(
+                    session_files, cmd, timeout, deadline, retries, retry_delay, cache, scratch_dir,
+                    models, license_pool
+                )
+            except Exception as err:
+                session_results = [ConversionResult(f, error=str(err)) for f in session_files]
+
+        for i, result in zip(indices, session_results):
+            results[i] = result
+
+    await asyncio.gather(*[_session(cmd, indices) for cmd, indices in sessions])
+
+    return results
+
+
+async def _run_session_async(bin_files: List[Path], adams_launch_command, timeout=None, deadline=None,
+                             retries=0, retry_delay=1.0, cache: ConversionCache = None,
+                             scratch_dir=None, models=None, license_pool: LicensePool = None):
+    """An asyncio version of `_run_session`."""
+    loop = asyncio.get_running_loop()
+
+    results, pending, keys = await loop.run_in_executor(
+        None, _restore_from_cache, bin_files, adams_launch_command, cache, models
+    )
+
+    for attempt in range(retries + 1):
+
+        if pending == []:
+            break
+
+        if attempt > 0:
+            await asyncio.sleep(_retry_delay(attempt, retry_delay, deadline))
+
+        attempt_files = [bin_files[i] for i in pending]
+        sim_dir, follower, stage_errors = await loop.run_in_executor(
+            None, _prepare_attempt, attempt_files, None, scratch_dir, False, models
+        )
+
+        try:
+            try:
+                if len(stage_errors) < len(attempt_files):
+                    await _run_script_async(sim_dir, adams_launch_command, follower, timeout, deadline,
+                                            license_pool)
+                error = None
+            except RuntimeError as err:
+                error = str(err)
+
+            attempt_results, unfinished = await loop.run_in_executor(
+                None, _finish_attempt, attempt_files, sim_dir, follower, error, None, stage_errors
+            )
+
+        finally:
+            await loop.run_in_executor(None, lambda: shutil.rmtree(sim_dir, ignore_errors=True))
+
+        for i, result in zip(pending, attempt_results):
+            results[i] = result
+
+        pending = [pending[i] for i in unfinished]
+        if deadline is not None and monotonic() >= deadline:
+            break
+
+    await loop.run_in_executor(None, _finish_session, results, adams_launch_command, keys, cache)
+
+    return results
+
+
+async def _run_script_async(sim_dir, adams_cmd, follower: LogFollower, timeout: float = None,
+                            deadline: float = None, license_pool: LicensePool = None):
+    """An asyncio version of `_run_script`. Waiting for a token from `:arg:license_pool` takes up
+    a thread of the default executor.
+    """
+    if platform.system() == 'Windows':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        kwargs = {'startupinfo': startupinfo}
+    else:
+        kwargs = {'start_new_session': True}
+
+    token = None
+    if license_pool is not None:
+        wait = max(0, deadline - monotonic()) if deadline is not None else None
+        acquired = asyncio.get_running_loop().run_in_executor(None, license_pool.acquire, adams_cmd, wait)
+        try:
+            token = await asyncio.shield(acquired)
+        except asyncio.CancelledError:
+            # Give the token back as soon as the wait for it finishes
+            acquired.add_done_callback(
+                lambda f: LicensePool.release(f.result()) if f.exception() is None else None
+            )
+            raise
+
+    try:
+        process = await asyncio.create_subprocess_exec(*_adams_args(adams_cmd), cwd=sim_dir, **kwargs)
+
+        try:
+            await _wait_for_completion_async(process, follower, timeout, deadline)
+        except BaseException:
+            # Never leave an orphaned Adams View session holding a license
+            if process.returncode is None:
+                _signal_process_tree(process)
+            await process.wait()
+            raise
+
+    finally:
+        if token is not None:
+            LicensePool.release(token)
+
+    return process
+
+
+async def _wait_for_completion_async(process: asyncio.subprocess.Process, follower: LogFollower,
+                                     timeout: float = None, deadline: float = None):
+    """An asyncio version of `_wait_for_completion`. Wakes up as soon as `:arg:process` exits and
+    otherwise checks the log every `LOG_CHECK_INTERVAL` seconds.
+    """
+    exited = asyncio.ensure_future(process.wait())
+    last_progress, offset = monotonic(), follower.offset
+
+    def _limit():
+        """Returns the time at which to give up, or None if there is no limit"""
+        limits = [t for t in (deadline, last_progress + timeout if timeout else None) if t]
+        return min(limits) if limits else None
+
+    try:
+        while True:
+
+            # Check if the script has completed
+            if _check_if_complete(follower) is True:
+
+                # If the script has completed, wait for Adams View to exit and return
+                limit = _limit()
+                try:
+                    await asyncio.wait_for(asyncio.shield(exited),
+                                           None if limit is None else max(0, limit - monotonic()))
+                except asyncio.TimeoutError:
+                    _signal_process_tree(process)
+                    await exited
+                return follower
+
+            elif exited.done():
+
+                # The process may have written the completion message just before it exited
+                follower.poll(final=True)
+                if _check_if_complete(follower) is True:
+                    return follower
+
+                raise RuntimeError(f'Adams View exited with code {process.returncode} before the '
+                                   'script completed!')
+
+            # Anything new in the log counts as progress
+            if follower.offset != offset:
+                last_progress, offset = monotonic(), follower.offset
+
+            # Give up if the session has hung
+            limit = _limit()
+            if limit is not None and monotonic() >= limit:
+                raise AdamsTimeoutError('Adams View did not finish in time and was terminated!')
+
+            # Wait for the process to exit or for the next log check
+            wait = LOG_CHECK_INTERVAL if limit is None else min(LOG_CHECK_INTERVAL, limit - monotonic())
+            await asyncio.wait({exited}, timeout=max(0, wait))
+
+    finally:
+        if not exited.done():
+            exited.cancel()
+
+
+class PhaseTimer():
+    """Times the phases of each conversion and passes a record of each phase to `:arg:callback`
+    as it finishes.
+
+    Each record is a dictionary giving the name of the `phase`, the wall clock time it started
+    (`start`), its `duration` in seconds and the `bin_files` involved. Phases that belong to an
+    Adams View session also give the name of the session's sandbox directory (`session`). The
+    phases are
+
+    - `launch_command`: Finding the mdi.bat file to use
+    - `probe_headers`: Reading the versions of the .bin files and grouping them by installation
+    - `stage`: Linking the .bin files into the sandbox directory
+    - `write_script`: Writing the script
+    - `license_wait`: Waiting for a token from the `LicensePool`, if one is used
+    - `spawn`: Starting the Adams View process
+    - `first_log_activity`: Waiting until output from Adams View is first seen in its log
+    - `completion`: Running the script until it is detected as complete. `detection_lag` is the
+      time from the last write to the log to the detection.
+    - `remove_script`: Removing the script
+    - `publish`: Moving the .cmd files next to the .bin files
+
+    The session phases are measured from when the converter sees each change in the log, so they
+    include any delay in noticing the change.
+
+    Parameters
+    ----------
+    callback : Callable[[dict], None]
+        Called with the record of each phase. It may be called from several threads at once.
+
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    @contextmanager
+    def phase(self, name: str, bin_files=(), **info):
+        """Times the body of the `with` block as phase `:arg:name`."""
+        started, start = time(), perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, started, perf_counter() - start, bin_files, **info)
+
+    def record(self, name: str, started: float, duration: float, bin_files=(), **info):
+        """Reports a phase that started at wall clock time `:arg:started` and took
+        `:arg:duration` seconds.
+        """
+        self.callback({
+            'phase': name,
+            'start': started,
+            'duration': duration,
+            'bin_files': [str(f) for f in bin_files],
+            **info,
+        })
+
+    def record_session(self, sim_dir, spawn_start: float, spawned: float, follower: LogFollower = None):
+        """Reports the phases of an Adams View session run by `_run_script`. The times are from
+        `time.monotonic`.
+        """
+        now, offset = monotonic(), time() - monotonic()
+        session = Path(sim_dir).name
+
+        self.record('spawn', spawn_start + offset, spawned - spawn_start, session=session)
+        if follower is None or follower.first_activity is None:
+            return
+
+        first_activity = follower.first_activity
+        self.record('first_log_activity', spawned + offset, first_activity - spawned, session=session)
+
+        try:
+            detection_lag = max(0.0, now + offset - follower.log_file.stat().st_mtime)
+        except OSError:
+            detection_lag = None
+
+        self.record('completion', first_activity + offset, now - first_activity, session=session,
+                    detection_lag=detection_lag)
+
+
+def _timed(timer: PhaseTimer, name: str, bin_files=(), **info):
+    """Returns `PhaseTimer.phase` of `:arg:timer`, or a context manager that does nothing if
+    `:arg:timer` is None.
+    """
+    return timer.phase(name, bin_files, **info) if timer is not None else nullcontext()
+
+
+@dataclass
+class ConversionResult():
+    """The outcome of converting a single Adams View Binary (.bin) file."""
+    bin_file: Path
+    cmd_files: List[Path] = field(default_factory=list)
+    error: str = None
+    cached: bool = False
+    adams_launch_command: Path = None
+    version: Version = None
+    duration: float = None
+
+    @property
+    def success(self):
+        return self.error is None
+
+    def to_dict(self):
+        """Returns the result as a json serializable dictionary."""
+        return {
+            'bin_file': str(self.bin_file),
+            'cmd_files': [str(f) for f in self.cmd_files],
+            'success': self.success,
+            'error': self.error,
+            'cached': self.cached,
+            'adams_launch_command': str(self.adams_launch_command) if self.adams_launch_command else None,
+            'version': str(self.version) if self.version is not None else None,
+            'duration': self.duration,
+        }
+
+
+@dataclass
+class ModelInventory():
+    """The models found in a single Adams View Binary (.bin) file by `list_models`. Each model is
+    a dictionary of its name and the number of parts, constraints and forces it contains.
+    """
+    bin_file: Path
+    models: List[dict] = field(default_factory=list)
+    error: str = None
+    cached: bool = False
+    duration: float = None
+
+    @property
+    def success(self):
+        return self.error is None
+
+    def to_dict(self):
+        """Returns the inventory as a json serializable dictionary."""
+        return {
+            'bin_file': str(self.bin_file),
+            'models': self.models,
+            'success': self.success,
+            'error': self.error,
+            'cached': self.cached,
+            'duration': self.duration,
+        }
+
+
+class ConversionCache():
+    """An on-disk cache of converted .cmd files keyed by the content of the .bin file and the Adams
+    installation used to convert it. The least recently used entries are evicted once the cache
+    grows beyond `:arg:max_size` bytes.
+
+    The size of the cache is only measured when it is first added to and when entries are evicted.
+    In between, the size of each new entry is added to a running total.
+
+    Parameters
+    ----------
+    cache_dir : str or Path, optional
+        Directory to store the cache in, by default `CACHE_DIR`
+    max_size : int, optional
+        Maximum size of the cache in bytes, by default `CACHE_MAX_SIZE`
+
+    """
+    MANIFEST_NAME = 'manifest.json'
+
+    def __init__(self, cache_dir=None, max_size=None):
+        self.cache_dir = Path(cache_dir if cache_dir is not None else CACHE_DIR)
+        self.max_size = max_size if max_size is not None else CACHE_MAX_SIZE
+        self._size = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(bin_file, adams_launch_command, models=None):
+        """Returns the cache key for converting the `:arg:models` in `:arg:bin_file` with
+        `:arg:adams_launch_command`.
+        """
+        prefix = str(Path(adams_launch_command)).encode() + b'\0'
+        if models is not None:
+            prefix += b'models\0' + '\0'.join(sorted({m.upper() for m in models})).encode() + b'\0'
+
+        return ConversionCache._hash_file(bin_file, prefix)
+
+    @staticmethod
+    def models_key(bin_file):
+        """Returns the cache key for the models listed in `:arg:bin_file` (see `list_models`)."""
+        return ConversionCache._hash_file(bin_file, b'models\0')
+
+    @staticmethod
+    def _hash_file(bin_file, prefix: bytes):
+        digest = hashlib.sha256(prefix)
+        with open(bin_file, 'rb') as fid:
+            for chunk in iter(lambda: fid.read(2**20), b''):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def _entry_dir(self, key: str):
+        return self.cache_dir / key[:2] / key
+
+    def restore(self, key: str, out_dir):
+        """Copies the .cmd files cached under `:arg:key` into `:arg:out_dir`.
+
+        Returns
+        -------
+        List[Path] or None
+            The restored .cmd files, or None if `:arg:key` is not in the cache
+
+        """
+        entry_dir = self._entry_dir(key)
+        try:
+            manifest = json.loads((entry_dir / self.MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            return None
+
+        cmd_files = []
+        for name in manifest['cmd_files']:
+            dst = Path(out_dir) / name
+            tmp = dst.with_name(f'.{dst.name}.{random()}.tmp')
+            try:
+                shutil.copyfile(entry_dir / name, tmp)
+            except OSError:
+                return None
+            os.replace(tmp, dst)
+            cmd_files.append(dst)
+
+        # Mark the entry as recently used, if the cache can be written to
+        try:
+            os.utime(entry_dir)
+        except OSError:
+            pass
+
+        return cmd_files
+
+    def put(self, key: str, cmd_files: List[Path]):
+        """Adds `:arg:cmd_files` to the cache under `:arg:key`, then evicts the least recently used
+        entries if the cache is too big. Nothing is cached if the cache cannot be written to (e.g.
+        it is read only or full).
+        """
+        entry_dir = self._entry_dir(key)
+        try:
+            entry_dir.parent.mkdir(parents=True, exist_ok=True)
+            tmp_dir = Path(tempfile.mkdtemp(prefix='.tmp_', dir=entry_dir.parent))
+        except OSError:
+            return
+
+        try:
+            size = 0
+            for cmd_file in cmd_files:
+                shutil.copyfile(cmd_file, tmp_dir / Path(cmd_file).name)
+                size += Path(cmd_file).stat().st_size
+            size += (tmp_dir / self.MANIFEST_NAME).write_text(json.dumps({
+                'cmd_files': [Path(f).name for f in cmd_files]
+            }))
+
+            # Fails if another session has already cached the same file
+            os.rename(tmp_dir, entry_dir)
+
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        self._grow(size)
+
+    def get_models(self, key: str):
+        """Returns the models cached under `:arg:key` by `put_models`, or None if there are none."""
+        entry_dir = self._entry_dir(key)
+        try:
+            models = json.loads((entry_dir / self.MANIFEST_NAME).read_text())['models']
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # Mark the entry as recently used, if the cache can be written to
+        try:
+            os.utime(entry_dir)
+        except OSError:
+            pass
+
+        return models
+
+    def put_models(self, key: str, models: List[dict]):
+        """Adds the `:arg:models` listed in a .bin file to the cache under `:arg:key`. Nothing is
+        cached if the cache cannot be written to.
+        """
+        entry_dir = self._entry_dir(key)
+        manifest = json.dumps({'models': models})
+        try:
+            entry_dir.mkdir(parents=True, exist_ok=True)
+            _write_atomic(entry_dir / self.MANIFEST_NAME, manifest)
+        except OSError:
+            return
+
+        self._grow(len(manifest))
+
+    def _grow(self, size: int):
+        """Adds `:arg:size` bytes to the running total, and evicts entries if the cache may have
+        grown too big.
+        """
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            full = self._size is None or self._size > self.max_size
+
+        if full:
+            self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the cache is no bigger than `max_size`."""
+        with self._lock:
+            entries = []
+            for entry_dir in self.cache_dir.glob('*/*'):
+                if entry_dir.name.startswith('.tmp_'):
+                    continue
+                try:
+                    size = sum(f.stat().st_size for f in entry_dir.iterdir())
+                    entries.append((entry_dir.stat().st_mtime, size, entry_dir))
+                except OSError:
+                    continue
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry_dir in sorted(entries):
+                if total <= self.max_size:
+                    break
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= size
+
+            self._size = total
+
+
+class DurationHistory():
+    """A record of how long Adams View took to convert each .bin file, used to estimate how long
+    files will take next time. Files are keyed by their absolute path and a recorded duration is
+    only used while the file is still the same size. Other files are estimated from their size at
+    the average rate of all the recorded conversions.
+
+    Each line of the history file is a JSON object giving the duration of a file, and new
+    durations are appended to it so that recording them does not get slower as the history grows.
+    The last line for a file is its current duration. The file is rewritten with a single line per
+    file when it is loaded if it has grown to more than `COMPACT_RATIO` lines per file.
+
+    Parameters
+    ----------
+    history_file : str or Path, optional
+        The file to save the history to, by default None (the history is only kept in memory)
+
+    """
+    COMPACT_RATIO = 2
+
+    def __init__(self, history_file=None):
+        self.history_file = Path(history_file) if history_file is not None else None
+        self._files = None
+        self._lock = threading.Lock()
+
+    def estimate(self, bin_files):
+        """Returns the estimated seconds to convert each of `:arg:bin_files`. If nothing has been
+        recorded yet the file sizes in bytes are returned instead, which still rank the files.
+        """
+        sizes = [_file_size(f) or 0 for f in bin_files]
+
+        with self._lock:
+            files = self._load()
+            total_size = sum(entry['size'] for entry in files.values())
+            rate = sum(entry['duration'] for entry in files.values()) / total_size if total_size else None
+
+            estimates = []
+            for bin_file, size in zip(bin_files, sizes):
+                entry = files.get(str(Path(bin_file).absolute()))
+                if entry is not None and entry['size'] == size:
+                    estimates.append(entry['duration'])
+                else:
+                    estimates.append(size * rate if rate is not None else size)
+
+        return estimates
+
+    def eta(self, bin_files, max_workers=1):
+        """Returns the estimated seconds to convert `:arg:bin_files` on `:arg:max_workers` sessions
+        scheduled longest first, or None if nothing has been recorded yet.
+        """
+        with self._lock:
+            if not self._load():
+                return None
+
+        loads = [0.0] * max(1, max_workers)
+        for estimate in sorted(self.estimate(bin_files), reverse=True):
+            loads[loads.index(min(loads))] += estimate
+
+        return max(loads)
+
+    def record(self, results: List[ConversionResult]):
+        """Adds the duration of each newly converted file in `:arg:results` to the history."""
+        entries = {}
+        for result in results:
+            if result.success is True and result.cached is False and result.duration is not None:
+                size = _file_size(result.bin_file)
+                if size is not None:
+                    entries[str(result.bin_file.absolute())] = {'size': size, 'duration': result.duration}
+
+        if entries:
+            with self._lock:
+                self._load().update(entries)
+
+                if self.history_file is not None:
+                    try:
+                        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+                        with open(self.history_file, 'a', encoding='utf-8') as fid:
+                            fid.write(''.join(json.dumps({'bin_file': path, **entry}) + '\n'
+                                              for path, entry in entries.items()))
+                    except OSError:
+                        pass
+
+    def _load(self):
+        if self._files is None:
+            self._files, n_lines = self._read()
+
+            if n_lines > self.COMPACT_RATIO * max(1, len(self._files)):
+                lines = [json.dumps({'bin_file': path, **entry}) + '\n'
+                         for path, entry in self._files.items()]
+                try:
+                    _write_atomic(self.history_file, ''.join(lines))
+                except OSError:
+                    pass
+
+        return self._files
+
+    def _read(self):
+        """Returns the last entry for each file in the history file and the number of lines in it."""
+        files, n_lines = {}, 0
+        if self.history_file is None:
+            return files, n_lines
+
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as fid:
+                for line in fid:
+                    n_lines += 1
+                    # A line cut short by a crash is ignored
+                    try:
+                        entry = json.loads(line)
+                        files[entry.pop('bin_file')] = entry
+                    except (ValueError, KeyError, AttributeError):
+                        continue
+        except OSError:
+            pass
+
+        return files, n_lines
+
+
+def _file_size(path):
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
+
+
+class LicensePool():
+    """A machine wide limit on the number of Adams View sessions of each Adams version running at
+    the same time, shared by every process that uses the same `:arg:lock_dir`.
+
+    Each session holds one of `:arg:capacity` token files locked while it runs. The locks are
+    released by the operating system if the process dies, so tokens are never lost. Sessions
+    waiting for a token queue in a directory of ticket files and only the oldest ticket may take a
+    free token, so tokens are handed out first come, first served across all the processes.
+
+    Parameters
+    ----------
+    capacity : int, optional
+        Number of sessions of each Adams version allowed at the same time, by default 1
+    capacities : Dict[str, int], optional
+        Capacities of particular Adams versions keyed by the name of their version directory (e.g.
+        '2019_2'), by default every version has `:arg:capacity`
+    lock_dir : str or Path, optional
+        Directory to keep the tokens and tickets in, by default `LICENSE_DIR`
+    poll_interval : float, optional
+        Seconds between checks for a free token, by default 0.1
+
+    """
+
+    def __init__(self, capacity=1, capacities=None, lock_dir=None, poll_interval=0.1):
+        self.capacity = capacity
+        self.capacities = dict(capacities) if capacities is not None else {}
+        self.lock_dir = Path(lock_dir if lock_dir is not None else LICENSE_DIR)
+        self.poll_interval = poll_interval
+
+    def capacity_of(self, adams_launch_command):
+        """Returns the number of sessions of `:arg:adams_launch_command` allowed at the same time."""
+        return max(1, self.capacities.get(_version_dir_name(adams_launch_command), self.capacity))
+
+    @contextmanager
+    def token(self, adams_launch_command, timeout: float = None):
+        """Waits for a token for `:arg:adams_launch_command` and holds it until the context exits.
+
+        Raises
+        ------
+        RuntimeError
+            Raised if no token became free within `:arg:timeout` seconds
+
+        """
+        fid = self.acquire(adams_launch_command, timeout)
+        try:
+            yield
+        finally:
+            _release_lock_file(fid)
+
+    def acquire(self, adams_launch_command, timeout: float = None):
+        """Waits for a token for `:arg:adams_launch_command`. Pass the returned file to
+        `release` to give it back.
+        """
+        version_dir = self.lock_dir / _version_dir_name(adams_launch_command)
+        queue_dir = version_dir / 'queue'
+        queue_dir.mkdir(parents=True, exist_ok=True)
+        deadline = monotonic() + timeout if timeout is not None else None
+
+        # Join the back of the queue. The ticket is locked before it appears in the queue, so that
+        # other waiters never mistake it for an abandoned one.
+        ticket_file = queue_dir / f'{time_ns():020d}_{os.getpid()}_{threading.get_ident()}.ticket'
+        tmp_file = self._tmp_ticket(ticket_file)
+        ticket = _open_lock_file(tmp_file)
+
+        try:
+            if platform.system() == 'Windows':
+                # An open file cannot be renamed on Windows, but it can be linked
+                os.link(tmp_file, ticket_file)
+            else:
+                os.replace(tmp_file, ticket_file)
+
+            while True:
+                if self._is_first(queue_dir, ticket_file):
+                    for k in range(self.capacity_of(adams_launch_command)):
+                        fid = _open_lock_file(version_dir / f'token_{k}.lock')
+                        if fid is not None:
+                            return fid
+
+                if deadline is not None and monotonic() >= deadline:
+                    raise RuntimeError(f'No Adams license became free for {adams_launch_command} '
+                                       f'within {timeout} seconds!')
+
+                sleep(self.poll_interval)
+
+        finally:
+            _release_lock_file(ticket, ticket_file)
+            tmp_file.unlink(missing_ok=True)
+
+    @staticmethod
+    def release(fid):
+        """Gives back a token returned by `acquire`."""
+        _release_lock_file(fid)
+
+    @staticmethod
+    def _is_first(queue_dir: Path, ticket_file: Path):
+        """Returns True if `:arg:ticket_file` is the oldest ticket in `:arg:queue_dir`, removing the
+        tickets of processes that have died.
+        """
+        for other in sorted(queue_dir.glob('*.ticket')):
+            if other.name >= ticket_file.name:
+                return True
+
+            # A ticket that can be locked has been abandoned
+            fid = _open_lock_file(other)
+            if fid is None:
+                return False
+            _release_lock_file(fid, other)
+            LicensePool._tmp_ticket(other).unlink(missing_ok=True)
+
+        return True
+
+    @staticmethod
+    def _tmp_ticket(ticket_file: Path):
+        """Returns the name `:arg:ticket_file` is locked under before it joins the queue."""
+        return ticket_file.parent.parent / f'.{ticket_file.name}.tmp'
+
+
+def _check_license_pool(session_pool: SessionPool, license_pool: LicensePool):
+    """Raises a ValueError if the sessions of `:arg:session_pool` would not hold tokens from
+    `:arg:license_pool`.
+    """
+    if session_pool is not None and license_pool is not None and session_pool.license_pool is None:
+        raise ValueError('Pass the LicensePool to the SessionPool too, so that its sessions hold '
+                         'license tokens!')
+
+
+def _version_dir_name(adams_launch_command):
+    """Returns the name of the version directory of `:arg:adams_launch_command` (e.g. '2019_2')."""
+    return Path(adams_launch_command).parent.parent.name
+
+
+def _open_lock_file(path: Path):
+    """Opens `:arg:path` and locks it without waiting.
+
+    Returns
+    -------
+    file or None
+        The locked file, or None if another file object holds the lock
+
+    """
+    fid = open(path, 'a')
+    try:
+        if platform.system() == 'Windows':
+            msvcrt.locking(fid.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fid.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        fid.close()
+        return None
+
+    return fid
+
+
+def _release_lock_file(fid, path: Path = None):
+    """Unlocks and closes a file opened by `_open_lock_file`, then removes `:arg:path` if it is
+    given.
+    """
+    try:
+        if platform.system() == 'Windows':
+            fid.seek(0)
+            msvcrt.locking(fid.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fid.fileno(), fcntl.LOCK_UN)
+    finally:
+        fid.close()
+
+    if path is not None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class SessionPool():
+    """A pool of Adams View sessions started ahead of time, so that conversions do not have to wait
+    for Adams View to start.
+
+    Each session runs a small script that waits for jobs to appear in a spool directory and runs
+    them one after another. Up to `:arg:size` sessions are kept for each Adams installation used.
+    A session is replaced by a new one once it has run `:arg:max_jobs` jobs, to stop its memory use
+    growing, or if it crashes or hangs.
+
+    Pass the pool to `convert`, `convert_many`, `iter_convert` or `HotFolder`. Sessions are started
+    for an installation when it is first used, or up front for `:arg:adams_launch_commands`.
+
+    If `:arg:license_pool` is given, each session holds a token from it for as long as it runs, so
+    no more than the capacity of an installation's sessions are kept.
+
+    Parameters
+    ----------
+    size : int, optional
+        Number of sessions to keep for each Adams installation, by default 1
+    max_jobs : int, optional
+        Number of jobs each session runs before it is replaced, by default 50
+    adams_launch_commands : List[str or Path], optional
+        mdi.bat files of the installations to start sessions for straight away, by default ()
+    work_dir : str or Path, optional
+        Directory to create the sessions' working directories in, by default the system's
+        temporary directory
+    license_pool : LicensePool, optional
+        Machine wide limit on the number of Adams View sessions, shared with other processes, by
+        default None (no limit)
+
+    """
+
+    def __init__(self, size=1, max_jobs=50, adams_launch_commands=(), work_dir=None,
+                 license_pool: LicensePool = None):
+        self.size = max(1, size)
+        self.max_jobs = max(1, max_jobs)
+        self.work_dir = Path(work_dir) if work_dir is not None else None
+        self.license_pool = license_pool
+        self._idle = {}
+        self._n_sessions = {}
+        self._closed = False
+        self._lock = threading.Condition()
+
+        for adams_launch_command in adams_launch_commands:
+            self.start(adams_launch_command)
+
+    def start(self, adams_launch_command):
+        """Starts sessions of `:arg:adams_launch_command` until there are `size` of them, or as
+        many as the license pool allows.
+        """
+        cmd = Path(adams_launch_command)
+        size = self.size
+        if self.license_pool is not None:
+            size = min(size, self.license_pool.capacity_of(cmd))
+
+        with self._lock:
+            self._idle.setdefault(cmd, [])
+            n_new = max(0, size - self._n_sessions.get(cmd, 0))
+            self._n_sessions[cmd] = self._n_sessions.get(cmd, 0) + n_new
+
+        # Sessions may have to wait for a license, so don't hold up the rest of the pool meanwhile
+        for _ in range(n_new):
+            try:
+                session = _WarmSession(cmd, self.max_jobs, self.work_dir, self.license_pool)
+            except BaseException:
+                with self._lock:
+                    self._n_sessions[cmd] -= 1
+                raise
+            self._release(session)
+
+    def run(self, sim_dir, adams_launch_command, follower: LogFollower, timeout: float = None,
+            deadline: float = None):
+        """Runs the script written to `:arg:sim_dir` by `_prepare_attempt` in the next free
+        session of `:arg:adams_launch_command` and waits for it to complete. See
+        `_wait_for_completion` for `:arg:timeout` and `:arg:deadline`.
+        """
+        session = self._acquire(Path(adams_launch_command))
+        try:
+            session.run(sim_dir, follower, timeout, deadline)
+        finally:
+            self._release(session)
+
+    def close(self):
+        """Stops all the sessions."""
+        with self._lock:
+            self._closed = True
+            sessions = [session for idle in self._idle.values() for session in idle]
+            self._idle.clear()
+
+        for session in sessions:
+            session.stop()
+
+    def _acquire(self, cmd: Path):
+        self.start(cmd)
+        with self._lock:
+            while not self._idle[cmd]:
+                self._lock.wait()
+            return self._idle[cmd].pop(0)
+
+    def _release(self, session: _WarmSession):
+        if session.alive is False:
+            session.stop()
+            session = _WarmSession(session.adams_launch_command, self.max_jobs, self.work_dir,
+                                   self.license_pool)
+
+        with self._lock:
+            if self._closed is False:
+                self._idle[session.adams_launch_command].append(session)
+                self._lock.notify()
+                return
+
+        session.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _WarmSession():
+    """An Adams View session that runs the jobs written to its spool directory. See
+    `SessionPool`.
+    """
+
+    def __init__(self, adams_launch_command: Path, max_jobs: int, work_dir: Path = None,
+                 license_pool: LicensePool = None):
+        self.adams_launch_command = adams_launch_command
+        self.max_jobs = max_jobs
+        self.n_jobs = 0
+        self.sim_dir = Path(tempfile.mkdtemp(prefix=SANDBOX_PREFIX, dir=work_dir))
+        (self.sim_dir / 'spool').mkdir()
+
+        _write_server_script(self.sim_dir, max_jobs)
+        self.wake = threading.Event()
+
+        # The token is held until the session has been stopped
+        self.token = license_pool.acquire(adams_launch_command) if license_pool is not None else None
+        try:
+            self.process = _start_adams(self.sim_dir, adams_launch_command)
+        except BaseException:
+            if self.token is not None:
+                LicensePool.release(self.token)
+            shutil.rmtree(self.sim_dir, ignore_errors=True)
+            raise
+
+        # One thread for the life of the session wakes up each job's wait when the process exits
+        threading.Thread(target=lambda: (self.process.wait(), self.wake.set()), daemon=True).start()
+
+    @property
+    def alive(self):
+        return self.n_jobs < self.max_jobs and self.process.poll() is None
+
+    def run(self, sim_dir, follower: LogFollower, timeout: float = None, deadline: float = None):
+        """Runs the script in `:arg:sim_dir` and waits for it to complete."""
+        # Follow the session's log from the end of the previous job
+        job_follower = LogFollower(self.sim_dir / 'aview.log', follower.complete_code)
+        job_follower.offset = (self.sim_dir / 'aview.log').stat().st_size if self.n_jobs else 0
+        # Events are added to the caller's follower as they are read
+        job_follower.events, job_follower.on_event = follower.events, follower.on_event
+
+        job = {'script': str(Path(sim_dir).absolute() / SCRIPT_NAME), 'complete_code': follower.complete_code}
+        _write_atomic(self.sim_dir / 'spool' / f'{self.n_jobs:06d}.job', json.dumps(job))
+        self.n_jobs += 1
+
+        try:
+            # A warm session does not exit when the job completes, so check its log more often
+            _wait_for_completion(self.sim_dir, follower.complete_code, self.process, job_follower,
+                                 timeout, deadline, wait_for_exit=False,
+                                 check_interval=SESSION_CHECK_INTERVAL, wake=self.wake)
+        finally:
+            follower.first_activity = job_follower.first_activity
+
+    def stop(self):
+        """Asks the session to exit once it is idle, and makes sure it does."""
+        (self.sim_dir / 'spool' / 'stop').touch()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            pass
+        _kill_process_tree(self.process)
+        shutil.rmtree(self.sim_dir, ignore_errors=True)
+
+        if self.token is not None:
+            LicensePool.release(self.token)
+            self.token = None
+
+
+def _write_server_script(sim_dir, max_jobs: int):
+    """Writes an Adams View Python script that runs the scripts of the jobs written to the spool
+    directory in `:arg:sim_dir`, one after another, until `:arg:max_jobs` have been run or a stop
+    file is written.
+    """
+    with open(Path(sim_dir) / SCRIPT_NAME, 'w') as fid:
+        fid.write('import os\n')
+        fid.write('import json\n')
+        fid.write('import time\n')
+
+        fid.write('n_jobs = 0\n')
+        fid.write(f'while n_jobs < {max_jobs} and not os.path.exists(os.path.join("spool", "stop")):\n')
+
+        # Wait for the next job
+        fid.write('    job_file = os.path.join("spool", f"{n_jobs:06d}.job")\n')
+        fid.write('    if not os.path.exists(job_file):\n')
+        fid.write('        time.sleep(0.02)\n')
+        fid.write('        continue\n')
+
+        # Run it, making sure the job is reported as complete even if the script fails
+        fid.write('    with open(job_file) as fid:\n')
+        fid.write('        job = json.load(fid)\n')
+        fid.write('    try:\n')
+        fid.write('        with open(job["script"]) as fid:\n')
+        fid.write('            exec(compile(fid.read(), job["script"], "exec"), {"__name__": "__main__"})\n')
+        fid.write('    except Exception as err:\n')
+        fid.write('        print(f"ERROR:  {err}")\n')
+        fid.write('        print(f"! -- SCRIPT COMPLETE {job[\'complete_code\']} --")\n')
+        fid.write('    n_jobs += 1\n')
+
+
+class HotFolder():
+    """Watches a directory and converts the Adams View Binary (.bin) files written to it.
+
+    A file is converted once its size and modification time have stopped changing for
+    `:arg:settle_time` seconds, so files that are still being copied in are left alone. Each file
+    is converted once per change. The files that settle together are shared out between sessions
+    of a pool of up to `:arg:max_workers` Adams View sessions as in `convert_many`.
+
+    If the optional `watchdog` package is installed only the files reported as changed are checked.
+    Otherwise the directory is listed every `:arg:poll_interval` seconds.
+
+    Parameters
+    ----------
+    directory : str or Path
+        Directory to watch. Subdirectories are not watched.
+    on_result : Callable[[ConversionResult], None], optional
+        Called with the result of each file once it is converted, by default the failures are
+        printed
+    settle_time : float, optional
+        Seconds a file must stay unchanged before it is converted, by default 2.0
+    poll_interval : float, optional
+        Seconds between checks of the directory, by default 1.0
+    journal : Journal, optional
+        Journal to record the status of each file in. Files recorded as complete that have not
+        changed since are not converted again, by default None
+    on_timing : Callable[[dict], None], optional
+        Called with a record of the time taken by each phase of the conversions. See `PhaseTimer`,
+        by default None
+    metrics : Metrics, optional
+        Metrics to record the conversions in, by default None
+    session_pool : SessionPool, optional
+        Pool of Adams View sessions started ahead of time to convert the files in, by default a new
+        session is started for each batch of files
+    scratch_dir : str or Path, optional
+        Local directory to run the conversions in, by default each conversion runs in the watched
+        directory
+    models : List[str], optional
+        Names or glob patterns of the models to write, by default every model is written
+    history : DurationHistory, optional
+        History of how long files took to convert, used to start the longest files first, by
+        default None
+    license_pool : LicensePool, optional
+        Machine wide limit on the number of Adams View sessions, by default None
+
+    See `convert_many` for the other parameters.
+
+    """
+
+    def __init__(self, directory, adams_launch_command=None, get_version_from_bin=False,
+                 max_workers=1, max_workers_per_version=None, timeout=None, retries=0,
+                 retry_delay=1.0, cache: ConversionCache = None, install_index: InstallIndex = None,
+                 on_result=None, settle_time=2.0, poll_interval=1.0, journal: Journal = None,
+                 on_timing=None, metrics: Metrics = None, session_pool: SessionPool = None,
+                 scratch_dir=None, models=None, history: DurationHistory = None,
+                 license_pool: LicensePool = None):
+        self.directory = Path(directory).resolve()
+        self.adams_launch_command = adams_launch_command
+        self.get_version_from_bin = get_version_from_bin
+        self.max_workers = max(1, max_workers)
+        self.max_workers_per_version = max_workers_per_version
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.cache = cache
+        self.install_index = install_index
+        self.on_result = on_result if on_result is not None else self._print_failure
+        self.settle_time = settle_time
+        self.poll_interval = poll_interval
+        self.journal = journal
+        self.timer = PhaseTimer(on_timing) if on_timing is not None else None
+        self.metrics = metrics
+        self.session_pool = session_pool
+        self.scratch_dir = scratch_dir
+        self.models = models
+        self.history = history
+        self.license_pool = license_pool
+        _check_license_pool(session_pool, license_pool)
+
+        # The (size, mtime) of each changing file and when it was first seen with them
+        self._pending = {}
+
+        # The (size, mtime) of each file when it was queued for conversion
+        self._queued = {}
+
+        self._changed = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def scan(self, paths=None):
+        """Checks `:arg:paths`, or every .bin file in the directory if None, and returns the files
+        that have settled and have not been converted since they last changed. The returned files
+        are considered queued.
+
+        Returns
+        -------
+        List[Path]
+            The files ready to be converted
+
+        """
+        now = monotonic()
+        if paths is None:
+            paths = [Path(entry.path) for entry in os.scandir(self.directory) if entry.is_file()]
+            for forgotten in (set(self._pending) | set(self._queued)) - set(paths):
+                self._pending.pop(forgotten, None)
+                self._queued.pop(forgotten, None)
+
+        ready = []
+        for path in set(paths) | set(self._pending):
+            if path.suffix.lower() != '.bin':
+                continue
+
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                self._pending.pop(path, None)
+                self._queued.pop(path, None)
+                continue
+
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self._queued.get(path) == signature:
+                continue
+
+            # Restart the clock whenever the file changes
+            if path not in self._pending or self._pending[path][0] != signature:
+                self._pending[path] = (signature, now)
+            elif now - self._pending[path][1] >= self.settle_time:
+                self._queued[path] = self._pending.pop(path)[0]
+                ready.append(path)
+
+        return sorted(ready)
+
+    def run(self):
+        """Watches the directory and converts files until `stop` is called. Conversions already
+        started are finished before returning.
+        """
+        self._stop.clear()
+
+        if self.journal is not None:
+            self._queued.update(self.journal.completed())
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, _watch_bin_files(
+            self.directory, self._changed, self._lock, self._wake
+        ) as watching:
+            scheduler = _SessionScheduler(
+                executor, max(1, min(self.max_workers_per_version or self.max_workers, self.max_workers))
+            )
+
+            # List the directory once up front, after that only look at the changed files
+            ready = self.scan()
+            while not self._stop.is_set():
+                if ready:
+                    self._submit(scheduler, ready)
+
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+                if watching is True:
+                    with self._lock:
+                        changed, self._changed = self._changed, set()
+                    ready = self.scan(changed)
+                else:
+                    ready = self.scan()
+
+            # Let the sessions that are waiting for their installation run before shutting down
+            scheduler.wait()
+
+    def stop(self):
+        """Stops `run` from another thread."""
+        self._stop.set()
+        self._wake.set()
+
+    def _submit(self, scheduler: _SessionScheduler, bin_files: List[Path]):
+        """Queues `:arg:bin_files` in `:arg:scheduler`."""
+        results, sessions, _ = _plan_sessions(
+            bin_files, self.adams_launch_command, self.get_version_from_bin, self.install_index,
+            self.max_workers, self.max_workers_per_version, True, self.timer, self.history
+        )
+
+        if self.journal is not None:
+            self.journal.record_pending(bin_files)
+
+        failed = [result for result in results if result is not None]
+        if self.metrics is not None:
+            self.metrics.record(failed)
+            self.metrics.queued(sum(len(indices) for _, indices in sessions))
+
+        for result in failed:
+            self._report(result)
+
+        for cmd, indices in sessions:
+            session_files = [bin_files[i] for i in indices]
+            future = scheduler.submit(
+                cmd,
+                _run_queued_session,
+                session_files,
+                cmd,
+                timeout=self.timeout,
+                retries=self.retries,
+                retry_delay=self.retry_delay,
+                cache=self.cache,
+                timer=self.timer,
+                metrics=self.metrics,
+                session_pool=self.session_pool,
+                scratch_dir=self.scratch_dir,
+                models=self.models,
+                history=self.history,
+                license_pool=self.license_pool,
+            )
+            future.add_done_callback(lambda f, files=session_files: self._session_done(f, files))
+
+    def _session_done(self, future: Future, bin_files: List[Path]):
+        """Reports the results of the session converting `:arg:bin_files`. If the session was
+        cancelled before it ran or raised, each of its files is reported as failed.
+        """
+        if future.cancelled():
+            if self.metrics is not None:
+                self.metrics.dequeued(len(bin_files))
+            results = [ConversionResult(bin_file, error='Conversion cancelled') for bin_file in bin_files]
+        elif future.exception() is not None:
+            results = [ConversionResult(bin_file, error=str(future.exception())) for bin_file in bin_files]
+        else:
+            results = future.result()
+
+        for result in results:
+            self._report(result)
+
+    def _report(self, result: ConversionResult):
+        if self.journal is not None:
+            self.journal.record(result)
+        self.on_result(result)
+
+    @staticmethod
+    def _print_failure(result: ConversionResult):
+        if result.success is False:
+            print(f'Failed to convert {result.bin_file}: {result.error}')
+
+
+@contextmanager
+def _watch_bin_files(directory, changed: set, lock: threading.Lock, event: threading.Event):
+    """Adds the .bin files in `:arg:directory` that change to `:arg:changed` and sets `:arg:event`.
+    Yields True if the directory is being watched or False if the optional `watchdog` package is
+    not installed.
+    """
+    if Observer is None:
+        yield False
+        return
+
+    class _Handler(FileSystemEventHandler):
+        def on_any_event(self, fs_event):
+            for path in (fs_event.src_path, getattr(fs_event, 'dest_path', '')):
+                if path and Path(path).suffix.lower() == '.bin':
+                    with lock:
+                        changed.add(Path(path))
+                    event.set()
+
+    observer = Observer()
+    observer.schedule(_Handler(), str(directory), recursive=False)
+    observer.start()
+    try:
+        yield True
+    finally:
+        observer.stop()
+        observer.join()
+
+
+class Journal():
+    """An append-only record of the status of each .bin file in a conversion run, so that an
+    interrupted run can be resumed without converting the completed files again.
+
+    Each line of the journal file is a JSON object giving the status of a file. The last line for
+    a file is its current status. A file only counts as complete if it has not changed since it was
+    converted.
+
+    Parameters
+    ----------
+    journal_file : str or Path
+        Path to the journal file. It is created if it does not exist.
+
+    """
+    PENDING = 'pending'
+    COMPLETE = 'complete'
+    FAILED = 'failed'
+
+    def __init__(self, journal_file):
+        self.journal_file = Path(journal_file)
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Reads the current status of each file in the journal.
+
+        Returns
+        -------
+        dict
+            The last entry recorded for each file, keyed by the resolved path of the file
+
+        """
+        entries = {}
+        if not self.journal_file.exists():
+            return entries
+
+        with open(self.journal_file, 'r', encoding='utf-8') as fid:
+            for line in fid:
+                # A line cut short by a crash is ignored
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[entry['bin_file']] = entry
+
+        return entries
+
+    def completed(self):
+        """Returns the files recorded as complete that have not changed since.
+
+        Returns
+        -------
+        dict
+            The (size, mtime) of each completed file, keyed by its resolved path
+
+        """
+        completed = {}
+        for path, entry in self.load().items():
+            signature = self._signature(Path(path))
+            if entry['status'] == self.COMPLETE and signature is not None and list(signature) == entry['signature']:
+                completed[Path(path)] = signature
+
+        return completed
+
+    def pending(self, bin_files):
+        """Returns the files in `:arg:bin_files` that are not recorded as complete, i.e. those that
+        are new, failed, were still pending when the run stopped or have changed since.
+        """
+        completed = self.completed()
+        return [Path(f) for f in bin_files if Path(f).resolve() not in completed]
+
+    def record_pending(self, bin_files):
+        """Records `:arg:bin_files` as waiting to be converted."""
+        self._append([self._entry(Path(f), self.PENDING) for f in bin_files])
+
+    def record(self, result: ConversionResult):
+        """Records the outcome of converting a file."""
+        status = self.COMPLETE if result.success is True else self.FAILED
+        self._append([self._entry(Path(result.bin_file), status, result.error)])
+
+    def _entry(self, bin_file: Path, status: str, error: str = None):
+        signature = self._signature(bin_file)
+        return {
+            'bin_file': str(bin_file.resolve()),
+            'status': status,
+            'signature': list(signature) if signature is not None else None,
+            'error': error,
+            'time': time(),
+        }
+
+    def _append(self, entries: List[dict]):
+        self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.journal_file, 'a', encoding='utf-8') as fid:
+            fid.write(''.join(json.dumps(entry) + '\n' for entry in entries))
+            fid.flush()
+            os.fsync(fid.fileno())
+
+    @staticmethod
+    def _signature(bin_file: Path):
+        try:
+            stat = bin_file.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+
+def expand_bin_files(paths, recursive=False):
+    """Expands the directories and glob patterns in `:arg:paths` into a list of .bin files.
+
+    Directories are replaced by the .bin files they contain, including those in subdirectories if
+    `:arg:recursive` is True. Glob patterns are matched relative to the current directory and may
+    use `**` to match any number of subdirectories if `:arg:recursive` is True. Other paths are
+    kept as they are. Duplicates and the sandbox directories of running conversions are removed.
+
+    Returns
+    -------
+    List[Path]
+        The .bin files, in the order they were given
+
+    """
+    bin_files = []
+    for path in paths:
+        path = Path(path)
+
+        if path.is_dir():
+            matches = sorted(path.glob('**/*' if recursive is True else '*'))
+        elif any(char in str(path) for char in '*?['):
+            pattern = str(path) if recursive is True else str(path).replace('**', '*')
+            matches = sorted(Path(p) for p in glob.glob(pattern, recursive=recursive))
+        else:
+            bin_files.append(path)
+            continue
+
+        bin_files += [
+            match for match in matches if match.suffix.lower() == '.bin' and match.is_file()
+            and not any(part.startswith(SANDBOX_PREFIX) for part in match.parts)
+        ]
+
+    return list(dict.fromkeys(bin_files))
+
+
+class WorkQueue():
+    """A queue of conversion jobs in a shared directory, so that workers on several machines can
+    split a conversion run between them.
+
+    A coordinator writes the jobs to a manifest with `create`. Each worker (see `work`) claims a
+    job by creating its lock file, which only one worker can do, converts the job's files and
+    writes the results. A worker keeps its claims fresh while it works, so a job whose claim has not
+    been refreshed for `:arg:stale_after` seconds is assumed to belong to a worker that died and is
+    claimed again.
+
+    Each claim on a job has a generation number. A stale claim is taken over by creating the lock
+    file of the next generation, which again only one worker can do. Lock files are kept until the
+    job is finished so a generation is never claimed twice, and the highest generation is the
+    current claim. Claims are compared with the time on the shared directory rather than the time
+    on each machine.
+
+    The queue directory contains
+
+    - `manifest.json`: The .bin files of each job
+    - `claims/<job>.lock.<generation>`: The worker that claimed each job
+    - `results/<job>.json`: The results of each finished job
+
+    Parameters
+    ----------
+    queue_dir : str or Path
+        The shared directory
+    stale_after : float, optional
+        Seconds after which a claim that has not been refreshed is considered stale, by default
+        300.0
+
+    """
+    MANIFEST_NAME = 'manifest.json'
+
+    def __init__(self, queue_dir, stale_after=300.0):
+        self.queue_dir = Path(queue_dir)
+        self.stale_after = stale_after
+        self._jobs = None
+
+    @classmethod
+    def create(cls, queue_dir, bin_files, files_per_job=1, stale_after=300.0):
+        """Writes a manifest of jobs to convert `:arg:bin_files` to `:arg:queue_dir`, with up to
+        `:arg:files_per_job` files in each job so that each Adams View session converts several
+        files.
+
+        Returns
+        -------
+        WorkQueue
+            The queue
+
+        """
+        queue = cls(queue_dir, stale_after)
+        bin_files = [str(Path(f).resolve()) for f in bin_files]
+        files_per_job = max(1, files_per_job)
+
+        jobs = {
+            f'{i // files_per_job:06d}': bin_files[i:i + files_per_job]
+            for i in range(0, len(bin_files), files_per_job)
+        }
+
+        for sub_dir in ('claims', 'results'):
+            (queue.queue_dir / sub_dir).mkdir(parents=True, exist_ok=True)
+        _write_atomic(queue.queue_dir / cls.MANIFEST_NAME, json.dumps({'jobs': jobs}, indent=2))
+
+        return queue
+
+    @property
+    def jobs(self):
+        """The .bin files of each job, keyed by job id."""
+        if self._jobs is None:
+            manifest = json.loads((self.queue_dir / self.MANIFEST_NAME).read_text())
+            self._jobs = manifest['jobs']
+        return self._jobs
+
+    def status(self):
+        """Returns the number of jobs that are finished, claimed and waiting.
+
+        Returns
+        -------
+        dict
+            The number of `finished`, `claimed` and `waiting` jobs
+
+        """
+        finished = self._finished()
+        claimed = {job for job in self.jobs if job not in finished and self._is_claimed(job)}
+        return {
+            'finished': len(finished),
+            'claimed': len(claimed),
+            'waiting': len(self.jobs) - len(finished) - len(claimed),
+        }
+
+    def results(self):
+        """Reads the results of the finished jobs.
+
+        Returns
+        -------
+        List[dict]
+            The result of each file (see `ConversionResult.to_dict`) with its `job` and the `worker`
+            that converted it
+
+        """
+        results = []
+        for job in sorted(self._finished()):
+            record = json.loads((self.queue_dir / 'results' / f'{job}.json').read_text())
+            results += [dict(result, job=job, worker=record['worker']) for result in record['results']]
+        return results
+
+    def wait(self, poll_interval=5.0, timeout=None):
+        """Waits until every job is finished.
+
+        Returns
+        -------
+        List[dict]
+            See `results`
+
+        Raises
+        ------
+        TimeoutError
+            Raised if the jobs are not finished within `:arg:timeout` seconds
+
+        """
+        deadline = monotonic() + timeout if timeout is not None else None
+        while len(self._finished()) < len(self.jobs):
+            if deadline is not None and monotonic() >= deadline:
+                raise TimeoutError(f'The jobs in {self.queue_dir} did not finish in time!')
+            sleep(poll_interval)
+
+        return self.results()
+
+    def work(self, max_workers=1, poll_interval=5.0, **kwargs):
+        """Claims and converts jobs until every job is finished. Jobs claimed by other workers
+        are waited for, in case their claims go stale.
+
+        Parameters
+        ----------
+        max_workers : int, optional
+            Number of jobs to work on at the same time, by default 1
+        poll_interval : float, optional
+            Seconds to wait before checking for stale claims again when every unfinished job is
+            claimed, by default 5.0
+        **kwargs
+            Passed to `convert_many` for each job, e.g. `adams_launch_command`
+
+        Returns
+        -------
+        List[str]
+            The ids of the jobs converted by this worker
+
+        """
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [executor.submit(self._work, poll_interval, kwargs) for _ in range(max(1, max_workers))]
+            return sorted(job for future in futures for job in future.result())
+
+    def _work(self, poll_interval, kwargs):
+        worker = f'{platform.node()}-{os.getpid()}-{threading.get_ident()}'
+        done = []
+
+        while True:
+            finished = self._finished()
+            unfinished = [job for job in self.jobs if job not in finished]
+            if not unfinished:
+                return done
+
+            for job in unfinished:
+                lock_file = self._claim(job, worker)
+                if lock_file is not None:
+                    break
+            else:
+                sleep(poll_interval)
+                continue
+
+            with self._keep_claimed(job, lock_file):
+                results = convert_many(self.jobs[job], **kwargs)
+                _write_atomic(self.queue_dir / 'results' / f'{job}.json', json.dumps({
+                    'job': job,
+                    'worker': worker,
+                    'results': [result.to_dict() for result in results],
+                }))
+
+            done.append(job)
+
+    def _claim(self, job: str, worker: str):
+        """Tries to claim `:arg:job` for `:arg:worker`, taking over the claim if it is stale.
+
+        Returns
+        -------
+        Path or None
+            The lock file of the claim, or None if the job was not claimed
+
+        """
+        claims = self._claims(job)
+
+        if claims:
+            generation, lock_file = claims[-1]
+            try:
+                if self._share_time(worker) - lock_file.stat().st_mtime <= self.stale_after:
+                    return None
+            except FileNotFoundError:
+                # The job has just finished
+                return None
+            generation += 1
+        else:
+            generation = 0
+
+        # Only one worker can create each generation of lock file
+        lock_file = self.queue_dir / 'claims' / f'{job}.lock.{generation}'
+        try:
+            fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return None
+
+        with os.fdopen(fd, 'w') as fid:
+            fid.write(json.dumps({'worker': worker, 'claimed': time()}))
+
+        # The job may have finished between listing the results and claiming it
+        if (self.queue_dir / 'results' / f'{job}.json').exists():
+            self._remove_claims(job)
+            return None
+
+        return lock_file
+
+    def _claims(self, job: str):
+        """Returns the generation and lock file of each claim on `:arg:job`, oldest first."""
+        claims = []
+        for lock_file in (self.queue_dir / 'claims').glob(f'{job}.lock.*'):
+            try:
+                claims.append((int(lock_file.suffix[1:]), lock_file))
+            except ValueError:
+                continue
+        return sorted(claims)
+
+    def _is_claimed(self, job: str):
+        claims = self._claims(job)
+        try:
+            return claims != [] and claims[-1][1].stat().st_mtime > 0
+        except FileNotFoundError:
+            return False
+
+    def _share_time(self, worker: str):
+        """Returns the current time according to the shared directory."""
+        clock_file = self.queue_dir / 'claims' / f'.clock.{worker}'
+        clock_file.touch()
+        try:
+            return clock_file.stat().st_mtime
+        finally:
+            clock_file.unlink(missing_ok=True)
+
+    def _remove_claims(self, job: str):
+        for _, lock_file in self._claims(job):
+            lock_file.unlink(missing_ok=True)
+
+    @contextmanager
+    def _keep_claimed(self, job: str, lock_file: Path):
+        """Refreshes the claim on `:arg:job` held with `:arg:lock_file` in the background and
+        releases it afterwards. The lock files are removed once the job is finished. Otherwise the
+        claim is marked stale straight away, so that another worker can take the job over.
+        """
+        stop = threading.Event()
+
+        def _refresh():
+            while not stop.wait(self.stale_after / 3):
+                try:
+                    os.utime(lock_file)
+                except OSError:
+                    pass
+
+        thread = threading.Thread(target=_refresh, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+            if (self.queue_dir / 'results' / f'{job}.json').exists():
+                self._remove_claims(job)
+            else:
+                try:
+                    os.utime(lock_file, (0, 0))
+                except FileNotFoundError:
+                    pass
+
+    def _finished(self):
+        return {p.stem for p in (self.queue_dir / 'results').glob('*.json')}
+
+
+def _write_atomic(path: Path, text: str):
+    """Writes `:arg:text` to `:arg:path` so that readers never see a partly written file."""
+    tmp_file = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    tmp_file.write_text(text)
+    os.replace(tmp_file, path)
+
+
+class Metrics():
+    """Counters, gauges and histograms describing the conversions run, for monitoring long running
+    conversions (e.g. `HotFolder`) with Prometheus.
+
+    The metrics can be read with `render`, served over HTTP with `serve` or written to
+    `:arg:textfile` (e.g. for the node exporter's textfile collector), which is rewritten whenever
+    they change.
+
+    Parameters
+    ----------
+    textfile : str or Path, optional
+        File to keep up to date with the metrics in the Prometheus text format, by default None
+
+    """
+    PREFIX = 'adams_bin_converter'
+    LATENCY_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+    def __init__(self, textfile=None):
+        self.textfile = Path(textfile) if textfile is not None else None
+        self.files = {'converted': 0, 'cached': 0, 'failed': 0}
+        self.failures = {}
+        self.queue_depth = 0
+        self.active_sessions = 0
+        self.sessions = 0
+        self.conversion_seconds = _Histogram(self.LATENCY_BUCKETS)
+        self.session_seconds = _Histogram(self.LATENCY_BUCKETS)
+        self._lock = threading.Lock()
+
+    def queued(self, n_files: int):
+        """Records `:arg:n_files` files waiting for a session."""
+        with self._lock:
+            self.queue_depth += n_files
+        self._changed()
+
+    def dequeued(self, n_files: int):
+        """Records `:arg:n_files` files no longer waiting for a session."""
+        with self._lock:
+            self.queue_depth -= n_files
+        self._changed()
+
+    def session_started(self):
+        with self._lock:
+            self.active_sessions += 1
+            self.sessions += 1
+        self._changed()
+
+    def session_finished(self, seconds: float):
+        with self._lock:
+            self.active_sessions -= 1
+            self.session_seconds.observe(seconds)
+        self._changed()
+
+    def record(self, results: List[ConversionResult]):
+        """Records the outcome of converting each of `:arg:results`."""
+        with self._lock:
+            for result in results:
+                if result.success is False:
+                    self.files['failed'] += 1
+                    cause = self._failure_cause(result)
+                    self.failures[cause] = self.failures.get(cause, 0) + 1
+                elif result.cached is True:
+                    self.files['cached'] += 1
+                else:
+                    self.files['converted'] += 1
+
+                if result.duration is not None:
+                    self.conversion_seconds.observe(result.duration)
+        self._changed()
+
+    def render(self):
+        """Returns the metrics in the Prometheus text format."""
+        name = self.PREFIX
+        with self._lock:
+            looked_up = self.files['cached'] + self.files['converted']
+            lines = [
+                f'# HELP {name}_files_total Files processed by outcome.',
+                f'# TYPE {name}_files_total counter',
+                *(f'{name}_files_total{{outcome="{k}"}} {v}' for k, v in self.files.items()),
+                f'# HELP {name}_failures_total Files that failed to convert by cause.',
+                f'# TYPE {name}_failures_total counter',
+                *(f'{name}_failures_total{{cause="{k}"}} {v}' for k, v in sorted(self.failures.items())),
+                f'# HELP {name}_queue_depth Files waiting for an Adams View session.',
+                f'# TYPE {name}_queue_depth gauge',
+                f'{name}_queue_depth {self.queue_depth}',
+                f'# HELP {name}_active_sessions Adams View sessions running.',
+                f'# TYPE {name}_active_sessions gauge',
+                f'{name}_active_sessions {self.active_sessions}',
+                f'# HELP {name}_sessions_total Adams View sessions started.',
+                f'# TYPE {name}_sessions_total counter',
+                f'{name}_sessions_total {self.sessions}',
+                f'# HELP {name}_cache_hit_ratio Fraction of successful files served from the cache.',
+                f'# TYPE {name}_cache_hit_ratio gauge',
+                f'{name}_cache_hit_ratio {self.files["cached"] / looked_up if looked_up else 0.0}',
+                f'# HELP {name}_conversion_seconds Time Adams View spent converting each file.',
+                f'# TYPE {name}_conversion_seconds histogram',
+                *self.conversion_seconds.render(f'{name}_conversion_seconds'),
+                f'# HELP {name}_session_seconds Time each Adams View session ran for.',
+                f'# TYPE {name}_session_seconds histogram',
+                *self.session_seconds.render(f'{name}_session_seconds'),
+            ]
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, textfile):
+        """Writes the metrics to `:arg:textfile`. The file is replaced in one step so that it is
+        never read half written.
+        """
+        _write_atomic(Path(textfile), self.render())
+
+    def serve(self, port: int, host='127.0.0.1'):
+        """Serves the metrics over HTTP on `:arg:host`:`:arg:port` from a background thread.
+
+        Returns
+        -------
+        ThreadingHTTPServer
+            The server. Call its `shutdown` method to stop it.
+
+        """
+        metrics = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def _changed(self):
+        if self.textfile is not None:
+            self.write(self.textfile)
+
+    @staticmethod
+    def _failure_cause(result: ConversionResult):
+        if result.adams_launch_command is None:
+            return 'launch_command'
+        elif 'did not finish in time' in result.error:
+            return 'timeout'
+        elif result.error.startswith(('Adams View exited', 'The Adams View Script did not')):
+            return 'session'
+        else:
+            return 'file'
+
+
+class _Histogram():
+    """A Prometheus histogram with cumulative `:arg:buckets`."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self, name: str):
+        lines, total = [], 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {total}')
+
+        return lines + [f'{name}_sum {self.sum}', f'{name}_count {total}']
+
+
+class AdamsVersionError(Exception):
+    pass
+
+
+class AdamsTimeoutError(RuntimeError):
+    pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Converts an Adams View Binary (.bin) files to an Adams View Command (.cmd) files.'
+    )
+
+    parser.add_argument(
+        'bin_files',
+        metavar='bin_file',
+        type=str,
+        nargs='*',
+        help='Adams View Binary file(s) to be converted to Adams View Command file(s). Directories '
+        'and glob patterns are expanded to the .bin files they contain.'
+    )
+
+    parser.add_argument(
+        '--p',
         type=str,
         default=None,
         required=False,
@@ -446,19 +4047,512 @@ if __name__ == '__main__':
                 'error.'
     )
 
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Convert all the .bin files in a single Adams View session instead of starting a new '
+        'session for each file.'
+    )
+
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        metavar='N',
+        help='The maximum number of Adams View sessions to run at the same time.'
+    )
+
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=None,
+        metavar='SECONDS',
+        help='The number of seconds allowed for each file. A session that writes nothing to its '
+        'log for this long is considered hung and is terminated.'
+    )
+
+    parser.add_argument(
+        '--global-timeout',
+        type=float,
+        default=None,
+        metavar='SECONDS',
+        help='The number of seconds allowed for the whole run.'
+    )
+
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=0,
+        metavar='N',
+        help='The number of times to retry a file whose Adams View session hangs or crashes.'
+    )
+
+    parser.add_argument(
+        '--retry-delay',
+        type=float,
+        default=1.0,
+        metavar='SECONDS',
+        help='The number of seconds to wait before the first retry. The delay doubles for each '
+        'further retry.'
+    )
+
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help=f'The directory in which to cache converted files. Unchanged .bin files are served '
+        f'from the cache without launching Adams View. Defaults to {CACHE_DIR}.'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read from or write to the cache.'
+    )
+
+    parser.add_argument(
+        '--jobs-per-version',
+        type=int,
+        default=None,
+        metavar='N',
+        help='The maximum number of Adams View sessions of the same Adams version to run at the same '
+        'time. Defaults to the value of --jobs.'
+    )
+
+    parser.add_argument(
+        '--stream-json',
+        action='store_true',
+        help='Write a JSON line describing each file to stdout as soon as it is converted. Other '
+        'messages are written to stderr.'
+    )
+
+    parser.add_argument(
+        '--watch',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='Watch DIR and convert .bin files as they are written to it, once they have stopped '
+        'changing. Runs until interrupted.'
+    )
+
+    parser.add_argument(
+        '--settle-time',
+        type=float,
+        default=2.0,
+        metavar='SECONDS',
+        help='With --watch, the number of seconds a file must stay unchanged before it is converted.'
+    )
+
+    parser.add_argument(
+        '--recursive',
+        action='store_true',
+        help='Include the .bin files in subdirectories of directory arguments and let ** in glob '
+        'patterns match any number of subdirectories.'
+    )
+
+    parser.add_argument(
+        '--journal',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='Append the status of each file to FILE as the run progresses.'
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Skip the files recorded as complete in the --journal file that have not changed since. '
+        'Files that failed or were never finished are converted again.'
+    )
+
+    parser.add_argument(
+        '--timings',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='Append a JSON line giving the time taken by each phase of each conversion to FILE. Use '
+        '- to write them to stderr.'
+    )
+
+    parser.add_argument(
+        '--metrics-file',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='Keep FILE up to date with metrics about the conversions in the Prometheus text format.'
+    )
+
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=None,
+        metavar='PORT',
+        help='Serve metrics about the conversions in the Prometheus text format at '
+        'http://127.0.0.1:PORT/metrics.'
+    )
+
+    parser.add_argument(
+        '--enqueue',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='Write jobs to convert the .bin files to the shared directory DIR instead of converting '
+        'them, so that workers started with --worker DIR can convert them.'
+    )
+
+    parser.add_argument(
+        '--files-per-job',
+        type=int,
+        default=1,
+        metavar='N',
+        help='With --enqueue, the number of .bin files in each job.'
+    )
+
+    parser.add_argument(
+        '--worker',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='Claim and convert jobs from the shared directory DIR until every job is finished. Use '
+        '--jobs to work on several jobs at the same time.'
+    )
+
+    parser.add_argument(
+        '--stale-after',
+        type=float,
+        default=300.0,
+        metavar='SECONDS',
+        help='With --worker, the number of seconds after which a job claimed by a worker that has '
+        'stopped responding is claimed again.'
+    )
+
+    parser.add_argument(
+        '--warm-sessions',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Keep N Adams View sessions of each Adams version running and waiting for files, so '
+        'that conversions do not wait for Adams View to start. Most useful with --watch.'
+    )
+
+    parser.add_argument(
+        '--session-max-jobs',
+        type=int,
+        default=50,
+        metavar='N',
+        help='With --warm-sessions, the number of jobs each session runs before it is replaced.'
+    )
+
+    parser.add_argument(
+        '--scratch-dir',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='Run the conversions in the local directory DIR instead of next to the .bin files. Use '
+        'this when the .bin files are on a slow network share. The .bin files are copied to DIR and '
+        'each .cmd file is moved back in one step once it is complete.'
+    )
+
+    parser.add_argument(
+        '--model',
+        type=str,
+        action='append',
+        default=None,
+        metavar='NAME',
+        dest='models',
+        help='Only write the models whose names match NAME, which may be a glob pattern such as '
+        '"car_*". Case is ignored. Repeat to write several models. Files that contain none of the '
+        'models fail.'
+    )
+
+    parser.add_argument(
+        '--list-models',
+        action='store_true',
+        help='Print the models in each .bin file and the number of parts, constraints and forces '
+        'in each model as JSON instead of converting the files.'
+    )
+
+    parser.add_argument(
+        '--history-file',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='The file in which to record how long each .bin file took to convert. The files '
+        f'expected to take longest are converted first and an estimate of the total time is '
+        f'printed. Defaults to {HISTORY_FILE}.'
+    )
+
+    parser.add_argument(
+        '--no-history',
+        action='store_true',
+        help='Do not read from or write to the history file. The files are converted in the order '
+        'given.'
+    )
+
+    parser.add_argument(
+        '--licenses',
+        type=str,
+        action='append',
+        default=None,
+        metavar='[VERSION=]N',
+        help='Limit the number of Adams View sessions running on this machine at the same time, '
+        'across every process started with --licenses, to N for each Adams version. VERSION=N sets '
+        'the limit for a single version, named after its version directory (e.g. 2019_2=2). Repeat '
+        'to set several limits. Versions without a limit are limited to one session. Sessions wait '
+        'for a free license in the order they asked for one.'
+    )
+
     args = parser.parse_args()
-    bin_files = args.bin_files
+    bin_files = expand_bin_files(args.bin_files, recursive=args.recursive)
+
+    if not args.bin_files and args.watch is None and args.worker is None:
+        parser.error('at least one bin_file, --watch DIR or --worker DIR is required')
+    if args.resume is True and args.journal is None:
+        parser.error('--resume requires --journal FILE')
+
+    journal = Journal(args.journal) if args.journal is not None else None
+
+    license_pool = None
+    if args.licenses is not None:
+        license_pool = LicensePool()
+        for spec in args.licenses:
+            version, _, capacity = spec.rpartition('=')
+            if not capacity.isdigit():
+                parser.error(f'argument --licenses: invalid value: {spec!r}')
+            if version:
+                license_pool.capacities[version] = int(capacity)
+            else:
+                license_pool.capacity = int(capacity)
+
+    session_pool = None
+    if args.warm_sessions > 0:
+        session_pool = SessionPool(
+            args.warm_sessions,
+            args.session_max_jobs,
+            [args.adams_launch_command] if _is_launch_command(args.adams_launch_command) else [],
+            license_pool=license_pool,
+        )
+
+        # Never leave the sessions running
+        atexit.register(session_pool.close)
+
+    metrics = None
+    if args.metrics_file is not None or args.metrics_port is not None:
+        metrics = Metrics(args.metrics_file)
+        if args.metrics_port is not None:
+            metrics.serve(args.metrics_port)
+
+    on_timing = None
+    if args.timings is not None:
+        timings_lock = threading.Lock()
+        timings_file = sys.stderr if args.timings == '-' else open(args.timings, 'a', buffering=1)
+
+        def on_timing(record: dict):
+            with timings_lock:
+                timings_file.write(json.dumps(record) + '\n')
+    if args.resume is True:
+        n_files = len(bin_files)
+        bin_files = journal.pending(bin_files)
+        print(f'Resuming from {args.journal}: skipping {n_files - len(bin_files)} completed file(s).')
+    cache = ConversionCache(args.cache_dir) if args.no_cache is False else None
+    install_index = InstallIndex(cache_file=INSTALL_INDEX_FILE)
+    history = DurationHistory(args.history_file or HISTORY_FILE) if args.no_history is False else None
 
-    for bin_file in bin_files:
+    if args.enqueue is not None:
 
-        # adams_launch_command = _get_adams_launch_command(
-        #     adams_launch_command = args.adams_launch_command,
-        #     bin_file = Path(bin_file) if args.adams_launch_command is None else None,
-        #     silent = True,
-        # )
+        queue = WorkQueue.create(args.enqueue, bin_files, args.files_per_job, args.stale_after)
+        print(f'Wrote {len(queue.jobs)} job(s) to {args.enqueue}.')
 
-        convert(
-            bin_file,
+    elif args.worker is not None:
+
+        queue = WorkQueue(args.worker, args.stale_after)
+        done = queue.work(
+            max_workers=args.jobs,
+            adams_launch_command=args.adams_launch_command,
+            get_version_from_bin=True if args.adams_launch_command is None else False,
+            timeout=args.timeout,
+            retries=args.retries,
+            retry_delay=args.retry_delay,
+            cache=cache,
+            install_index=install_index,
+            on_timing=on_timing,
+            metrics=metrics,
+            session_pool=session_pool,
+            scratch_dir=args.scratch_dir,
+            models=args.models,
+            history=history,
+            license_pool=license_pool,
+        )
+
+        print(f'Converted {len(done)} job(s) from {args.worker}.')
+        for result in queue.results():
+            if result['success'] is False and result['job'] in done:
+                print(f'Failed to convert {result["bin_file"]}: {result["error"]}')
+
+    elif args.list_models is True:
+
+        # Keep stdout for the JSON only
+        stream = sys.stdout
+        with redirect_stdout(sys.stderr):
+            inventories = list_models(
+                bin_files,
+                adams_launch_command=args.adams_launch_command,
+                get_version_from_bin=True if args.adams_launch_command is None else False,
+                max_workers=args.jobs,
+                timeout=args.timeout,
+                cache=cache,
+                install_index=install_index,
+                scratch_dir=args.scratch_dir,
+                license_pool=license_pool,
+            )
+
+        print(json.dumps([inventory.to_dict() for inventory in inventories], indent=2), file=stream)
+
+    elif args.watch is not None:
+
+        stream = sys.stdout
+
+        def _report(result: ConversionResult):
+            if args.stream_json is True:
+                print(json.dumps(result.to_dict()), file=stream, flush=True)
+            elif result.success is True:
+                print(f'Converted {result.bin_file}')
+            else:
+                print(f'Failed to convert {result.bin_file}: {result.error}')
+
+        hot_folder = HotFolder(
+            args.watch,
+            adams_launch_command=args.adams_launch_command,
+            get_version_from_bin=True if args.adams_launch_command is None else False,
+            max_workers=args.jobs,
+            max_workers_per_version=args.jobs_per_version,
+            timeout=args.timeout,
+            retries=args.retries,
+            retry_delay=args.retry_delay,
+            cache=cache,
+            install_index=install_index,
+            on_result=_report,
+            settle_time=args.settle_time,
+            journal=journal,
+            on_timing=on_timing,
+            metrics=metrics,
+            session_pool=session_pool,
+            scratch_dir=args.scratch_dir,
+            models=args.models,
+            history=history,
+            license_pool=license_pool,
+        )
+
+        print(f'Watching {args.watch} for .bin files. Press Ctrl+C to stop.', file=sys.stderr)
+        with redirect_stdout(sys.stderr if args.stream_json is True else sys.stdout):
+            try:
+                hot_folder.run()
+            except KeyboardInterrupt:
+                pass
+
+    elif args.stream_json is True or journal is not None:
+
+        if journal is not None:
+            journal.record_pending(bin_files)
+
+        # Keep stdout for the JSON lines only
+        stream = sys.stdout
+        with redirect_stdout(sys.stderr if args.stream_json is True else sys.stdout):
+            if history is not None:
+                eta = history.eta(bin_files, args.jobs)
+                if eta is not None:
+                    print(f'Estimated time to convert {len(bin_files)} file(s): '
+                          f'{timedelta(seconds=round(eta))}')
+
+            results = iter_convert(
+                bin_files,
+                adams_launch_command=args.adams_launch_command,
+                get_version_from_bin=True if args.adams_launch_command is None else False,
+                max_workers=args.jobs,
+                max_workers_per_version=args.jobs_per_version,
+                batch=args.batch,
+                timeout=args.timeout,
+                global_timeout=args.global_timeout,
+                retries=args.retries,
+                retry_delay=args.retry_delay,
+                cache=cache,
+                install_index=install_index,
+                on_timing=on_timing,
+                metrics=metrics,
+                session_pool=session_pool,
+                scratch_dir=args.scratch_dir,
+                models=args.models,
+                history=history,
+                license_pool=license_pool,
+            )
+
+            for result in results:
+                if journal is not None:
+                    journal.record(result)
+
+                if args.stream_json is True:
+                    print(json.dumps(result.to_dict()), file=stream, flush=True)
+                elif result.success is False:
+                    print(f'Failed to convert {result.bin_file}: {result.error}')
+
+    elif args.batch is True or args.jobs > 1 or args.global_timeout is not None:
+
+        if history is not None:
+            eta = history.eta(bin_files, args.jobs)
+            if eta is not None:
+                print(f'Estimated time to convert {len(bin_files)} file(s): '
+                      f'{timedelta(seconds=round(eta))}')
+
+        results = convert_many(
+            bin_files,
             adams_launch_command=args.adams_launch_command,
             get_version_from_bin=True if args.adams_launch_command is None else False,
+            max_workers=args.jobs,
+            max_workers_per_version=args.jobs_per_version,
+            batch=args.batch,
+            timeout=args.timeout,
+            global_timeout=args.global_timeout,
+            retries=args.retries,
+            retry_delay=args.retry_delay,
+            cache=cache,
+            install_index=install_index,
+            on_timing=on_timing,
+            metrics=metrics,
+            session_pool=session_pool,
+            scratch_dir=args.scratch_dir,
+            models=args.models,
+            history=history,
+            license_pool=license_pool,
         )
+
+        for result in results:
+            if result.success is False:
+                print(f'Failed to convert {result.bin_file}: {result.error}')
+
+    else:
+
+        for bin_file in bin_files:
+
+            # adams_launch_command = _get_adams_launch_command(
+            #     adams_launch_command = args.adams_launch_command,
+            #     bin_file = Path(bin_file) if args.adams_launch_command is None else None,
+            #     silent = True,
+            # )
+
+            convert(
+                bin_file,
+                adams_launch_command=args.adams_launch_command,
+                get_version_from_bin=True if args.adams_launch_command is None else False,
+                timeout=args.timeout,
+                retries=args.retries,
+                retry_delay=args.retry_delay,
+                cache=cache,
+                install_index=install_index,
+                on_timing=on_timing,
+                metrics=metrics,
+                session_pool=session_pool,
+                scratch_dir=args.scratch_dir,
+                models=args.models,
+                license_pool=license_pool,
+            )
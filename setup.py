@@ -13,7 +13,7 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/bthornton191/adams_bin_converter",
-    packages=setuptools.find_packages(exclude=['test', 'pkg']),
+    packages=setuptools.find_packages(exclude=['test', 'test.*', 'pkg']),
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,155 @@
+"""Benchmark of conversion throughput against the fake Adams installation.
+
+Measures files per second, per-file latency percentiles and scaling with the number of workers
+for `convert`, `convert_many`, `iter_convert` and `convert_many_async`, and for `convert_many`
+with a `SessionPool` of pre-started sessions. `convert_many_async` has no way to report when each
+file is ready, so only its throughput is measured.
+
+Run with `python -m test.benchmark_throughput [--files N] [--startup S] [--file-cost S]`.
+"""
+import argparse
+import asyncio
+import io
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from statistics import quantiles
+from time import perf_counter, sleep, time
+
+from adams_bin_converter import SessionPool, convert, convert_many, convert_many_async, iter_convert
+from test.fake_adams import make_fake_bin, make_fake_install
+
+
+def _percentiles(latencies):
+    if len(latencies) < 2:
+        return latencies * 3
+    cuts = quantiles(latencies, n=100, method='inclusive')
+    return cuts[49], cuts[89], cuts[98]
+
+
+def _report(name, n_files, elapsed, latencies, baseline=None):
+    speedup = f'{baseline / elapsed:5.2f}x' if baseline is not None else '     -'
+    if latencies is None:
+        percentiles = ''
+    else:
+        p50, p90, p99 = _percentiles(sorted(latencies))
+        percentiles = f'p50 {p50:6.3f} s  p90 {p90:6.3f} s  p99 {p99:6.3f} s'
+    print(f'  {name:<28} {n_files / elapsed:8.2f} files/s  {speedup}  {percentiles}'.rstrip())
+
+
+def _published(records, started):
+    """Returns the seconds from wall clock time `started` until each file's .cmd files were
+    published, from the `on_timing` records of a run.
+    """
+    return [r['start'] + r['duration'] - started
+            for r in records if r['phase'] == 'publish' for _ in r['bin_files']]
+
+
+def _quiet(bench, *args):
+    """Runs `bench` without the converter's messages."""
+    with redirect_stdout(io.StringIO()):
+        return bench(*args)
+
+
+def _reset(bin_files):
+    for cmd_file in bin_files[0].parent.glob('*.cmd'):
+        cmd_file.unlink()
+
+
+def bench_convert(bin_files, cmd):
+    latencies = []
+    start = perf_counter()
+    for bin_file in bin_files:
+        file_start = perf_counter()
+        convert(bin_file, adams_launch_command=cmd)
+        latencies.append(perf_counter() - file_start)
+    return perf_counter() - start, latencies
+
+
+def bench_iter_convert(bin_files, cmd, workers, batch):
+    latencies = []
+    start = perf_counter()
+    for result in iter_convert(bin_files, adams_launch_command=cmd, max_workers=workers, batch=batch):
+        assert result.success, result.error
+        latencies.append(perf_counter() - start)
+    return perf_counter() - start, latencies
+
+
+def bench_convert_many(bin_files, cmd, workers, batch):
+    records = []
+    started, start = time(), perf_counter()
+    results = convert_many(bin_files, adams_launch_command=cmd, max_workers=workers, batch=batch,
+                           on_timing=records.append)
+    elapsed = perf_counter() - start
+    assert all(r.success for r in results)
+    return elapsed, _published(records, started)
+
+
+def bench_convert_many_async(bin_files, cmd, workers, batch):
+    start = perf_counter()
+    results = asyncio.run(convert_many_async(bin_files, adams_launch_command=cmd, max_workers=workers,
+                                             batch=batch))
+    elapsed = perf_counter() - start
+    assert all(r.success for r in results)
+    return elapsed, None
+
+
+def bench_session_pool(bin_files, cmd, workers, batch, startup):
+    with SessionPool(size=workers, max_jobs=len(bin_files), adams_launch_commands=[cmd]) as pool:
+        sleep(startup)
+        records = []
+        started, start = time(), perf_counter()
+        results = convert_many(bin_files, adams_launch_command=cmd, max_workers=workers, batch=batch,
+                               session_pool=pool, on_timing=records.append)
+        elapsed = perf_counter() - start
+
+    assert all(r.success for r in results)
+    return elapsed, _published(records, started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=24, help='Number of .bin files to convert.')
+    parser.add_argument('--startup', type=float, default=0.5, help='Adams View startup time (s).')
+    parser.add_argument('--file-cost', type=float, default=0.05, help='Time to read each file (s).')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Numbers of workers to measure scaling with.')
+    args = parser.parse_args()
+
+    test_dir = Path(tempfile.mkdtemp())
+    try:
+        cmd, = make_fake_install(test_dir / 'install', startup_time=args.startup, file_cost=args.file_cost)
+        bin_files = [make_fake_bin(test_dir / 'files' / f'test_{i:04d}.bin') for i in range(args.files)]
+
+        print(f'{args.files} files, {args.startup} s startup, {args.file_cost} s per file')
+        print('  Latencies are from the start of the run until each file\'s .cmd files are in place, '
+              'except for convert.')
+
+        elapsed, latencies = _quiet(bench_convert, bin_files, cmd)
+        _report('convert (sequential)', len(bin_files), elapsed, latencies)
+        baseline = elapsed
+        _reset(bin_files)
+
+        for batch in (False, True):
+            for workers in args.workers:
+                for name, bench in (('iter_convert', bench_iter_convert),
+                                    ('convert_many', bench_convert_many),
+                                    ('convert_many_async', bench_convert_many_async)):
+                    elapsed, latencies = _quiet(bench, bin_files, cmd, workers, batch)
+                    label = f'{name} {"batch" if batch else "single"} x{workers}'
+                    _report(label, len(bin_files), elapsed, latencies, baseline)
+                    _reset(bin_files)
+
+        # The sessions are started before the clock starts, as they would be in a long running worker
+        for workers in args.workers:
+            elapsed, latencies = _quiet(bench_session_pool, bin_files, cmd, workers, False, args.startup)
+            _report(f'session_pool single x{workers}', len(bin_files), elapsed, latencies, baseline)
+            _reset(bin_files)
+
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Micro-benchmark of resolving the installed version for many .bin files.
+
+Run with `python -m test.benchmark_version`.
+"""
+import random
+from timeit import timeit
+
+from adams_bin_converter import Version, VersionIndex
+
+N_FILES = 10000
+N_INSTALLS = 48
+
+
+def main():
+    rng = random.Random(0)
+    installed = list({Version(rng.randint(2012, 2024), rng.randint(0, 3), rng.randint(0, 2),
+                              rng.choice([0, 748966, 826892])) for _ in range(N_INSTALLS)})
+    targets = [Version(rng.randint(2010, 2024), rng.randint(0, 4), rng.randint(0, 3))
+               for _ in range(N_FILES)]
+
+    def _resolve(resolver):
+        for tgt in targets:
+            try:
+                resolver(tgt)
+            except Exception:
+                pass
+
+    # Resolving against the list builds a new index for every file
+    per_call = timeit(lambda: _resolve(lambda tgt: tgt.get_closest_version(installed)), number=1)
+
+    # A prebuilt index only bisects
+    index = VersionIndex(installed)
+    prebuilt = timeit(lambda: _resolve(index.get_closest_version), number=1)
+
+    print(f'{N_FILES} files against {len(installed)} installs')
+    print(f'  Version.get_closest_version : {per_call * 1e3:8.1f} ms ({per_call / N_FILES * 1e6:.2f} us/file)')
+    print(f'  VersionIndex (prebuilt)     : {prebuilt * 1e3:8.1f} ms ({prebuilt / N_FILES * 1e6:.2f} us/file)')
+
+
+if __name__ == '__main__':
+    main()
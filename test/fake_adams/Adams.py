@@ -0,0 +1,56 @@
+"""Stub of the parts of the Adams View python interface used by the generated script. The
+behaviour is set by the launcher from the fake installation's config file.
+"""
+import fnmatch
+import os
+import time
+
+_config = {}
+
+
+class Model():
+    def __init__(self, name):
+        self.name = name
+        self.Parts = {'ground': None}
+        self.Constraints = {}
+        self.Forces = {}
+
+
+Models = {}
+
+
+def read_binary_file(file_name):
+    Models.clear()
+    name = os.path.basename(file_name)
+
+    with open(file_name, 'rb') as fid:
+        data = fid.read()
+
+    time.sleep(_config.get('file_cost', 0.0) + _config.get('cost_per_mb', 0.0) * len(data) / 2**20)
+
+    if _matches(name, 'hang'):
+        while True:
+            time.sleep(60)
+    if _matches(name, 'crash'):
+        os._exit(1)
+    if _matches(name, 'fail'):
+        # Adams View errors often span several lines
+        raise RuntimeError(f'Unable to read {name}\nThe file is not a valid Adams View database.')
+
+    for line in data.decode('ascii', errors='ignore').splitlines()[1:]:
+        if line.startswith('model '):
+            Models[line.split()[1]] = Model(line.split()[1])
+
+
+def write_command_file(file_name, model):
+    with open(file_name, 'w') as fid:
+        fid.write(f'model create model_name = {model.name}\n')
+
+
+def execute_cmd(cmd):
+    if cmd.startswith('model delete'):
+        Models.pop(cmd.split('=')[-1].strip(), None)
+
+
+def _matches(name, key):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in _config.get(key, []))
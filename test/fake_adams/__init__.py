@@ -0,0 +1,107 @@
+"""A stand-in for an Adams installation so that the converter can be tested and benchmarked on a
+machine without Adams.
+
+`make_fake_install` creates `<install_dir>/<version_dir>/common/mdi.bat` launchers that run the
+generated `_bin_converter.py` script against the stub `Adams` module in this package, writing an
+aview.log the way Adams View does. `make_fake_bin` writes .bin files the stub can read.
+"""
+import json
+import platform
+import stat
+import sys
+from pathlib import Path
+
+FAKE_ADAMS_DIR = Path(__file__).parent
+CONFIG_NAME = 'fake_adams.json'
+
+
+def make_fake_install(install_dir, versions=('2019_2',), startup_time=0.0, file_cost=0.0,
+                      cost_per_mb=0.0, fail=(), crash=(), hang=()):
+    """Creates a fake Adams installation for each of `:arg:versions` in `:arg:install_dir`.
+
+    Parameters
+    ----------
+    install_dir : str or Path
+        Directory to create the installations in
+    versions : List[str], optional
+        Names of the version directories, by default ('2019_2',)
+    startup_time : float, optional
+        Seconds each session waits before it starts writing aview.log, by default 0.0
+    file_cost : float, optional
+        Seconds taken to read each .bin file, by default 0.0
+    cost_per_mb : float, optional
+        Additional seconds taken per MB of each .bin file, by default 0.0
+    fail : List[str], optional
+        Glob patterns of .bin file names that fail to load, by default ()
+    crash : List[str], optional
+        Glob patterns of .bin file names that crash the session, by default ()
+    hang : List[str], optional
+        Glob patterns of .bin file names that hang the session, by default ()
+
+    Returns
+    -------
+    List[Path]
+        The mdi.bat file of each installation
+
+    """
+    config = {
+        'startup_time': startup_time,
+        'file_cost': file_cost,
+        'cost_per_mb': cost_per_mb,
+        'fail': list(fail),
+        'crash': list(crash),
+        'hang': list(hang),
+    }
+
+    launch_commands = []
+    for version in versions:
+        common_dir = Path(install_dir) / version / 'common'
+        common_dir.mkdir(parents=True, exist_ok=True)
+        (common_dir / CONFIG_NAME).write_text(json.dumps(config))
+
+        launch_command = common_dir / 'mdi.bat'
+        runner = FAKE_ADAMS_DIR / 'mdi.py'
+        if platform.system() == 'Windows':
+            launch_command.write_text(f'@"{sys.executable}" "{runner}" "%~dp0{CONFIG_NAME}" %*\n')
+        else:
+            launch_command.write_text(
+                '#!/bin/sh\n'
+                f'exec "{sys.executable}" "{runner}" "{common_dir / CONFIG_NAME}" "$@"\n'
+            )
+            launch_command.chmod(launch_command.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+        launch_commands.append(launch_command)
+
+    return launch_commands
+
+
+def make_fake_bin(bin_file, version='2019.2', models=None, size=0):
+    """Writes a .bin file that the stub `Adams` module can read.
+
+    Parameters
+    ----------
+    bin_file : str or Path
+        Path of the file to write
+    version : str, optional
+        Adams version written in the header, by default '2019.2'
+    models : List[str], optional
+        Names of the models in the database, by default one model named after the file
+    size : int, optional
+        Pads the file to this many bytes, by default 0 (no padding)
+
+    Returns
+    -------
+    Path
+        The .bin file
+
+    """
+    bin_file = Path(bin_file)
+    models = models if models is not None else [bin_file.stem.upper()]
+
+    text = f'Adams View version {version}\n' + ''.join(f'model {name}\n' for name in models)
+    data = text.encode() + b'\0' * max(0, size - len(text))
+
+    bin_file.parent.mkdir(parents=True, exist_ok=True)
+    bin_file.write_bytes(data)
+    return bin_file
+
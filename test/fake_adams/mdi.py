@@ -0,0 +1,41 @@
+"""Fake Adams launcher. Called by the mdi.bat files created by `make_fake_install` as
+
+    python mdi.py <config_file> [-c] aview ru-standard b <script> [exit]
+
+Runs <script> in the current directory against the stub `Adams` module with its output written to
+aview.log, like Adams View running a batch script.
+"""
+import json
+import runpy
+import sys
+import time
+from pathlib import Path
+
+import Adams
+
+
+def main(argv):
+    config = json.loads(Path(argv[0]).read_text())
+    args = argv[1:]
+    script = args[args.index('b') + 1]
+
+    Adams._config.update(config)
+    time.sleep(config.get('startup_time', 0.0))
+
+    with open('aview.log', 'w', buffering=1) as log:
+        log.write(f'! Adams View  version {Path(argv[0]).parent.parent.name.replace("_", ".")}\n')
+        log.write(f'! Reading commands from {script}\n')
+
+        sys.stdout = log
+        try:
+            runpy.run_path(script, run_name='__main__')
+        except Exception as err:
+            print(f'ERROR:  {err}')
+        finally:
+            sys.stdout = sys.__stdout__
+
+        log.write('! Command file is exhausted, batch run is finished.\n')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
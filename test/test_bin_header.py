@@ -0,0 +1,61 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import adams_bin_converter
+from adams_bin_converter import AdamsVersionError, Version, probe_headers, read_bin_header
+
+
+class Test_BinHeader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+
+    def make_bin(self, name, contents: bytes):
+        bin_file = self.tmp_dir / name
+        bin_file.write_bytes(contents)
+        return bin_file
+
+    def test_version_with_control_characters(self):
+        """Control and non-ascii characters in the header are ignored."""
+        bin_file = self.make_bin('test.bin', b'\x00\x01Adams View\xff Version 2018.1\x02\nMODEL\n')
+        header = read_bin_header(bin_file)
+
+        self.assertEqual(header.version, Version(2018, 1))
+        self.assertEqual(header.version_string, '2018.1')
+        self.assertEqual(header.text, 'Adams View Version 2018.1')
+        self.assertEqual(header.size, bin_file.stat().st_size)
+
+    def test_version_from_bin_file(self):
+        """Version.from_bin_file uses the header reader."""
+        bin_file = self.make_bin('test.bin', b'Adams View version 2021.2.2.826892\n')
+        self.assertEqual(Version.from_bin_file(bin_file), Version(2021, 2, 2, 826892))
+
+    def test_no_version(self):
+        """A header without a version has no version and Version.from_bin_file raises an error."""
+        bin_file = self.make_bin('test.bin', b'Not an Adams file\n')
+
+        self.assertIsNone(read_bin_header(bin_file).version)
+        with self.assertRaises(AdamsVersionError):
+            Version.from_bin_file(bin_file)
+
+    def test_read_is_bounded(self):
+        """Only the first BIN_HEADER_SIZE bytes are read from a file without a newline."""
+        bin_file = self.make_bin('test.bin', b'x' * adams_bin_converter.BIN_HEADER_SIZE + b' version 2020.1')
+        header = read_bin_header(bin_file)
+
+        self.assertIsNone(header.version)
+        self.assertEqual(len(header.text), adams_bin_converter.BIN_HEADER_SIZE)
+
+    def test_probe_headers(self):
+        """Headers are returned in the same order as the files."""
+        bin_files = [self.make_bin(f'test_{year}.bin', f'Adams View version {year}.1\n'.encode())
+                     for year in range(2015, 2025)]
+        headers = probe_headers(bin_files, max_workers=4)
+
+        self.assertListEqual([h.bin_file for h in headers], bin_files)
+        self.assertListEqual([h.version.year for h in headers], list(range(2015, 2025)))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
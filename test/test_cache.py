@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from adams_bin_converter import ConversionCache
+from test import TEST_GOOD_CMD_1, TEST_GOOD_CMD_2
+
+
+class Test_ConversionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.cache = ConversionCache(self.tmp_dir / 'cache')
+
+        self.bin_file = self.tmp_dir / 'test.bin'
+        self.bin_file.write_bytes(b'binary contents')
+
+        self.cmd_file = self.tmp_dir / 'MODEL_1.cmd'
+        self.cmd_file.write_text('model create model_name = MODEL_1\n')
+
+    def test_key_depends_on_contents_and_installation(self):
+        """The key changes if the .bin file contents or the Adams installation change."""
+        key = self.cache.key(self.bin_file, TEST_GOOD_CMD_1)
+
+        self.assertEqual(key, self.cache.key(self.bin_file, TEST_GOOD_CMD_1))
+        self.assertNotEqual(key, self.cache.key(self.bin_file, TEST_GOOD_CMD_2))
+
+        self.bin_file.write_bytes(b'changed binary contents')
+        self.assertNotEqual(key, self.cache.key(self.bin_file, TEST_GOOD_CMD_1))
+
+    def test_restore_missing_key(self):
+        """Restoring a key that has not been cached returns None."""
+        self.assertIsNone(self.cache.restore('0' * 64, self.tmp_dir))
+
+    def test_put_and_restore(self):
+        """Cached .cmd files are restored to the output directory."""
+        key = self.cache.key(self.bin_file, TEST_GOOD_CMD_1)
+        self.cache.put(key, [self.cmd_file])
+
+        out_dir = self.tmp_dir / 'out'
+        out_dir.mkdir()
+        cmd_files = self.cache.restore(key, out_dir)
+
+        self.assertListEqual(cmd_files, [out_dir / self.cmd_file.name])
+        self.assertEqual(cmd_files[0].read_text(), self.cmd_file.read_text())
+
+    def test_least_recently_used_evicted(self):
+        """The least recently used entries are evicted once the cache is too big."""
+        keys = [f'{i:064d}' for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, [self.cmd_file])
+            os.utime(self.cache._entry_dir(key), (i, i))
+
+        # Use the oldest entry so that the second entry becomes the least recently used
+        self.cache.restore(keys[0], self.tmp_dir)
+
+        entry_size = sum(f.stat().st_size for f in self.cache._entry_dir(keys[0]).iterdir())
+        self.cache.max_size = 2 * entry_size
+        self.cache.evict()
+
+        self.assertIsNotNone(self.cache.restore(keys[0], self.tmp_dir))
+        self.assertIsNone(self.cache.restore(keys[1], self.tmp_dir))
+        self.assertIsNotNone(self.cache.restore(keys[2], self.tmp_dir))
+
+    def test_put_unwritable_cache(self):
+        """Nothing is cached, and no error is raised, if the cache cannot be written to."""
+        (self.tmp_dir / 'not_a_dir').write_text('')
+        cache = ConversionCache(self.tmp_dir / 'not_a_dir' / 'cache')
+        key = cache.key(self.bin_file, TEST_GOOD_CMD_1)
+
+        cache.put(key, [self.cmd_file])
+        cache.put_models(key, [{'name': 'MODEL_1'}])
+        self.assertIsNone(cache.restore(key, self.tmp_dir))
+
+    def test_put_failed_copy(self):
+        """A partly written entry is removed if a .cmd file cannot be copied."""
+        key = self.cache.key(self.bin_file, TEST_GOOD_CMD_1)
+        self.cache.put(key, [self.cmd_file, self.tmp_dir / 'missing.cmd'])
+
+        self.assertIsNone(self.cache.restore(key, self.tmp_dir))
+        self.assertListEqual(list(self.cache._entry_dir(key).parent.iterdir()), [])
+
+    def test_scanned_only_when_full(self):
+        """The cache is only scanned the first time it is added to and once it is too big."""
+        self.cache.put(f'{0:064d}', [self.cmd_file])
+        entry_size = sum(f.stat().st_size for f in self.cache._entry_dir(f'{0:064d}').iterdir())
+        self.cache.max_size = 3 * entry_size
+
+        scans = []
+        evict = self.cache.evict
+        self.cache.evict = lambda: (scans.append(True), evict())
+
+        self.cache.put(f'{1:064d}', [self.cmd_file])
+        self.cache.put(f'{2:064d}', [self.cmd_file])
+        self.assertListEqual(scans, [])
+
+        self.cache.put(f'{3:064d}', [self.cmd_file])
+        self.assertListEqual(scans, [True])
+        self.assertIsNone(self.cache.restore(f'{0:064d}', self.tmp_dir))
+        self.assertIsNotNone(self.cache.restore(f'{3:064d}', self.tmp_dir))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
@@ -4,8 +4,9 @@ import unittest
 import subprocess
 
 from itertools import product
+from concurrent.futures import ThreadPoolExecutor
 
-from adams_bin_converter import convert
+from adams_bin_converter import convert, convert_many
 
 from test import TEST_FILE_DIR_MULTIPLE, TEST_FILE_DIR_SINGLE, TEST_FILE_DIR_VERSION_2021, TEST_GOOD_CMD_3
 from test import CONVERTER_CMD, MULTI_MODEL_NAMES, TEST_GOOD_CMD_2
@@ -54,6 +55,69 @@ class Test_ConvertApi(unittest.TestCase):
 
         self.assertListEqual(expected_cmd_files, actual_cmd_files)
 
+    def test_convert_api_concurrent_same_dir(self):
+        """Converts all the bin files in the same directory at the same time. Then checks that all
+        the cmd files are accounted for.
+        """
+        # Get the bin files
+        bin_files = [f for f in TEST_FILE_DIR_SINGLE.glob('*.bin')]
+
+        # Convert the bin files to cmd files concurrently
+        with ThreadPoolExecutor(max_workers=len(bin_files)) as executor:
+            list(executor.map(convert, bin_files))
+
+        # Get a list of the newly created cmd files
+        cmd_files = [f for f in TEST_FILE_DIR_SINGLE.glob('*.cmd') if f.name != 'aview.cmd']
+
+        # Assert that there is a cmd file for every bin file
+        self.assertListEqual(sorted([f.stem for f in bin_files]), sorted([f.stem for f in cmd_files]))
+
+    def tearDown(self):
+        clear_test_file_dir()
+
+
+class Test_ConvertManyApi(unittest.TestCase):
+
+    def setUp(self):
+        clear_test_file_dir()
+
+    def test_convert_many_api(self):
+        """Converts all the bin files in the test file directories to cmd files in a single session.
+        Then checks that all the cmd files are accounted for and reported per file.
+        """
+        # Get the bin files
+        bin_files = [f for f in TEST_FILE_DIR_SINGLE.glob('*.bin')]
+        bin_files += [f for f in TEST_FILE_DIR_MULTIPLE.glob('*.bin')]
+
+        # Convert the bin files to cmd files
+        results = convert_many(bin_files)
+
+        # Assert that every file succeeded and that the results are in the input order
+        self.assertListEqual([r.bin_file for r in results], bin_files)
+        self.assertTrue(all(r.success for r in results))
+
+        # Assert that there is a cmd file for every model in every bin file
+        expected_cmd_files = [f.stem for f in TEST_FILE_DIR_SINGLE.glob('*.bin')]
+        expected_cmd_files += [f'{model}' for model in MULTI_MODEL_NAMES]
+        actual_cmd_files = [f.stem for r in results for f in r.cmd_files]
+
+        self.assertListEqual(sorted(expected_cmd_files), sorted(actual_cmd_files))
+
+    def test_convert_many_api_parallel(self):
+        """Converts all the bin files in the test file directories to cmd files with one session per
+        file and several sessions at a time. Then checks that the results are in the input order.
+        """
+        # Get the bin files
+        bin_files = [f for f in TEST_FILE_DIR_SINGLE.glob('*.bin')]
+        bin_files += [f for f in TEST_FILE_DIR_MULTIPLE.glob('*.bin')]
+
+        # Convert the bin files to cmd files
+        results = convert_many(bin_files, max_workers=4, batch=False)
+
+        # Assert that every file succeeded and that the results are in the input order
+        self.assertListEqual([r.bin_file for r in results], bin_files)
+        self.assertTrue(all(r.success for r in results))
+
     def tearDown(self):
         clear_test_file_dir()
 
@@ -0,0 +1,134 @@
+import asyncio
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import adams_bin_converter
+from adams_bin_converter import (ConversionCache, InstallIndex, convert, convert_async, convert_many,
+                                 iter_convert)
+from test.fake_adams import make_fake_bin, make_fake_install
+
+
+class Test_FakeAdams(unittest.TestCase):
+    """Converts files end to end using the fake Adams installation."""
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.adams_launch_command, = make_fake_install(
+            self.test_dir / 'install', fail=['bad*.bin'], crash=['crash*.bin']
+        )
+        self.bin_files = [make_fake_bin(self.test_dir / 'files' / f'test_{i}.bin') for i in range(3)]
+
+    def test_convert(self):
+        """Each model is written to a .cmd file next to the .bin file."""
+        cmd_file = convert(self.bin_files[0], adams_launch_command=self.adams_launch_command)
+
+        self.assertTrue((self.bin_files[0].parent / 'TEST_0.cmd').exists())
+        self.assertEqual(cmd_file, self.bin_files[0].with_suffix('.cmd'))
+
+    def test_convert_async_does_not_block(self):
+        """The Adams installation is found off the event loop's thread."""
+        threads = []
+
+        def _get_adams_launch_command(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return self.adams_launch_command
+
+        with mock.patch.object(adams_bin_converter, '_get_adams_launch_command', _get_adams_launch_command):
+            asyncio.run(convert_async(self.bin_files[0], get_version_from_bin=True))
+
+        self.assertTrue((self.bin_files[0].parent / 'TEST_0.cmd').exists())
+        self.assertNotIn(threading.get_ident(), threads)
+
+    def test_convert_many_multiple_models(self):
+        """All the models in a database are written."""
+        bin_file = make_fake_bin(self.test_dir / 'files' / 'multi.bin', models=['MODEL_1', 'MODEL_2'])
+        result, = convert_many([bin_file], adams_launch_command=self.adams_launch_command)
+
+        self.assertTrue(result.success)
+        self.assertListEqual([f.name for f in result.cmd_files], ['MODEL_1.cmd', 'MODEL_2.cmd'])
+
+    def test_failure_does_not_stop_batch(self):
+        """A file that fails to load is reported and the rest of the session carries on."""
+        bad_file = make_fake_bin(self.test_dir / 'files' / 'bad.bin')
+        results = convert_many([bad_file] + self.bin_files, adams_launch_command=self.adams_launch_command)
+
+        self.assertListEqual([r.success for r in results], [False, True, True, True])
+        self.assertIn('bad.bin', results[0].error)
+
+    def test_multi_line_error_reported(self):
+        """An error message that spans several lines is reported in full."""
+        bad_file = make_fake_bin(self.test_dir / 'files' / 'bad.bin')
+        results = list(iter_convert([bad_file] + self.bin_files[:1],
+                                    adams_launch_command=self.adams_launch_command))
+
+        result = next(r for r in results if r.bin_file == bad_file)
+        self.assertEqual(result.error, 'Unable to read bad.bin The file is not a valid Adams View database.')
+
+    def test_unstaged_file_does_not_stop_batch(self):
+        """A file that cannot be staged is reported and the rest of the session carries on."""
+        missing_file = self.test_dir / 'files' / 'missing.bin'
+        results = convert_many(self.bin_files + [missing_file], adams_launch_command=self.adams_launch_command)
+
+        self.assertListEqual([r.success for r in results], [True, True, True, False])
+        self.assertIn('missing.bin', results[3].error)
+
+    def test_unwritable_cache(self):
+        """Files are converted even if the cache cannot be written to."""
+        (self.test_dir / 'not_a_dir').write_text('')
+        cache = ConversionCache(self.test_dir / 'not_a_dir' / 'cache')
+        results = convert_many(self.bin_files, adams_launch_command=self.adams_launch_command, cache=cache)
+
+        self.assertTrue(all(r.success for r in results))
+
+    def test_crash_retried(self):
+        """Files not reached before a session crashes are converted by the retry."""
+        crash_file = make_fake_bin(self.test_dir / 'files' / 'crash.bin')
+        results = list(iter_convert(self.bin_files + [crash_file], retries=1, retry_delay=0,
+                                    adams_launch_command=self.adams_launch_command))
+
+        self.assertEqual(sum(r.success for r in results), 3)
+        self.assertFalse(next(r for r in results if r.bin_file == crash_file).success)
+
+    def test_iter_convert_yields_each_file(self):
+        """Each file is yielded with its .cmd files in place while the rest of its session runs."""
+        adams_launch_command, = make_fake_install(self.test_dir / 'slow_install', file_cost=0.3)
+        results = iter_convert(self.bin_files, adams_launch_command=adams_launch_command)
+
+        first = next(results)
+        self.assertTrue(first.success)
+        self.assertTrue(all(f.exists() for f in first.cmd_files))
+        self.assertFalse((self.bin_files[-1].parent / 'TEST_2.cmd').exists())
+
+        self.assertEqual(sum(r.success for r in results), 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+
+class Test_VersionLimits(unittest.TestCase):
+    """Runs files that need different Adams installations."""
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        make_fake_install(self.test_dir / 'install', versions=('2019_2', '2020_1'), file_cost=0.2)
+        self.install_index = InstallIndex(self.test_dir / 'install')
+
+    def test_busy_version_does_not_starve_others(self):
+        """Sessions waiting for a busy installation do not hold up sessions of other installations."""
+        bin_files = [make_fake_bin(self.test_dir / 'files' / f'test_{i}.bin', version='2019.2')
+                     for i in range(4)]
+        bin_files.append(make_fake_bin(self.test_dir / 'files' / 'new.bin', version='2020.1'))
+
+        results = list(iter_convert(bin_files, get_version_from_bin=True, max_workers=2,
+                                    max_workers_per_version=1, batch=False,
+                                    install_index=self.install_index))
+
+        self.assertTrue(all(r.success for r in results))
+        self.assertLess([r.bin_file for r in results].index(bin_files[-1]), 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
@@ -0,0 +1,96 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from adams_bin_converter import ConversionResult, DurationHistory, _plan_sessions, convert_many
+from test.fake_adams import make_fake_bin, make_fake_install
+
+
+class Test_DurationHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.history_file = self.test_dir / 'history.jsonl'
+        self.adams_launch_command, = make_fake_install(self.test_dir / 'install')
+        self.bin_files = [make_fake_bin(self.test_dir / f'test_{i}.bin', size=size)
+                          for i, size in enumerate([1000, 1000, 1000, 10000])]
+
+    def test_estimate_without_history(self):
+        """The file sizes are used until something has been recorded."""
+        history = DurationHistory(self.history_file)
+
+        self.assertListEqual(history.estimate(self.bin_files), [1000, 1000, 1000, 10000])
+        self.assertIsNone(history.eta(self.bin_files))
+
+    def test_estimate(self):
+        """Recorded files use their duration and other files are estimated from their size."""
+        DurationHistory(self.history_file).record([
+            ConversionResult(self.bin_files[0], duration=4.0),
+            ConversionResult(self.bin_files[1], duration=1.0, cached=True),
+            ConversionResult(self.bin_files[2], duration=1.0, error='Failed'),
+        ])
+
+        # The history is read back from the file
+        history = DurationHistory(self.history_file)
+        self.assertListEqual(history.estimate(self.bin_files), [4.0, 4.0, 4.0, 40.0])
+
+        # A file that has changed size is estimated from its size
+        make_fake_bin(self.bin_files[0], size=2000)
+        self.assertListEqual(history.estimate(self.bin_files[:1]), [8.0])
+
+    def test_appended_and_compacted(self):
+        """Each duration is appended to the history file, which is compacted once it is loaded."""
+        history = DurationHistory(self.history_file)
+        for duration in range(1, 11):
+            history.record([ConversionResult(self.bin_files[0], duration=float(duration))])
+
+        self.assertEqual(len(self.history_file.read_text().splitlines()), 10)
+
+        history = DurationHistory(self.history_file)
+        self.assertListEqual(history.estimate(self.bin_files[:1]), [10.0])
+        self.assertEqual(len(self.history_file.read_text().splitlines()), 1)
+
+    def test_eta(self):
+        """The ETA is the longest session when the files are scheduled longest first."""
+        history = DurationHistory()
+        history.record([ConversionResult(self.bin_files[0], duration=1.0)])
+
+        self.assertEqual(history.eta(self.bin_files, max_workers=1), 13.0)
+        self.assertEqual(history.eta(self.bin_files, max_workers=2), 10.0)
+
+    def test_longest_first(self):
+        """The sessions are balanced and the longest session comes first."""
+        _, sessions, _ = _plan_sessions(self.bin_files, self.adams_launch_command, False, None, 2, None,
+                                        True, history=DurationHistory())
+
+        self.assertListEqual([indices for _, indices in sessions], [[3], [0, 1, 2]])
+
+        _, sessions, _ = _plan_sessions(self.bin_files, self.adams_launch_command, False, None, 2, None,
+                                        False, history=DurationHistory())
+
+        self.assertListEqual([indices for _, indices in sessions], [[3], [0], [1], [2]])
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+
+class Test_ConvertWithHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.adams_launch_command, = make_fake_install(self.test_dir / 'install', file_cost=0.05)
+        self.bin_files = [make_fake_bin(self.test_dir / f'test_{i}.bin') for i in range(3)]
+
+    def test_record(self):
+        """The time taken by each converted file is added to the history."""
+        history = DurationHistory(self.test_dir / 'history.jsonl')
+        results = convert_many(self.bin_files, self.adams_launch_command, max_workers=2, history=history)
+
+        self.assertTrue(all(r.success for r in results))
+        estimates = DurationHistory(self.test_dir / 'history.jsonl').estimate(self.bin_files)
+        self.assertListEqual(estimates, [r.duration for r in results])
+        self.assertTrue(all(e >= 0.05 for e in estimates))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
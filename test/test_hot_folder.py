@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from pathlib import Path
+from unittest import mock
+
+from adams_bin_converter import HotFolder, Journal
+from test.fake_adams import make_fake_bin, make_fake_install
+
+
+class Test_HotFolder(unittest.TestCase):
+
+    def setUp(self):
+        self.watch_dir = Path(tempfile.mkdtemp())
+        self.hot_folder = HotFolder(self.watch_dir, settle_time=0)
+        self.bin_file = self.watch_dir / 'test.bin'
+        self.bin_file.write_bytes(b'Adams View version 2019.2')
+
+    def test_waits_for_file_to_settle(self):
+        """A file is only returned once it is unchanged between two scans."""
+        self.assertListEqual(self.hot_folder.scan(), [])
+        self.assertListEqual(self.hot_folder.scan(), [self.bin_file])
+
+    def test_changing_file_not_returned(self):
+        """A file that is still being written restarts its settle clock."""
+        self.hot_folder.scan()
+        with open(self.bin_file, 'ab') as fid:
+            fid.write(b' more data')
+        self.assertListEqual(self.hot_folder.scan(), [])
+        self.assertListEqual(self.hot_folder.scan(), [self.bin_file])
+
+    def test_converted_file_skipped(self):
+        """A file is not returned again unless it changes."""
+        self.hot_folder.scan()
+        self.hot_folder.scan()
+        self.assertListEqual(self.hot_folder.scan(), [])
+
+        stat = self.bin_file.stat()
+        os.utime(self.bin_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.hot_folder.scan()
+        self.assertListEqual(self.hot_folder.scan(), [self.bin_file])
+
+    def test_other_files_ignored(self):
+        """Only .bin files are returned."""
+        (self.watch_dir / 'MODEL_1.cmd').write_text('model create')
+        self.hot_folder.scan()
+        self.assertListEqual(self.hot_folder.scan(), [self.bin_file])
+
+    def tearDown(self):
+        shutil.rmtree(self.watch_dir, ignore_errors=True)
+
+
+class Test_HotFolderRun(unittest.TestCase):
+    """Converts files dropped into a watched directory using the fake Adams installation."""
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.watch_dir = self.test_dir / 'watch'
+        self.watch_dir.mkdir()
+        self.adams_launch_command, = make_fake_install(self.test_dir / 'install')
+        self.results = []
+        self.journal = Journal(self.test_dir / 'journal.jsonl')
+        self.hot_folder = HotFolder(self.watch_dir, adams_launch_command=self.adams_launch_command,
+                                    on_result=self.results.append, settle_time=0, poll_interval=0.05,
+                                    journal=self.journal)
+
+    def test_run(self):
+        """Files dropped into the directory are converted and recorded in the journal."""
+        thread = threading.Thread(target=self.hot_folder.run)
+        thread.start()
+        try:
+            bin_files = [make_fake_bin(self.watch_dir / f'test_{i}.bin') for i in range(2)]
+
+            deadline = time.monotonic() + 30
+            while len(self.results) < 2 and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            self.hot_folder.stop()
+            thread.join()
+
+        self.assertTrue(all(r.success for r in self.results))
+        self.assertSetEqual({r.bin_file.name for r in self.results}, {f.name for f in bin_files})
+        self.assertTrue((self.watch_dir / 'TEST_0.cmd').exists())
+        self.assertTrue((self.watch_dir / 'TEST_1.cmd').exists())
+        self.assertSetEqual({p.name for p in self.journal.completed()}, {f.name for f in bin_files})
+
+    def test_cancelled_session_reported(self):
+        """Each file of a session that is cancelled before it runs is reported as failed."""
+        bin_file = make_fake_bin(self.watch_dir / 'test_0.bin')
+        cancelled = Future()
+        cancelled.cancel()
+        scheduler = mock.Mock()
+        scheduler.submit.return_value = cancelled
+
+        self.hot_folder._submit(scheduler, [bin_file])
+
+        result, = self.results
+        self.assertEqual(result.bin_file, bin_file)
+        self.assertFalse(result.success)
+        self.assertEqual(self.journal.pending([bin_file]), [bin_file])
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
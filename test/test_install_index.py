@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from adams_bin_converter import InstallIndex, Version
+
+TEST_VERSION_DIRS = ['2018_1', '2019_2', '2020_1_748966']
+
+
+class Test_InstallIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.install_dir = self.tmp_dir / 'Adams'
+        for version_dir in TEST_VERSION_DIRS:
+            (self.install_dir / version_dir / 'common').mkdir(parents=True)
+        self.cache_file = self.tmp_dir / 'install_index.json'
+
+    def test_get_launch_command(self):
+        """Returns the mdi.bat file of the closest installed version."""
+        index = InstallIndex(self.install_dir)
+        cmd = index.get_launch_command(Version(2019, 1))
+
+        self.assertEqual(cmd, self.install_dir / '2019_2' / 'common' / 'mdi.bat')
+
+    def test_scanned_once(self):
+        """The install directory is only scanned once while it is unchanged."""
+        index = InstallIndex(self.install_dir)
+        with mock.patch.object(Version, 'get_installed_versions', wraps=Version.get_installed_versions) as scan:
+            for _ in range(10):
+                index.get_launch_command(Version(2018, 1))
+
+        self.assertEqual(scan.call_count, 1)
+
+    def test_rescanned_when_install_dir_changes(self):
+        """A version installed after the index was built is found."""
+        index = InstallIndex(self.install_dir, check_interval=0)
+        self.assertEqual(len(index.versions), len(TEST_VERSION_DIRS))
+
+        (self.install_dir / '2021_2' / 'common').mkdir(parents=True)
+        os.utime(self.install_dir, (0, 0))
+
+        self.assertIn(Version(2021, 2), index.versions)
+
+    def test_checked_once_per_interval(self):
+        """The install directory is not checked for changes again within the check interval."""
+        index = InstallIndex(self.install_dir, check_interval=60)
+        self.assertEqual(len(index.versions), len(TEST_VERSION_DIRS))
+
+        (self.install_dir / '2021_2' / 'common').mkdir(parents=True)
+        os.utime(self.install_dir, (0, 0))
+
+        with mock.patch.object(Path, 'stat', side_effect=AssertionError('install dir checked')):
+            self.assertNotIn(Version(2021, 2), index.versions)
+
+    def test_loaded_from_cache_file(self):
+        """A new index with the same cache file does not scan the install directory."""
+        versions = InstallIndex(self.install_dir, self.cache_file).versions
+
+        index = InstallIndex(self.install_dir, self.cache_file)
+        with mock.patch.object(Version, 'get_installed_versions') as scan:
+            self.assertDictEqual(index.versions, versions)
+
+        scan.assert_not_called()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from adams_bin_converter import ConversionResult, Journal, expand_bin_files
+
+
+class Test_Journal(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.bin_files = [self.test_dir / f'test_{i}.bin' for i in range(3)]
+        for bin_file in self.bin_files:
+            bin_file.write_bytes(b'Adams View version 2019.2')
+
+        self.journal = Journal(self.test_dir / 'journal.jsonl')
+        self.journal.record_pending(self.bin_files)
+
+    def test_pending_until_complete(self):
+        """Only files recorded as complete are skipped."""
+        self.journal.record(ConversionResult(self.bin_files[0]))
+        self.journal.record(ConversionResult(self.bin_files[1], error='corrupt bin'))
+
+        self.assertListEqual(self.journal.pending(self.bin_files), self.bin_files[1:])
+
+    def test_changed_file_pending(self):
+        """A file that changed after it was converted is converted again."""
+        self.journal.record(ConversionResult(self.bin_files[0]))
+
+        stat = self.bin_files[0].stat()
+        os.utime(self.bin_files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertListEqual(self.journal.pending(self.bin_files), self.bin_files)
+
+    def test_truncated_line_ignored(self):
+        """A line cut short by a crash does not stop the journal from loading."""
+        self.journal.record(ConversionResult(self.bin_files[0]))
+        with open(self.journal.journal_file, 'a') as fid:
+            fid.write('{"bin_file": "')
+
+        self.assertListEqual(self.journal.pending(self.bin_files), self.bin_files[1:])
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+
+class Test_ExpandBinFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.top = self.test_dir / 'top.bin'
+        self.nested = self.test_dir / 'sub' / 'nested.bin'
+        self.sandboxed = self.test_dir / '_bin_converter_abc' / '0' / 'top.bin'
+
+        for bin_file in (self.top, self.nested, self.sandboxed):
+            bin_file.parent.mkdir(parents=True, exist_ok=True)
+            bin_file.write_bytes(b'')
+        (self.test_dir / 'MODEL_1.cmd').write_text('')
+
+    def test_directory(self):
+        """Only the .bin files directly in a directory are included."""
+        self.assertListEqual(expand_bin_files([self.test_dir]), [self.top])
+
+    def test_recursive_directory(self):
+        """Subdirectories are included, apart from conversion sandboxes."""
+        self.assertListEqual(expand_bin_files([self.test_dir], recursive=True), [self.nested, self.top])
+
+    def test_glob_and_duplicates(self):
+        """Glob patterns are expanded and duplicates removed."""
+        bin_files = expand_bin_files([self.top, str(self.test_dir / '**' / '*.bin')], recursive=True)
+        self.assertListEqual(bin_files, [self.top, self.nested])
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
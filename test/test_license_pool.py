@@ -0,0 +1,170 @@
+import asyncio
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from adams_bin_converter import (LicensePool, SessionPool, _open_lock_file, convert_many,
+                                 convert_many_async)
+from test.fake_adams import make_fake_bin, make_fake_install
+
+
+class Test_LicensePool(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.lock_dir = self.test_dir / 'licenses'
+        self.adams_launch_command = self.test_dir / 'install' / '2019_2' / 'common' / 'mdi.bat'
+
+    def test_capacity(self):
+        """No more tokens than the capacity of the version are handed out."""
+        pool = LicensePool(capacity=1, capacities={'2019_2': 2}, lock_dir=self.lock_dir)
+        tokens = [pool.acquire(self.adams_launch_command, timeout=1) for _ in range(2)]
+
+        with self.assertRaises(RuntimeError):
+            pool.acquire(self.adams_launch_command, timeout=0.2)
+
+        # Other versions have their own tokens
+        pool.release(pool.acquire(self.test_dir / 'install' / '2020_0' / 'common' / 'mdi.bat', timeout=1))
+
+        pool.release(tokens.pop())
+        pool.release(pool.acquire(self.adams_launch_command, timeout=1))
+        pool.release(tokens.pop())
+
+    def test_first_come_first_served(self):
+        """Waiting sessions get the token in the order they asked for it."""
+        pool = LicensePool(capacity=1, lock_dir=self.lock_dir, poll_interval=0.01)
+        token = pool.acquire(self.adams_launch_command)
+        order = []
+
+        def _wait(name):
+            with pool.token(self.adams_launch_command, timeout=5):
+                order.append(name)
+                time.sleep(0.05)
+
+        threads = []
+        for name in ['first', 'second', 'third']:
+            threads.append(threading.Thread(target=_wait, args=(name,)))
+            threads[-1].start()
+            time.sleep(0.1)
+
+        pool.release(token)
+        for thread in threads:
+            thread.join()
+
+        self.assertListEqual(order, ['first', 'second', 'third'])
+
+    def test_tickets_locked_in_queue(self):
+        """Tickets are already locked when they join the queue, so they are never taken for
+        abandoned ones."""
+        pool = LicensePool(capacity=1, lock_dir=self.lock_dir, poll_interval=0.01)
+        token = pool.acquire(self.adams_launch_command)
+
+        waiter = threading.Thread(target=lambda: pool.release(pool.acquire(self.adams_launch_command, 5)))
+        waiter.start()
+        try:
+            queue_dir = self.lock_dir / '2019_2' / 'queue'
+            for _ in range(50):
+                for ticket_file in queue_dir.glob('*.ticket'):
+                    fid = _open_lock_file(ticket_file)
+                    self.assertIsNone(fid)
+                time.sleep(0.002)
+
+            self.assertEqual(len(list(queue_dir.glob('*.ticket'))), 1)
+        finally:
+            pool.release(token)
+            waiter.join()
+
+        self.assertListEqual(list(queue_dir.iterdir()), [])
+        self.assertListEqual(list(queue_dir.parent.glob('.*.tmp')), [])
+
+    def test_dead_process(self):
+        """Tokens and places in the queue held by a process that dies are freed."""
+        code = (
+            'import sys, time\n'
+            'from adams_bin_converter import LicensePool\n'
+            f'pool = LicensePool(lock_dir={str(self.lock_dir)!r})\n'
+            f'pool.acquire({str(self.adams_launch_command)!r})\n'
+            'print("acquired", flush=True)\n'
+            f'pool.acquire({str(self.adams_launch_command)!r})\n'
+        )
+        process = subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE, text=True)
+        try:
+            self.assertEqual(process.stdout.readline().strip(), 'acquired')
+            time.sleep(0.3)
+        finally:
+            process.kill()
+            process.wait()
+            process.stdout.close()
+
+        pool = LicensePool(lock_dir=self.lock_dir)
+        pool.release(pool.acquire(self.adams_launch_command, timeout=2))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+
+class Test_ConvertWithLicensePool(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.adams_launch_command, = make_fake_install(self.test_dir / 'install', file_cost=0.1)
+        self.bin_files = [make_fake_bin(self.test_dir / f'test_{i}.bin') for i in range(3)]
+
+    def test_sessions_do_not_overlap(self):
+        """Only one session runs at a time with a capacity of one, whatever max_workers is."""
+        records = []
+        results = convert_many(self.bin_files, self.adams_launch_command, max_workers=3, batch=False,
+                               license_pool=LicensePool(lock_dir=self.test_dir / 'licenses'),
+                               on_timing=records.append)
+
+        self.assertTrue(all(r.success for r in results))
+        self.assertEqual(len([r for r in records if r['phase'] == 'license_wait']), 3)
+
+        spawns = sorted(r['start'] for r in records if r['phase'] == 'spawn')
+        ends = sorted(r['start'] + r['duration'] for r in records if r['phase'] == 'completion')
+        for end, next_spawn in zip(ends, spawns[1:]):
+            self.assertLessEqual(end, next_spawn)
+
+    def test_async_sessions_hold_tokens(self):
+        """The asyncio sessions wait for a token like the threaded ones."""
+        pool = LicensePool(lock_dir=self.test_dir / 'licenses')
+        token = pool.acquire(self.adams_launch_command)
+
+        results = asyncio.run(convert_many_async(self.bin_files, self.adams_launch_command, batch=False,
+                                                 global_timeout=0.5, license_pool=pool))
+        self.assertFalse(any(r.success for r in results))
+
+        pool.release(token)
+        results = asyncio.run(convert_many_async(self.bin_files, self.adams_launch_command, max_workers=3,
+                                                 batch=False, license_pool=pool))
+        self.assertTrue(all(r.success for r in results))
+
+    def test_warm_sessions_hold_tokens(self):
+        """Each warm session holds a token for as long as it runs."""
+        pool = LicensePool(lock_dir=self.test_dir / 'licenses')
+
+        with SessionPool(size=2, adams_launch_commands=[self.adams_launch_command],
+                         work_dir=self.test_dir, license_pool=pool) as session_pool:
+            with self.assertRaises(RuntimeError):
+                pool.acquire(self.adams_launch_command, timeout=0.2)
+
+            results = convert_many(self.bin_files, self.adams_launch_command, max_workers=2,
+                                   batch=False, session_pool=session_pool, license_pool=pool)
+            self.assertTrue(all(r.success for r in results))
+
+        pool.release(pool.acquire(self.adams_launch_command, timeout=1))
+
+    def test_warm_sessions_without_tokens_rejected(self):
+        """A session pool that does not hold tokens cannot be used with a license pool."""
+        with SessionPool(work_dir=self.test_dir) as session_pool:
+            with self.assertRaises(ValueError):
+                convert_many(self.bin_files, self.adams_launch_command, session_pool=session_pool,
+                             license_pool=LicensePool(lock_dir=self.test_dir / 'licenses'))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
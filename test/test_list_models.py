@@ -0,0 +1,61 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import adams_bin_converter
+from adams_bin_converter import ConversionCache, list_models
+from test.fake_adams import make_fake_bin, make_fake_install
+
+
+class Test_ListModels(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.adams_launch_command, = make_fake_install(self.test_dir / 'install', fail=['bad*'])
+        self.bin_files = [
+            make_fake_bin(self.test_dir / 'test_0.bin', models=['MODEL_1', 'MODEL_2']),
+            make_fake_bin(self.test_dir / 'test_1.bin'),
+            make_fake_bin(self.test_dir / 'bad.bin'),
+        ]
+        self.cache = ConversionCache(self.test_dir / 'cache')
+
+    def test_list_models(self):
+        """All the files are loaded in one session and no .cmd files are written."""
+        with mock.patch.object(adams_bin_converter, '_run_script',
+                               wraps=adams_bin_converter._run_script) as run_script:
+            inventories = list_models(self.bin_files, self.adams_launch_command)
+
+        self.assertEqual(run_script.call_count, 1)
+        self.assertListEqual([[m['name'] for m in inv.models] for inv in inventories],
+                             [['MODEL_1', 'MODEL_2'], ['TEST_1'], []])
+        self.assertDictEqual(inventories[0].models[0],
+                             {'name': 'MODEL_1', 'parts': 1, 'constraints': 0, 'forces': 0})
+        self.assertListEqual([inv.success for inv in inventories], [True, True, False])
+        self.assertIn('bad.bin', inventories[2].error)
+        self.assertListEqual(list(self.test_dir.glob('**/*.cmd')), [])
+
+    def test_cached(self):
+        """Files listed before are served from the cache without starting Adams View."""
+        list_models(self.bin_files, self.adams_launch_command, cache=self.cache)
+
+        with mock.patch.object(adams_bin_converter, '_run_script',
+                               wraps=adams_bin_converter._run_script) as run_script:
+            inventories = list_models(self.bin_files[:2], self.adams_launch_command, cache=self.cache)
+
+        self.assertEqual(run_script.call_count, 0)
+        self.assertListEqual([inv.cached for inv in inventories], [True, True])
+        self.assertListEqual([m['name'] for m in inventories[0].models], ['MODEL_1', 'MODEL_2'])
+
+    def test_missing_file_with_cache(self):
+        """A missing file is reported on its own when a cache is used."""
+        missing_file = self.test_dir / 'missing.bin'
+        inventories = list_models(self.bin_files[:2] + [missing_file], self.adams_launch_command,
+                                  cache=self.cache)
+
+        self.assertListEqual([inv.success for inv in inventories], [True, True, False])
+        self.assertIn('missing.bin', inventories[2].error)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
@@ -0,0 +1,120 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from adams_bin_converter import LogEvent, LogFollower, _check_if_complete, _read_results
+
+COMPLETE_CODE = '0.123'
+
+
+class Test_LogFollower(unittest.TestCase):
+
+    def setUp(self):
+        self.sim_dir = Path(tempfile.mkdtemp())
+        self.log_file = self.sim_dir / 'aview.log'
+        self.follower = LogFollower(self.log_file, COMPLETE_CODE)
+
+    def write(self, text):
+        with open(self.log_file, 'a') as fid:
+            fid.write(text)
+
+    def test_missing_log(self):
+        """Polling before the log exists returns no events."""
+        self.assertListEqual(self.follower.poll(), [])
+        self.assertFalse(_check_if_complete(self.follower))
+
+    def test_only_new_events_returned(self):
+        """Each poll only returns the events appended since the previous poll."""
+        self.write(f'! -- SCRIPT STARTING {COMPLETE_CODE} --\n')
+        self.assertListEqual([e.kind for e in self.follower.poll()], [LogEvent.STARTED])
+
+        self.write(f'! -- FILE WRITTEN {COMPLETE_CODE} 0 /out/MODEL_1.cmd --\n')
+        self.write(f'! -- FILE COMPLETE {COMPLETE_CODE} 0 --\n')
+        events = self.follower.poll()
+
+        self.assertListEqual([e.kind for e in events], [LogEvent.FILE_WRITTEN, LogEvent.FILE_COMPLETE])
+        self.assertEqual(events[0].index, 0)
+        self.assertEqual(events[0].info, '/out/MODEL_1.cmd')
+        self.assertEqual(self.follower.offset, self.log_file.stat().st_size)
+
+    def test_marker_split_across_reads(self):
+        """A marker written in two pieces is only reported once it is complete."""
+        self.write(f'! -- SCRIPT COMP')
+        self.assertFalse(_check_if_complete(self.follower))
+
+        self.write(f'LETE {COMPLETE_CODE} --\n')
+        self.assertTrue(_check_if_complete(self.follower))
+
+    def test_final_line_without_newline(self):
+        """A trailing line without a newline is parsed by a final poll."""
+        self.write(f'! -- SCRIPT COMPLETE {COMPLETE_CODE} --')
+        self.assertListEqual(self.follower.poll(), [])
+        self.assertListEqual([e.kind for e in self.follower.poll(final=True)], [LogEvent.COMPLETE])
+
+    def test_other_complete_code_ignored(self):
+        """Markers written by a script with a different completion code are ignored."""
+        self.write('! -- SCRIPT COMPLETE 0.456 --\n')
+        self.assertFalse(_check_if_complete(self.follower))
+
+    def test_exhausted_and_errors(self):
+        """Errors are reported and an exhausted command file after starting raises an error."""
+        self.write(f'! -- SCRIPT STARTING {COMPLETE_CODE} --\n')
+        self.write('ERROR:  Something went wrong.\n')
+        self.write('! Command file is exhausted, batch run is finished.\n')
+
+        with self.assertRaises(RuntimeError):
+            _check_if_complete(self.follower)
+
+        self.assertTrue(self.follower.has(LogEvent.ERROR))
+
+    def tearDown(self):
+        shutil.rmtree(self.sim_dir, ignore_errors=True)
+
+
+class Test_ReadResults(unittest.TestCase):
+
+    def setUp(self):
+        self.sim_dir = Path(tempfile.mkdtemp())
+        self.log_file = self.sim_dir / 'aview.log'
+        self.follower = LogFollower(self.log_file, COMPLETE_CODE)
+        self.bin_files = [Path('good.bin'), Path('bad.bin'), Path('missing.bin')]
+
+        with open(self.log_file, 'w') as fid:
+            fid.write(f'! -- SCRIPT STARTING {COMPLETE_CODE} --\n')
+            fid.write(f'! -- FILE WRITTEN {COMPLETE_CODE} 0 /out/MODEL_1.cmd --\n')
+            fid.write(f'! -- FILE COMPLETE {COMPLETE_CODE} 0 1.250 --\n')
+            fid.write(f'! -- FILE FAILED {COMPLETE_CODE} 1 0.500 corrupt bin --\n')
+
+    def test_durations_and_errors(self):
+        """The time taken and any error message are read from the per file markers."""
+        good, bad, missing = _read_results(self.follower, self.bin_files)
+
+        self.assertTrue(good.success)
+        self.assertEqual(good.duration, 1.25)
+        self.assertListEqual(good.cmd_files, [Path('/out/MODEL_1.cmd')])
+
+        self.assertEqual(bad.error, 'corrupt bin')
+        self.assertEqual(bad.duration, 0.5)
+
+        self.assertFalse(missing.success)
+        self.assertIsNone(missing.duration)
+
+    def test_to_dict(self):
+        """Results can be serialized to json."""
+        good = _read_results(self.follower, self.bin_files)[0]
+
+        self.assertDictEqual(json.loads(json.dumps(good.to_dict())), {
+            'bin_file': 'good.bin',
+            'cmd_files': [str(Path('/out/MODEL_1.cmd'))],
+            'success': True,
+            'error': None,
+            'cached': False,
+            'adams_launch_command': None,
+            'version': None,
+            'duration': 1.25,
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.sim_dir, ignore_errors=True)
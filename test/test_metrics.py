@@ -0,0 +1,56 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from urllib.request import urlopen
+
+from adams_bin_converter import ConversionCache, ConversionResult, Metrics, convert_many
+from test.fake_adams import make_fake_bin, make_fake_install
+
+
+class Test_Metrics(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.adams_launch_command, = make_fake_install(self.test_dir / 'install', fail=['bad*.bin'])
+        self.bin_files = [make_fake_bin(self.test_dir / 'files' / f'test_{i}.bin') for i in range(2)]
+        self.bin_files.append(make_fake_bin(self.test_dir / 'files' / 'bad.bin'))
+        self.metrics = Metrics(self.test_dir / 'metrics.prom')
+
+    def test_conversions_recorded(self):
+        """Outcomes, failure causes, sessions and cache hits are counted."""
+        cache = ConversionCache(self.test_dir / 'cache')
+        for _ in range(2):
+            convert_many(self.bin_files, adams_launch_command=self.adams_launch_command, cache=cache,
+                         batch=False, max_workers=2, metrics=self.metrics)
+
+        text = (self.test_dir / 'metrics.prom').read_text()
+        self.assertIn('adams_bin_converter_files_total{outcome="converted"} 2', text)
+        self.assertIn('adams_bin_converter_files_total{outcome="cached"} 2', text)
+        self.assertIn('adams_bin_converter_failures_total{cause="file"} 2', text)
+        self.assertIn('adams_bin_converter_cache_hit_ratio 0.5', text)
+        self.assertIn('adams_bin_converter_sessions_total 4', text)
+        self.assertIn('adams_bin_converter_conversion_seconds_count 4', text)
+        self.assertIn('adams_bin_converter_queue_depth 0', text)
+        self.assertIn('adams_bin_converter_active_sessions 0', text)
+
+    def test_histogram_buckets(self):
+        """Histogram buckets are cumulative."""
+        self.metrics.record([ConversionResult(Path('a.bin'), duration=d) for d in (0.2, 3, 1000)])
+        text = self.metrics.render()
+
+        self.assertIn('adams_bin_converter_conversion_seconds_bucket{le="0.5"} 1', text)
+        self.assertIn('adams_bin_converter_conversion_seconds_bucket{le="5"} 2', text)
+        self.assertIn('adams_bin_converter_conversion_seconds_bucket{le="+Inf"} 3', text)
+
+    def test_serve(self):
+        """The metrics are served over HTTP."""
+        server = self.metrics.serve(0)
+        try:
+            with urlopen(f'http://127.0.0.1:{server.server_address[1]}/metrics') as response:
+                self.assertEqual(response.read().decode(), self.metrics.render())
+        finally:
+            server.shutdown()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
@@ -0,0 +1,61 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from adams_bin_converter import ConversionCache, convert_many
+from test.fake_adams import make_fake_bin, make_fake_install
+
+
+class Test_ModelFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.adams_launch_command, = make_fake_install(self.test_dir / 'install')
+        self.bin_files = [
+            make_fake_bin(self.test_dir / 'test_0.bin', models=['CAR_FRONT', 'CAR_REAR', 'TRAILER']),
+            make_fake_bin(self.test_dir / 'test_1.bin', models=['BIKE']),
+        ]
+        self.cache = ConversionCache(self.test_dir / 'cache')
+
+    def test_models(self):
+        """Only the models matching the names or patterns are written."""
+        results = convert_many(self.bin_files, self.adams_launch_command, models=['car_*', 'bike'])
+
+        self.assertTrue(all(r.success for r in results))
+        self.assertListEqual([sorted(f.name for f in r.cmd_files) for r in results],
+                             [['CAR_FRONT.cmd', 'CAR_REAR.cmd'], ['BIKE.cmd']])
+        self.assertFalse((self.test_dir / 'TRAILER.cmd').exists())
+
+    def test_no_matching_models(self):
+        """Files that contain none of the models fail."""
+        result, = convert_many(self.bin_files[1:], self.adams_launch_command, models=['TRAILER'])
+
+        self.assertFalse(result.success)
+        self.assertIn('TRAILER', result.error)
+        self.assertListEqual(list(self.test_dir.glob('*.cmd')), [])
+
+    def test_empty_database_without_filter(self):
+        """A file with no models still succeeds, without writing anything, if no models are given."""
+        empty_file = make_fake_bin(self.test_dir / 'empty.bin', models=[])
+        result, = convert_many([empty_file], self.adams_launch_command)
+
+        self.assertTrue(result.success)
+        self.assertListEqual(result.cmd_files, [])
+
+    def test_cache(self):
+        """Conversions of different models of the same file are cached separately."""
+        convert_many(self.bin_files[:1], self.adams_launch_command, cache=self.cache, models=['TRAILER'])
+        result, = convert_many(self.bin_files[:1], self.adams_launch_command, cache=self.cache)
+
+        self.assertFalse(result.cached)
+        self.assertEqual(len(result.cmd_files), 3)
+
+        result, = convert_many(self.bin_files[:1], self.adams_launch_command, cache=self.cache,
+                               models=['trailer'])
+
+        self.assertTrue(result.cached)
+        self.assertListEqual([f.name for f in result.cmd_files], ['TRAILER.cmd'])
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
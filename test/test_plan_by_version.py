@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from adams_bin_converter import InstallIndex, Version, plan_by_version
+
+TEST_VERSION_DIRS = ['2018_1', '2019_2', '2020_1_748966']
+
+
+class Test_PlanByVersion(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.install_dir = self.tmp_dir / 'Adams'
+        for version_dir in TEST_VERSION_DIRS:
+            (self.install_dir / version_dir / 'common').mkdir(parents=True)
+        self.install_index = InstallIndex(self.install_dir)
+
+    def make_bins(self, versions):
+        bin_files = []
+        for i, version in enumerate(versions):
+            bin_file = self.tmp_dir / f'test_{i}.bin'
+            bin_file.write_bytes(f'Adams View version {version}\n'.encode())
+            bin_files.append(bin_file)
+        return bin_files
+
+    def test_grouped_by_closest_installed_version(self):
+        """Files are grouped by the installed version closest to the version in their header."""
+        bin_files = self.make_bins(['2018.1', '2019.2', '2017.1', '2019.1', '2020.1'])
+        groups = plan_by_version(bin_files, self.install_index)
+
+        self.assertListEqual([g.version for g in groups], [Version(2018, 1), Version(2019, 2),
+                                                           Version(2020, 1, 0, 748966)])
+        self.assertListEqual([g.indices for g in groups], [[0, 2], [1, 3], [4]])
+        self.assertEqual(groups[1].adams_launch_command,
+                         self.install_dir / '2019_2' / 'common' / 'mdi.bat')
+
+    def test_unresolvable_files_reported(self):
+        """Files that are too new or have no version are put in groups of their own with errors."""
+        bin_files = self.make_bins(['2018.1', '2030.1'])
+        bin_files.append(self.tmp_dir / 'no_version.bin')
+        bin_files[-1].write_bytes(b'Not an Adams file\n')
+
+        groups = plan_by_version(bin_files, self.install_index)
+
+        self.assertListEqual([g.indices for g in groups], [[0], [1], [2]])
+        self.assertIsNone(groups[0].error)
+        self.assertIsNotNone(groups[1].error)
+        self.assertIsNotNone(groups[2].error)
+
+    def test_unreadable_files_reported(self):
+        """Files that cannot be read are put in groups of their own with errors."""
+        bin_files = self.make_bins(['2018.1', '2019.2'])
+        bin_files.insert(1, self.tmp_dir / 'missing.bin')
+
+        groups = plan_by_version(bin_files, self.install_index)
+
+        self.assertListEqual([g.indices for g in groups], [[0], [2], [1]])
+        self.assertIsNone(groups[1].error)
+        self.assertIn('missing.bin', groups[2].error)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
@@ -0,0 +1,68 @@
+import errno
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import adams_bin_converter
+from adams_bin_converter import _prepare_attempt, _publish, convert_many
+from test.fake_adams import make_fake_bin, make_fake_install
+
+
+class Test_ScratchDir(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.scratch_dir = self.test_dir / 'scratch'
+        self.share_dir = self.test_dir / 'share'
+        self.adams_launch_command, = make_fake_install(self.test_dir / 'install')
+        self.bin_files = [make_fake_bin(self.share_dir / f'test_{i}.bin') for i in range(2)]
+
+    def test_sandbox_on_scratch(self):
+        """The session runs in the scratch directory and nothing is written next to the .bin files
+        until the .cmd files are published.
+        """
+        sim_dir, _, _ = _prepare_attempt(self.bin_files, scratch_dir=self.scratch_dir)
+
+        self.assertEqual(sim_dir.parent, self.scratch_dir)
+        self.assertListEqual(sorted(p.name for p in self.share_dir.iterdir()), ['test_0.bin', 'test_1.bin'])
+        shutil.rmtree(sim_dir)
+
+    def test_convert(self):
+        """The .cmd files are published next to the .bin files and the scratch directory is left empty."""
+        results = convert_many(self.bin_files, adams_launch_command=self.adams_launch_command,
+                               scratch_dir=self.scratch_dir)
+
+        self.assertTrue(all(r.success for r in results))
+        self.assertListEqual([r.cmd_files for r in results],
+                             [[self.share_dir / 'TEST_0.cmd'], [self.share_dir / 'TEST_1.cmd']])
+        self.assertListEqual(list(self.scratch_dir.iterdir()), [])
+
+    def test_publish_across_filesystems(self):
+        """A file that cannot be renamed into place is copied to a temporary name and renamed."""
+        cmd_file = self.scratch_dir / 'MODEL_1.cmd'
+        self.scratch_dir.mkdir()
+        cmd_file.write_text('model create model_name = MODEL_1\n')
+
+        replace = os.replace
+        renamed = []
+
+        def _replace(src, dst):
+            if Path(src).parent == self.scratch_dir:
+                raise OSError(errno.EXDEV, 'Invalid cross-device link')
+            renamed.append(Path(src))
+            replace(src, dst)
+
+        with mock.patch.object(adams_bin_converter.os, 'replace', _replace):
+            published, = _publish([cmd_file], self.share_dir)
+
+        self.assertEqual(published.read_text(), 'model create model_name = MODEL_1\n')
+        self.assertFalse(cmd_file.exists())
+        self.assertEqual(renamed[0].parent, self.share_dir)
+        self.assertListEqual(sorted(p.name for p in self.share_dir.iterdir()),
+                             ['MODEL_1.cmd', 'test_0.bin', 'test_1.bin'])
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
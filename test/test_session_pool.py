@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from time import perf_counter
+
+from adams_bin_converter import SessionPool, convert, convert_many
+from test.fake_adams import make_fake_bin, make_fake_install
+
+STARTUP_TIME = 1.0
+
+
+class Test_SessionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.adams_launch_command, = make_fake_install(self.test_dir / 'install', startup_time=STARTUP_TIME,
+                                                       crash=['crash*.bin'])
+        self.bin_files = [make_fake_bin(self.test_dir / 'files' / f'test_{i}.bin') for i in range(3)]
+        self.pool = SessionPool(size=1, max_jobs=2, adams_launch_commands=[self.adams_launch_command],
+                                work_dir=self.test_dir)
+
+    def test_startup_hidden(self):
+        """Files are converted without waiting for Adams View to start again."""
+        convert(self.bin_files[0], adams_launch_command=self.adams_launch_command, session_pool=self.pool)
+
+        start = perf_counter()
+        convert(self.bin_files[1], adams_launch_command=self.adams_launch_command, session_pool=self.pool)
+        self.assertLess(perf_counter() - start, STARTUP_TIME)
+        self.assertTrue((self.bin_files[1].parent / 'TEST_1.cmd').exists())
+
+    def test_recycled_after_max_jobs(self):
+        """A session is replaced once it has run `max_jobs` jobs."""
+        results = convert_many(self.bin_files, adams_launch_command=self.adams_launch_command,
+                               batch=False, session_pool=self.pool)
+
+        self.assertTrue(all(r.success for r in results))
+        session, = self.pool._idle[self.adams_launch_command]
+        self.assertEqual(session.n_jobs, 1)
+
+    def test_crashed_session_replaced(self):
+        """A session that crashes is replaced and the next file is converted."""
+        crash_file = make_fake_bin(self.test_dir / 'files' / 'crash.bin')
+        crashed, converted = convert_many([crash_file, self.bin_files[0]], batch=False,
+                                          adams_launch_command=self.adams_launch_command,
+                                          session_pool=self.pool)
+
+        self.assertFalse(crashed.success)
+        self.assertTrue(converted.success)
+
+    def test_no_thread_per_job(self):
+        """Running jobs in a session does not leave a thread behind for each job."""
+        pool = SessionPool(size=1, max_jobs=10, adams_launch_commands=[self.adams_launch_command],
+                           work_dir=self.test_dir)
+        with pool:
+            convert(self.bin_files[0], adams_launch_command=self.adams_launch_command, session_pool=pool)
+            n_threads = threading.active_count()
+
+            for _ in range(5):
+                convert(self.bin_files[1], adams_launch_command=self.adams_launch_command,
+                        session_pool=pool)
+
+            self.assertEqual(threading.active_count(), n_threads)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
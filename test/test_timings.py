@@ -0,0 +1,46 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from adams_bin_converter import convert, convert_many
+from test.fake_adams import make_fake_bin, make_fake_install
+
+SESSION_PHASES = ['stage', 'write_script', 'spawn', 'first_log_activity', 'completion',
+                  'remove_script', 'publish']
+
+
+class Test_Timings(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.adams_launch_command, = make_fake_install(self.test_dir / 'install', startup_time=0.2)
+        self.bin_files = [make_fake_bin(self.test_dir / 'files' / f'test_{i}.bin') for i in range(2)]
+        self.records = []
+
+    def test_convert_phases(self):
+        """Every phase of a conversion is reported in order."""
+        convert(self.bin_files[0], adams_launch_command=self.adams_launch_command,
+                on_timing=self.records.append)
+
+        self.assertListEqual([r['phase'] for r in self.records], ['launch_command'] + SESSION_PHASES)
+        self.assertTrue(all(r['duration'] >= 0 for r in self.records))
+
+        # Adams View startup is not part of the spawn phase
+        durations = {r['phase']: r['duration'] for r in self.records}
+        self.assertGreaterEqual(durations['first_log_activity'] + durations['completion'], 0.2)
+        self.assertLess(durations['spawn'], 0.2)
+
+    def test_sessions_identified(self):
+        """The phases of each session can be told apart."""
+        convert_many(self.bin_files, adams_launch_command=self.adams_launch_command, batch=False,
+                     max_workers=2, on_timing=self.records.append)
+
+        sessions = {r['session'] for r in self.records if 'session' in r}
+        self.assertEqual(len(sessions), 2)
+        for session in sessions:
+            phases = [r['phase'] for r in self.records if r.get('session') == session]
+            self.assertListEqual(phases, SESSION_PHASES)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
@@ -1,6 +1,6 @@
 import unittest
 
-from adams_bin_converter import ADAMS_INSTALL_DIR, AdamsVersionError, Version
+from adams_bin_converter import ADAMS_INSTALL_DIR, AdamsVersionError, Version, VersionIndex
 from test import TEST_FILE_DIR_SINGLE
 
 TEST_BIN_FILE = TEST_FILE_DIR_SINGLE / 'test_1.bin'
@@ -110,3 +110,50 @@ class Test_VersionFinder(unittest.TestCase):
 
     def tearDown(self):
         return
+
+
+class Test_VersionOrdering(unittest.TestCase):
+
+    def setUp(self):
+        return
+
+    def test_total_ordering(self):
+        """All the comparison operators agree with sorting by (year, release, update, build)."""
+        vers = sorted(TEST_AVAILABLE_VERSIONS)
+        for i, v1 in enumerate(vers):
+            for j, v2 in enumerate(vers):
+                self.assertEqual(v1 < v2, i < j)
+                self.assertEqual(v1 <= v2, i <= j)
+                self.assertEqual(v1 > v2, i > j)
+                self.assertEqual(v1 >= v2, i >= j)
+                self.assertEqual(v1 == v2, i == j)
+
+    def test_compare_with_other_types(self):
+        """Comparing with something other than a Version is left to the other operand."""
+        for method in ('__lt__', '__le__', '__gt__', '__ge__', '__eq__', '__ne__'):
+            self.assertIs(getattr(Version(2019, 2), method)('2019.2'), NotImplemented)
+
+        self.assertNotEqual(Version(2019, 2), '2019.2')
+        with self.assertRaises(TypeError):
+            Version(2019, 2) < '2019.2'
+
+    def test_hashable(self):
+        """Equal versions have equal hashes, even if `other` was given as a list."""
+        self.assertEqual(Version(2019, 2, other=[1]), Version(2019, 2, other=(1,)))
+        self.assertEqual(len({Version(2019, 2, other=[1]), Version(2019, 2, other=(1,))}), 1)
+
+    def test_version_index(self):
+        """A prebuilt VersionIndex returns the closest version to each target."""
+        index = VersionIndex(TEST_AVAILABLE_VERSIONS)
+        expected = {
+            Version(2014, 1): Version(2015, 1),
+            Version(2016, 3, 4, 561566): Version(2018, 1),
+            Version(2019, 2, 3): Version(2019, 2, 1),
+            Version(2020, 1): Version(2020, 1, 0, 748966),
+            Version(2021, 3, 4, 561566): Version(2021, 2, 2, 826892),
+        }
+        for tgt, ver in expected.items():
+            self.assertEqual(index.get_closest_version(tgt), ver)
+
+    def tearDown(self):
+        return
@@ -0,0 +1,175 @@
+import sys
+import asyncio
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from time import monotonic, perf_counter
+
+import adams_bin_converter
+
+COMPLETE_CODE = '0.123'
+
+
+def fake_session_code(lines, delay=0.0):
+    return (
+        'import time\n'
+        f'time.sleep({delay})\n'
+        'with open("aview.log", "w") as fid:\n'
+        f'    fid.write({"".join(line + chr(10) for line in lines)!r})\n'
+    )
+
+
+def chatty_session_code(duration, interval=0.1):
+    """Writes ordinary output to aview.log every `interval` seconds for `duration` seconds, then
+    completes."""
+    return (
+        'import time\n'
+        'with open("aview.log", "w") as fid:\n'
+        f'    fid.write("! -- SCRIPT STARTING {COMPLETE_CODE} --\\n")\n'
+        f'    for i in range(int({duration} / {interval})):\n'
+        '        fid.write(f"! Reading part {i}\\n")\n'
+        '        fid.flush()\n'
+        f'        time.sleep({interval})\n'
+        f'    fid.write("! -- SCRIPT COMPLETE {COMPLETE_CODE} --\\n")\n'
+    )
+
+
+def fake_session(sim_dir, lines, delay=0.0):
+    """Starts a process that waits `delay` seconds, writes `lines` to aview.log and exits."""
+    return subprocess.Popen([sys.executable, '-c', fake_session_code(lines, delay)], cwd=sim_dir)
+
+
+class Test_WaitForCompletion(unittest.TestCase):
+
+    def setUp(self):
+        self.sim_dir = Path(tempfile.mkdtemp())
+
+    def test_returns_when_process_exits(self):
+        """Returns as soon as the process exits rather than on the next log check."""
+        adams_bin_converter.LOG_CHECK_INTERVAL = 5
+        process = fake_session(self.sim_dir, [
+            f'! -- SCRIPT STARTING {COMPLETE_CODE} --',
+            f'! -- SCRIPT COMPLETE {COMPLETE_CODE} --',
+        ])
+
+        start = perf_counter()
+        adams_bin_converter._wait_for_completion(self.sim_dir, COMPLETE_CODE, process)
+
+        self.assertLess(perf_counter() - start, 4)
+        self.assertEqual(process.returncode, 0)
+
+    def test_raises_when_command_file_exhausted(self):
+        """Raises a RuntimeError if the script started but did not complete."""
+        process = fake_session(self.sim_dir, [
+            f'! -- SCRIPT STARTING {COMPLETE_CODE} --',
+            '! Command file is exhausted, batch run is finished.',
+        ])
+
+        with self.assertRaises(RuntimeError):
+            adams_bin_converter._wait_for_completion(self.sim_dir, COMPLETE_CODE, process)
+
+    def test_raises_when_process_exits_early(self):
+        """Raises a RuntimeError if the process exits without writing any markers."""
+        process = fake_session(self.sim_dir, [])
+
+        with self.assertRaises(RuntimeError):
+            adams_bin_converter._wait_for_completion(self.sim_dir, COMPLETE_CODE, process)
+
+    def test_timeout_terminates_process(self):
+        """Raises an AdamsTimeoutError and terminates the process if the log shows no progress."""
+        process = fake_session(self.sim_dir, [], delay=30)
+
+        start = perf_counter()
+        with self.assertRaises(adams_bin_converter.AdamsTimeoutError):
+            adams_bin_converter._wait_for_completion(self.sim_dir, COMPLETE_CODE, process, timeout=0.5)
+
+        self.assertLess(perf_counter() - start, 10)
+        self.assertIsNotNone(process.poll())
+
+    def test_log_output_is_progress(self):
+        """Ordinary output in the log keeps the session alive for longer than the timeout."""
+        adams_bin_converter.LOG_CHECK_INTERVAL = 0.1
+        process = subprocess.Popen([sys.executable, '-c', chatty_session_code(1.5)], cwd=self.sim_dir)
+
+        adams_bin_converter._wait_for_completion(self.sim_dir, COMPLETE_CODE, process, timeout=0.6)
+        self.assertEqual(process.returncode, 0)
+
+    def test_deadline_terminates_process(self):
+        """Raises an AdamsTimeoutError and terminates the process once the deadline passes."""
+        process = fake_session(self.sim_dir, [], delay=30)
+
+        with self.assertRaises(adams_bin_converter.AdamsTimeoutError):
+            adams_bin_converter._wait_for_completion(self.sim_dir, COMPLETE_CODE, process,
+                                                     deadline=monotonic() + 0.5)
+
+        self.assertIsNotNone(process.poll())
+
+    def tearDown(self):
+        adams_bin_converter.LOG_CHECK_INTERVAL = 0.5
+        shutil.rmtree(self.sim_dir, ignore_errors=True)
+
+
+class Test_WaitForCompletionAsync(unittest.TestCase):
+
+    def setUp(self):
+        self.sim_dir = Path(tempfile.mkdtemp())
+        self.follower = adams_bin_converter.LogFollower(self.sim_dir / 'aview.log', COMPLETE_CODE)
+
+    def wait(self, lines, delay=0.0, **kwargs):
+        """Runs a fake session with asyncio and waits for it to complete."""
+        async def _wait():
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, '-c', fake_session_code(lines, delay), cwd=self.sim_dir
+            )
+            try:
+                await adams_bin_converter._wait_for_completion_async(process, self.follower, **kwargs)
+            finally:
+                if process.returncode is None:
+                    process.kill()
+                await process.wait()
+            return process
+
+        return asyncio.run(_wait())
+
+    def test_returns_when_process_exits(self):
+        """Returns as soon as the process exits rather than on the next log check."""
+        adams_bin_converter.LOG_CHECK_INTERVAL = 5
+
+        start = perf_counter()
+        process = self.wait([f'! -- SCRIPT STARTING {COMPLETE_CODE} --',
+                             f'! -- SCRIPT COMPLETE {COMPLETE_CODE} --'])
+
+        self.assertLess(perf_counter() - start, 4)
+        self.assertEqual(process.returncode, 0)
+
+    def test_raises_when_process_exits_early(self):
+        """Raises a RuntimeError if the process exits without writing any markers."""
+        with self.assertRaises(RuntimeError):
+            self.wait([])
+
+    def test_timeout(self):
+        """Raises an AdamsTimeoutError if the log shows no progress."""
+        start = perf_counter()
+        with self.assertRaises(adams_bin_converter.AdamsTimeoutError):
+            self.wait([], delay=30, timeout=0.5)
+
+        self.assertLess(perf_counter() - start, 10)
+
+    def test_log_output_is_progress(self):
+        """Ordinary output in the log keeps the session alive for longer than the timeout."""
+        adams_bin_converter.LOG_CHECK_INTERVAL = 0.1
+
+        async def _wait():
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, '-c', chatty_session_code(1.5), cwd=self.sim_dir
+            )
+            await adams_bin_converter._wait_for_completion_async(process, self.follower, timeout=0.6)
+            return await process.wait()
+
+        self.assertEqual(asyncio.run(_wait()), 0)
+
+    def tearDown(self):
+        adams_bin_converter.LOG_CHECK_INTERVAL = 0.5
+        shutil.rmtree(self.sim_dir, ignore_errors=True)
@@ -0,0 +1,103 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from time import time
+
+from adams_bin_converter import WorkQueue
+from test.fake_adams import make_fake_bin, make_fake_install
+
+ROOT_DIR = Path(__file__).parent.parent
+
+
+class Test_WorkQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.adams_launch_command, = make_fake_install(self.test_dir / 'install', startup_time=0.1,
+                                                       file_cost=0.05, fail=['bad*.bin'])
+        self.bin_files = [make_fake_bin(self.test_dir / 'files' / f'test_{i}.bin') for i in range(7)]
+        self.bin_files.append(make_fake_bin(self.test_dir / 'files' / 'bad.bin'))
+        self.queue_dir = self.test_dir / 'queue'
+
+    def test_manifest(self):
+        """The files are split into jobs of the requested size."""
+        queue = WorkQueue.create(self.queue_dir, self.bin_files, files_per_job=3)
+
+        self.assertListEqual([len(files) for files in queue.jobs.values()], [3, 3, 2])
+        self.assertDictEqual(queue.status(), {'finished': 0, 'claimed': 0, 'waiting': 3})
+
+    def test_worker_processes(self):
+        """Several worker processes share the jobs and each job is converted once."""
+        WorkQueue.create(self.queue_dir, self.bin_files, files_per_job=2)
+
+        workers = [
+            subprocess.Popen(
+                [sys.executable, str(ROOT_DIR / 'adams_bin_converter.py'), '--worker', str(self.queue_dir),
+                 '--p', str(self.adams_launch_command), '--no-cache'],
+                cwd=ROOT_DIR, stdout=subprocess.DEVNULL, env=dict(os.environ, HOME=str(self.test_dir)),
+            ) for _ in range(3)
+        ]
+        for worker in workers:
+            self.assertEqual(worker.wait(timeout=60), 0)
+
+        results = WorkQueue(self.queue_dir).results()
+        self.assertListEqual(sorted(r['bin_file'] for r in results), sorted(str(f) for f in self.bin_files))
+        self.assertListEqual([r['bin_file'] for r in results if not r['success']], [str(self.bin_files[-1])])
+        self.assertTrue(all((f.parent / f'{f.stem.upper()}.cmd').exists() for f in self.bin_files[:-1]))
+        self.assertListEqual(list((self.queue_dir / 'claims').iterdir()), [])
+
+    def test_stale_claim_recovered(self):
+        """A job claimed by a worker that died is claimed again once its claim goes stale."""
+        queue = WorkQueue.create(self.queue_dir, self.bin_files[:2], stale_after=10)
+
+        stale_claim = self.queue_dir / 'claims' / f'{next(iter(queue.jobs))}.lock.0'
+        stale_claim.write_text('{}')
+        os.utime(stale_claim, (time() - 60, time() - 60))
+
+        done = queue.work(poll_interval=0.1, adams_launch_command=self.adams_launch_command)
+
+        self.assertListEqual(done, list(queue.jobs))
+        self.assertTrue(all(r['success'] for r in queue.results()))
+
+    def test_live_claim_respected(self):
+        """A job claimed by a worker that is still working is not claimed again."""
+        queue = WorkQueue.create(self.queue_dir, self.bin_files[:1], stale_after=10)
+
+        job = next(iter(queue.jobs))
+        (self.queue_dir / 'claims' / f'{job}.lock.0').write_text('{}')
+        self.assertIsNone(queue._claim(job, 'other'))
+
+    def test_stale_claim_taken_over_once(self):
+        """Only one of the workers that find a stale claim takes the job over."""
+        queue = WorkQueue.create(self.queue_dir, self.bin_files[:1], stale_after=10)
+
+        job = next(iter(queue.jobs))
+        stale_claim = self.queue_dir / 'claims' / f'{job}.lock.0'
+        stale_claim.write_text('{}')
+        os.utime(stale_claim, (time() - 60, time() - 60))
+
+        claims = [queue._claim(job, worker) for worker in ['A', 'B']]
+
+        self.assertEqual(claims[0], self.queue_dir / 'claims' / f'{job}.lock.1')
+        self.assertIsNone(claims[1])
+        self.assertDictEqual(queue.status(), {'finished': 0, 'claimed': 1, 'waiting': 0})
+
+    def test_released_claim(self):
+        """A job given up without results can be claimed again straight away."""
+        queue = WorkQueue.create(self.queue_dir, self.bin_files[:1], stale_after=10)
+
+        job = next(iter(queue.jobs))
+        lock_file = queue._claim(job, 'A')
+        with self.assertRaises(RuntimeError):
+            with queue._keep_claimed(job, lock_file):
+                raise RuntimeError()
+
+        self.assertDictEqual(queue.status(), {'finished': 0, 'claimed': 0, 'waiting': 1})
+        self.assertEqual(queue._claim(job, 'B'), self.queue_dir / 'claims' / f'{job}.lock.1')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)